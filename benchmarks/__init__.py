@@ -0,0 +1,14 @@
+"""
+Offline Benchmarks for YouTube Auto Dub.
+
+Runs the real Engine, smart_chunk and media code over synthetic media with
+local stand-ins for YouTube, Google Translate and Edge TTS, so pipeline
+throughput can be measured reproducibly without network access.
+
+Usage:
+    python -m benchmarks.run --durations 1 10 --save-baseline
+    python -m benchmarks.run --durations 1 10 --compare
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
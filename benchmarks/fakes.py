@@ -0,0 +1,130 @@
+"""
+Local Stand-ins for Network Services used by the benchmarks.
+
+Each fake mimics the interface the pipeline calls and adds configurable
+latency, jitter and error rates:
+- FakeTranslator: replaces GoogleTranslator (Engine.translator)
+- FakeEdgeTTS: replaces the edge_tts module used by Engine
+- FakeYouTube: replaces src.youtube.download_media
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import asyncio
+import random
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+class Latency:
+    """Random delay and failure model shared by the fakes."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        """Initialize the model.
+
+        Args:
+            latency: Mean delay per call in seconds.
+            jitter: Maximum +/- deviation from the mean, in seconds.
+            error_rate: Probability in [0, 1] that a call fails.
+            seed: Random seed for reproducible runs.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> Tuple[float, bool]:
+        """Return (delay_seconds, should_fail) for one call."""
+        with self._lock:
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+            failed = self._rng.random() < self.error_rate
+        return max(0.0, delay), failed
+
+
+class FakeTranslator:
+    """GoogleTranslator stand-in returning tagged source text."""
+
+    def __init__(self, model: Latency):
+        self.model = model
+
+    def translate(self, text: str, source: str = "auto", target: str = "vi") -> str:
+        delay, failed = self.model.sample()
+        time.sleep(delay)
+        if failed:
+            # GoogleTranslator reports failures as an "Error:" string
+            return "Error: simulated translation failure"
+        return f"[{target}] {text}"
+
+    def close(self) -> None:
+        pass
+
+
+class FakeEdgeTTS:
+    """edge_tts module stand-in; Communicate(...).save() copies a template MP3."""
+
+    # Rough speaking rate used to pick a template length
+    CHARS_PER_SECOND = 15.0
+
+    def __init__(self, model: Latency, templates: Dict[int, Path]):
+        """Initialize the fake.
+
+        Args:
+            model: Latency and error model per request.
+            templates: Mapping of seconds to MP3 files (see synthetic.py).
+        """
+        self.model = model
+        self.templates = templates
+        fake = self
+
+        class Communicate:
+            def __init__(self, text: str, voice: str = "", **kwargs):
+                self.text = text
+                self.voice = voice
+
+            async def save(self, path: str) -> None:
+                await fake._save(self.text, Path(path))
+
+        self.Communicate = Communicate
+
+    async def _save(self, text: str, path: Path) -> None:
+        delay, failed = self.model.sample()
+        await asyncio.sleep(delay)
+        if failed:
+            raise ConnectionError("simulated Edge TTS failure")
+        seconds = round(len(text) / self.CHARS_PER_SECOND)
+        seconds = min(max(seconds, min(self.templates)), max(self.templates))
+        shutil.copyfile(self.templates[seconds], path)
+
+
+class FakeYouTube:
+    """src.youtube download stand-in serving pre-generated media."""
+
+    def __init__(self, model: Latency, video_path: Path, audio_path: Path):
+        self.model = model
+        self.video_path = video_path
+        self.audio_path = audio_path
+
+    def download_media(self, url: str, browser: Optional[str] = None,
+                       cookies_file: Optional[str] = None,
+                       on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                       on_audio_ready: Optional[Callable[[Path], None]] = None,
+                       pin: bool = False,
+                       start: Optional[float] = None,
+                       end: Optional[float] = None,
+                       on_captions: Optional[Callable] = None,
+                       format_spec: Optional[str] = None) -> Tuple[Path, Path]:
+        delay, failed = self.model.sample()
+        time.sleep(delay)
+        if failed:
+            raise RuntimeError("simulated download failure")
+        if on_captions:
+            on_captions(None)
+        if on_audio_ready:
+            on_audio_ready(self.audio_path)
+        return self.video_path, self.audio_path
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Offline End-to-End Pipeline Benchmark for YouTube Auto Dub.
+
+Feeds synthetic media through the real CLI pipeline (main.process_video:
+Engine, smart_chunk, translation loop, TTS batching, fit_audio, concat and
+render) with local fakes for YouTube, Google Translate and Edge TTS.
+Transcription uses the synthetic transcript unless --real-asr is given.
+
+Per-stage wall time and throughput come from the run metrics report. A
+baseline can be saved and later runs compared against it, so changes to
+fit_audio or the TTS loop can be shown to be faster or slower.
+
+Example:
+    python -m benchmarks.run --durations 1 10 60 --save-baseline
+    python -m benchmarks.run --durations 1 10 --compare --tts-workers 8
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Local imports
+import main
+import src.engines
+import src.youtube
+import src.metrics
+import src.transcripts
+from src.scheduler import ResourceGate
+from benchmarks import fakes, synthetic
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_DIR = BENCH_DIR / "baselines"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def flatten_stages(report: Dict) -> Dict[str, Dict]:
+    """Stage records from a metrics report, language stages as 'lang/stage'."""
+    stages = dict(report.get("stages", {}))
+    for lang, child in report.get("children", {}).items():
+        for name, stage in child.get("stages", {}).items():
+            stages[f"{lang}/{name}"] = stage
+    return stages
+
+
+def flatten_calls(report: Dict) -> Dict[str, Dict]:
+    """External call aggregates from a metrics report, per language."""
+    calls = dict(report.get("calls", {}))
+    for lang, child in report.get("children", {}).items():
+        for name, call in child.get("calls", {}).items():
+            calls[f"{lang}/{name}"] = call
+    return calls
+
+
+def run_once(engine: src.engines.Engine,
+             minutes: float,
+             args: argparse.Namespace) -> Dict:
+    """Run the pipeline once over synthetic media of the given length.
+
+    Returns:
+        The metrics report of the run.
+    """
+    video_path, audio_path = synthetic.generate_media(minutes)
+    duration = minutes * 60
+
+    if args.local:
+        # Real local input path: one FFmpeg pass prepares video and WAV
+        source = str(video_path)
+    else:
+        youtube = fakes.FakeYouTube(
+            fakes.Latency(args.download_latency, 0.0, 0.0, args.seed), video_path, audio_path
+        )
+        src.youtube.download_media = youtube.download_media
+        source = f"bench://{video_path.stem}"
+
+    # Every run must transcribe: a cached transcript would hide the ASR stage
+    src.transcripts.transcript_cache.enabled = False
+    if not args.real_asr:
+        segments = synthetic.talk_segments(duration, args.seed)
+        engine.transcribe_safe = lambda path, asr_options=None, metrics=None: [dict(s) for s in segments]
+        engine.transcribe_stream_safe = lambda path, asr_options=None, metrics=None: (dict(s) for s in segments)
+
+    pipeline_args = argparse.Namespace(
+        gender="female", browser=None, cookies=None,
+        tts_workers=args.tts_workers, parallel_langs=args.parallel_langs,
+        render_workers=1, resume=False, stream=args.stream, subtitle=args.subtitle,
+        start=None, end=None, captions=False, caption_file=None,
+        max_height=src.engines.VIDEO_MAX_HEIGHT, max_fps=src.engines.VIDEO_MAX_FPS,
+        video_codec=src.engines.VIDEO_CODEC,
+    )
+    gates = ResourceGate({"download": 1, "asr": 1, "render": 1})
+    metrics = src.metrics.RunMetrics()
+
+    main.process_video(engine, source, args.lang, pipeline_args, gates, metrics)
+    report = metrics.to_dict()
+    report["media_seconds"] = duration
+    return report
+
+
+def summarize(reports: List[Dict]) -> Dict:
+    """Median wall time and throughput per stage over repeated runs."""
+    media_seconds = reports[0]["media_seconds"]
+    runs = [flatten_stages(r) for r in reports]
+    summary: Dict[str, Dict] = {}
+
+    for name in runs[0]:
+        walls = [run[name]["wall"] for run in runs if name in run]
+        wall = statistics.median(walls)
+        items = runs[0][name].get("items")
+        summary[name] = {
+            "wall": round(wall, 3),
+            "items": items,
+            "items_per_sec": round(items / wall, 2) if items and wall > 0 else None,
+            "realtime_x": round(media_seconds / wall, 2) if wall > 0 else None,
+            "cpu": runs[0][name]["cpu"],
+            "child_cpu": runs[0][name]["child_cpu"],
+        }
+
+    return {
+        "media_seconds": media_seconds,
+        "elapsed": round(statistics.median(r["elapsed"] for r in reports), 3),
+        "peak_rss_mb": max((r["peak_rss_mb"] or 0) for r in reports) or None,
+        "stages": summary,
+        "calls": flatten_calls(reports[-1]),
+    }
+
+
+def print_summary(label: str, summary: Dict, baseline: Optional[Dict], threshold: float) -> None:
+    print(f"\n{'='*72}")
+    print(f"BENCHMARK {label}: {summary['media_seconds']:.0f}s media, "
+          f"{summary['elapsed']:.1f}s elapsed, peak RSS {summary['peak_rss_mb']} MB")
+    print(f"{'='*72}")
+    print(f"{'stage':<18}{'wall s':>10}{'items/s':>10}{'x realtime':>12}{'baseline':>10}{'delta':>10}")
+
+    for name, stage in summary["stages"].items():
+        base_wall = (baseline or {}).get("stages", {}).get(name, {}).get("wall")
+        delta = ""
+        if base_wall:
+            change = (stage["wall"] - base_wall) / base_wall * 100
+            flag = " !" if change > threshold else ""
+            delta = f"{change:+.1f}%{flag}"
+        print(f"{name:<18}{stage['wall']:>10.2f}"
+              f"{stage['items_per_sec'] if stage['items_per_sec'] is not None else '-':>10}"
+              f"{stage['realtime_x'] if stage['realtime_x'] is not None else '-':>12}"
+              f"{base_wall if base_wall is not None else '-':>10}{delta:>10}")
+
+    for name, call in summary["calls"].items():
+        print(f"[-] {name}: {call['count']} calls, mean {call['mean']*1000:.0f} ms, "
+              f"max {call['max']*1000:.0f} ms, {call['errors']} errors")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="YouTube Auto Dub - Offline pipeline benchmark"
+    )
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 10, 60],
+                        help="Synthetic media lengths in minutes. Default: 1 10 60")
+    parser.add_argument("--lang", nargs="+", default=["es"], help="Target languages. Default: es")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per duration (median is reported)")
+    parser.add_argument("--stream", action="store_true", help="Benchmark the streaming pipeline")
+    parser.add_argument("--subtitle", action="store_true", help="Burn in subtitles (re-encode)")
+    parser.add_argument("--local", action="store_true",
+                        help="Feed the synthetic video as a local file instead of the fake YouTube download")
+    parser.add_argument("--real-asr", action="store_true",
+                        help="Run Whisper on the synthetic audio instead of using the synthetic transcript")
+    parser.add_argument("--gpu", action="store_true", help="Use CUDA for Whisper")
+    parser.add_argument("--tts-workers", type=int, default=src.engines.TTS_CONCURRENCY)
+    parser.add_argument("--parallel-langs", type=int, default=2)
+
+    # Fake service behaviour
+    parser.add_argument("--translate-latency", type=float, default=0.15)
+    parser.add_argument("--tts-latency", type=float, default=0.6)
+    parser.add_argument("--download-latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- seconds on every fake call")
+    parser.add_argument("--translate-errors", type=float, default=0.0, help="Translate error rate [0-1]")
+    parser.add_argument("--tts-errors", type=float, default=0.0, help="Edge TTS error rate [0-1]")
+    parser.add_argument("--seed", type=int, default=42)
+
+    # Baselines
+    parser.add_argument("--name", default=None,
+                        help="Baseline name. Default: derived from mode and settings")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the stored baseline")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Flag stages slower than the baseline by this many percent. Default: 10")
+    args = parser.parse_args()
+
+    main.check_dependencies()
+    engine = src.engines.Engine("cuda" if args.gpu else "cpu")
+
+    templates = synthetic.generate_tts_templates(synthetic.MEDIA_DIR / "voices")
+    engine.translator = fakes.FakeTranslator(
+        fakes.Latency(args.translate_latency, args.jitter, args.translate_errors, args.seed)
+    )
+    src.engines.edge_tts = fakes.FakeEdgeTTS(
+        fakes.Latency(args.tts_latency, args.jitter, args.tts_errors, args.seed), templates
+    )
+
+    name = args.name or (f"{'stream' if args.stream else 'sequential'}_tts{args.tts_workers}"
+                         f"{'_local' if args.local else ''}")
+    results = {"name": name, "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "settings": vars(args), "runs": {}}
+
+    for minutes in args.durations:
+        label = f"{minutes:g}m"
+        baseline_path = BASELINE_DIR / f"{name}_{label}.json"
+        baseline = None
+        if args.compare and baseline_path.exists():
+            with open(baseline_path, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        elif args.compare:
+            print(f"[!] WARNING: No baseline for {name} {label}: {baseline_path}")
+
+        reports = [run_once(engine, minutes, args) for _ in range(max(1, args.repeat))]
+        summary = summarize(reports)
+        results["runs"][label] = summary
+        print_summary(label, summary, baseline, args.threshold)
+
+        if args.save_baseline:
+            BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(baseline_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            print(f"[+] Baseline saved: {baseline_path}")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_path = RESULTS_DIR / f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"\n[+] Results saved: {results_path}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,143 @@
+"""
+Synthetic Media Generation for the benchmarks.
+
+Generates talk-like test media with FFmpeg lavfi sources:
+- A low-resolution test pattern video with an AAC audio track
+- A WAV track of tone bursts ("utterances") separated by short pauses
+- The matching transcript segments, so the pipeline can run without
+  Whisper producing real text from tones
+
+Files are cached per duration under benchmarks/.media and reused.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import random
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Local imports
+from src.engines import SAMPLE_RATE, ASR_SAMPLE_RATE
+
+MEDIA_DIR = Path(__file__).resolve().parent / ".media"
+
+# Talk pattern: SPEAK_SECONDS of tone, then PAUSE_SECONDS of silence
+SPEAK_SECONDS = 4
+PAUSE_SECONDS = 2
+
+_WORDS = (
+    "today we look at how the pipeline handles long videos with many short "
+    "sentences and a few longer explanations about audio timing translation "
+    "quality voice selection rendering speed and the cost of every network call"
+).split()
+
+
+def _run(cmd: List[str], timeout: int) -> None:
+    subprocess.run(cmd, check=True, timeout=timeout,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def talk_segments(duration: float, seed: int = 0) -> List[Dict]:
+    """Transcript segments matching the tone bursts of the synthetic audio.
+
+    Each burst is split into one or two sentences of pseudo-random words.
+
+    Args:
+        duration: Media duration in seconds.
+        seed: Random seed for reproducible text.
+
+    Returns:
+        List of {'start', 'end', 'text'} segments, like Engine.transcribe.
+    """
+    rng = random.Random(seed)
+    segments = []
+    period = SPEAK_SECONDS + PAUSE_SECONDS
+    start = 0.0
+    while start + SPEAK_SECONDS <= duration:
+        parts = rng.choice([1, 2])
+        step = SPEAK_SECONDS / parts
+        for i in range(parts):
+            words = rng.randint(6, 14)
+            text = " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+            segments.append({
+                'start': round(start + i * step, 3),
+                'end': round(start + (i + 1) * step, 3),
+                'text': text,
+            })
+        start += period
+    return segments
+
+
+def generate_media(minutes: float, force: bool = False) -> Tuple[Path, Path]:
+    """Generate (or reuse) a synthetic video and its WAV audio.
+
+    Args:
+        minutes: Length of the media in minutes.
+        force: Regenerate even if cached files exist.
+
+    Returns:
+        (video_path, audio_path)
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails.
+    """
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    duration = int(minutes * 60)
+    label = f"talk_{duration}s"
+    video_path = MEDIA_DIR / f"{label}.mp4"
+    audio_path = MEDIA_DIR / f"{label}.wav"
+    period = SPEAK_SECONDS + PAUSE_SECONDS
+
+    # Tone bursts with a slow pitch wobble, gated to the talk pattern
+    tone = (
+        f"aevalsrc='0.4*sin(2*PI*(180+40*sin(2*PI*0.5*t))*t)"
+        f"*lt(mod(t,{period}),{SPEAK_SECONDS})':s={ASR_SAMPLE_RATE}:d={duration}"
+    )
+
+    if force or not audio_path.exists():
+        print(f"[*] Generating {duration}s synthetic audio: {audio_path.name}")
+        _run([
+            'ffmpeg', '-y', '-v', 'error',
+            '-f', 'lavfi', '-i', tone,
+            '-ac', '1', '-c:a', 'pcm_s16le',
+            str(audio_path)
+        ], timeout=max(60, duration))
+
+    if force or not video_path.exists():
+        print(f"[*] Generating {duration}s synthetic video: {video_path.name}")
+        _run([
+            'ffmpeg', '-y', '-v', 'error',
+            '-f', 'lavfi', '-i', f'testsrc2=size=640x360:rate=25:duration={duration}',
+            '-i', str(audio_path),
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', '96k', '-shortest',
+            str(video_path)
+        ], timeout=max(300, duration * 2))
+
+    return video_path, audio_path
+
+
+def generate_tts_templates(out_dir: Path, max_seconds: int = 12) -> Dict[int, Path]:
+    """Generate MP3 voice stand-ins of 1..max_seconds seconds.
+
+    The fake Edge TTS copies the template closest to the expected speech
+    length of a text, so fit_audio sees realistic stretch ratios.
+
+    Returns:
+        Mapping of length in seconds to template path.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    templates = {}
+    for seconds in range(1, max_seconds + 1):
+        path = out_dir / f"voice_{seconds:02d}s.mp3"
+        if not path.exists():
+            _run([
+                'ffmpeg', '-y', '-v', 'error',
+                '-f', 'lavfi', '-i', f'sine=frequency=300:sample_rate={SAMPLE_RATE}:duration={seconds}',
+                '-ac', '1', '-c:a', 'libmp3lame', '-b:a', '48k',
+                str(path)
+            ], timeout=60)
+        templates[seconds] = path
+    return templates
@@ -4,7 +4,7 @@ YouTube Auto Dub - Automated Video Dubbing Pipeline.
 
 This module provides a command-line interface for automatically dubbing YouTube videos
 into different languages using AI/ML technologies. The pipeline handles:
-- Video/audio download from YouTube
+- Video/audio download from YouTube, or local media files
 - Speech transcription using Whisper
 - Translation using Google Translate
 - Text-to-speech synthesis using Edge TTS
@@ -19,17 +19,30 @@ License: MIT
 """
 
 import argparse
-import shutil
-import subprocess
+import copy
+import json
 import time
-import random
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 # Local imports
 import src.engines
 import src.youtube
 import src.media
+import src.pipeline
+import src.checkpoint
+import src.core_utils
+import src.metrics
+import src.captions
+import src.local_media
+import src.transcripts
+from src.scheduler import ResourceGate
+from src.model_registry import ModelRegistry
+
+# Where a video's media comes from: a YouTube download or a local file
+MediaSource = Union[src.youtube.MediaDownload, src.local_media.LocalMedia]
 
 def check_dependencies() -> None:
     """Verifies critical dependencies are installed and accessible.
@@ -67,63 +80,577 @@ def check_dependencies() -> None:
         print("    Install with: pip install torch")
         exit(1)
 
-def cleanup() -> None:
-    """Clean up temporary directory with retry mechanism for Windows file locks.
-    
-    Windows can lock files temporarily, especially after FFmpeg operations.
-    This function implements an exponential backoff retry strategy.
+def parse_languages(values: Optional[List[str]]) -> List[str]:
+    """Normalize --lang values into a de-duplicated list of language codes.
     
-    NOTE: If cleanup fails after max retries, pipeline will continue with
-    existing temp files, which may cause unexpected behavior.
+    Accepts comma-separated lists (--lang es,fr) and repeated options
+    (--lang es --lang fr), preserving the order given.
+    """
+    langs = []
+    for value in values or []:
+        for code in value.split(","):
+            code = code.strip()
+            if code and code not in langs:
+                langs.append(code)
+    return langs or ["es"]
+
+def time_arg(value: str) -> float:
+    """argparse type for --start/--end."""
+    try:
+        return src.core_utils.parse_timestamp(value)
+    except src.core_utils.ValidationError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def dub_language(engine: src.engines.Engine,
+                 chunks: Iterable[Dict],
+                 wait_video: Callable[[], Path],
+                 lang: str,
+                 args: argparse.Namespace,
+                 work_dir: Path,
+                 render_gate: ResourceGate,
+                 metrics: src.metrics.RunMetrics) -> Optional[Path]:
+    """Translate, synthesize, fit and render one target language.
+    
+    Runs STEP 4 to STEP 6 of the pipeline for a single language. Each
+    language works in its own sub-directory with its own checkpoints, so
+    several languages can run concurrently over the same chunks.
+    
+    Args:
+        engine: Shared AI engine.
+        chunks: Chunks from STEP 3. Mutated with translations and audio,
+            so pass a private copy per language. With --stream this may
+            be a lazy iterable of chunks still being transcribed (see
+            stream_chunks).
+        wait_video: Returns the source video to render over, blocking
+            until its download has finished.
+        lang: Target language code.
+        args: Parsed command line arguments.
+        work_dir: Per-language work directory.
+        render_gate: Limits concurrent FFmpeg renders.
+        metrics: Per-language collector for stage and call timings.
+        
+    Returns:
+        Path to the dubbed video, or None if rendering failed.
     """
-    max_retries = 5
+    checkpoints = src.checkpoint.CheckpointStore(work_dir)
     
-    for attempt in range(max_retries):
-        try:
-            if src.engines.TEMP_DIR.exists():
-                shutil.rmtree(src.engines.TEMP_DIR)
-            src.engines.TEMP_DIR.mkdir(parents=True, exist_ok=True)
-            return
-        except PermissionError as e:
-            # Exponential backoff: 0.5s, 1s, 2s, 4s, 8s
-            wait_time = 0.5 * (2 ** attempt)
-            print(f"[-] File locked (attempt {attempt + 1}/{max_retries}). Retrying in {wait_time}s...")
-            time.sleep(wait_time)
-            
-    print(f"[!] WARNING: Could not fully clean temp directory after {max_retries} attempts.")
-    print(f"    Files may persist in: {src.engines.TEMP_DIR}")
-    print(f"    Consider manual cleanup if issues occur.")
+    if args.stream:
+        # STEP 4+5: Streaming Translation, TTS & Audio Fitting
+        print(f"\n{'='*60}")
+        print(f"STEP 4-5: STREAMING TRANSLATION, TTS & AUDIO SYNC ({lang.upper()})")
+        print(f"{'='*60}")
+        print(f"[*] Overlapping translation, {args.gender} voice synthesis and fitting...")
+        
+        # Unknown up front when chunks arrive from a running transcription
+        total = len(chunks) if isinstance(chunks, list) else None
+        
+        def on_stream_progress(stage: str, count: int) -> None:
+            if count % 5 == 0 or count == total:
+                print(f"[-] {stage.upper()}: {count}/{total or '?'}", end='\r')
+        
+        engine.release_memory()
+        pipeline = src.pipeline.StreamingPipeline(
+            engine, lang, args.gender, work_dir,
+            tts_concurrency=args.tts_workers,
+            checkpoints=checkpoints,
+            on_progress=on_stream_progress,
+            metrics=metrics
+        )
+        # Stages overlap here, so they are timed as one; calls break it down
+        with metrics.stage('stream', items=total) as stage:
+            chunks = pipeline.run(chunks)
+            stage['items'] = len(chunks)
+        stats = pipeline.stats
+        metrics.info['stream'] = stats
+        
+        print(f"\n[+] Streaming complete: {stats['fit']}/{len(chunks)} chunks processed")
+        if stats['failed'] > 0:
+            print(f"[!] WARNING: {stats['failed']} chunks failed TTS synthesis")
+    else:
+        # STEP 4: Translation Processing
+        print(f"\n{'='*60}")
+        print(f"STEP 4: TRANSLATION ({lang.upper()})")
+        print(f"{'='*60}")
+    
+        texts = [c['text'] for c in chunks]
+        print(f"[*] Translating {len(texts)} text segments...")
+    
+        # NOTE: Translation uses Google Translate API via web scraping
+        # Rate limiting is implemented to avoid IP bans
+        with metrics.stage('translate', items=len(texts)):
+            translated_texts = checkpoints.cached(
+                f'translate_{lang}', checkpoints.fingerprint(texts, lang),
+                lambda: engine.translate_safe(texts, lang, metrics)
+            )
+    
+        # Merge translations back into chunks
+        for i, chunk in enumerate(chunks):
+            chunk['trans_text'] = translated_texts[i]
+    
+        print(f"[+] Translation complete")
+    
+        # DEBUG: Show sample translation
+        if len(chunks) > 0:
+            original = chunks[0]['text'][:50]
+            translated = chunks[0]['trans_text'][:50]
+            print(f"[*] Sample: '{original}' -> '{translated}'")
+
+        # STEP 5: Text-to-Speech Synthesis & Audio Fitting
+        print(f"\n{'='*60}")
+        print(f"STEP 5: TTS SYNTHESIS & AUDIO SYNC")
+        print(f"{'='*60}")
+        print(f"[*] Generating {args.gender} voice in {lang.upper()}...")
+    
+        # Progress tracking variables
+        synthesized = 0
+    
+        def on_tts_result(index: int, path: Optional[Path]) -> None:
+            nonlocal synthesized
+            synthesized += 1
+            if synthesized % 5 == 0 or synthesized == len(chunks):
+                progress = synthesized / len(chunks) * 100
+                print(f"[-] Synthesized: {synthesized}/{len(chunks)} ({progress:.1f}%)", end='\r')
+    
+        # Generate all TTS audio on one event loop; failed chunks come back as None
+        with metrics.stage('tts', items=len(chunks)):
+            tts_paths = src.pipeline.synthesize_chunks(
+                engine, chunks, lang, args.gender, work_dir,
+                tts_concurrency=args.tts_workers,
+                checkpoints=checkpoints,
+                on_result=on_tts_result,
+                metrics=metrics
+            )
+        print()
+    
+        # Fit audio to original timing; failures continue with the next chunk
+        with metrics.stage('fit', items=len(chunks)):
+            failed_tts = src.pipeline.fit_chunks(chunks, tts_paths, checkpoints=checkpoints,
+                                                 metrics=metrics)
+        metrics.info['failed_chunks'] = failed_tts
+        processed_chunks = len(chunks) - failed_tts
+    
+        print(f"\n[+] TTS complete: {processed_chunks}/{len(chunks)} chunks processed")
+        if failed_tts > 0:
+            print(f"[!] WARNING: {failed_tts} chunks failed TTS synthesis")
 
-def create_base_silence() -> Path:
-    """Generate a base silence audio file for gap filling.
+    # STEP 6: Final Video Rendering
+    print(f"\n{'='*60}")
+    print(f"STEP 6: FINAL VIDEO RENDERING")
+    print(f"{'='*60}")
     
-    Creates a 5-minute silence file that serves as a reference for
-    filling gaps between audio segments during concatenation.
+    video_path = wait_video()
+    try:
+        with metrics.stage('concat', items=len(chunks)):
+            # Create base silence for gap filling
+            silence_path = src.media.create_base_silence(work_dir)
+            concat_list_path = work_dir / "concat_list.txt"
+            
+            print(f"[*] Creating concatenation manifest...")
+            src.media.create_concat_file(chunks, silence_path, concat_list_path)
+            
+            # Handle subtitle generation if requested
+            subtitle_path = None
+            if args.subtitle:
+                subtitle_path = work_dir / "subtitles.srt"
+                src.media.generate_srt(chunks, subtitle_path)
+        
+        # Generate output filename with subtitle suffix
+        video_name = video_path.stem
+        sub_suffix = "_sub" if args.subtitle else ""
+        out_name = f"dubbed_{lang}_{args.gender}{sub_suffix}_{video_name}.mp4"
+        final_output = src.engines.OUTPUT_DIR / out_name
+        
+        print(f"[*] Rendering final video...")
+        print(f"    Source: {video_path}")
+        print(f"    Output: {final_output}")
+        if subtitle_path:
+            print(f"    Subtitles: {subtitle_path} (Re-encoding required)")
+        
+        with render_gate.slot("render"), metrics.stage('render'):
+            src.media.render_video(video_path, concat_list_path, final_output, subtitle_path=subtitle_path)
+        
+        # Verify output file was created
+        if final_output.exists():
+            file_size = final_output.stat().st_size / (1024 * 1024)  # MB
+            print(f"\n[+] SUCCESS! Video rendered successfully.")
+            print(f"    Output: {final_output}")
+            print(f"    Size: {file_size:.1f} MB")
+            return final_output
+        
+        print(f"\n[!] ERROR: Output file not created at {final_output}")
+        return None
+            
+    except Exception as e:
+        print(f"\n[!] RENDERING FAILED ({lang.upper()}): {e}")
+        print("[-] This may be due to:")
+        print("    1. Corrupted audio chunks")
+        print("    2. FFmpeg compatibility issues")
+        print("    3. Insufficient disk space")
+        return None
+
+def read_url_file(path: str) -> List[str]:
+    """Read video or playlist URLs from a text file, one per line.
     
+    Blank lines and lines starting with '#' are ignored.
+    """
+    url_path = Path(path)
+    if not url_path.exists():
+        raise FileNotFoundError(f"URL file not found: {path}")
+    with open(url_path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+def process_video(engine: src.engines.Engine,
+                  url: str,
+                  langs: List[str],
+                  args: argparse.Namespace,
+                  gates: ResourceGate,
+                  metrics: src.metrics.RunMetrics) -> Dict[str, Optional[Path]]:
+    """Run the full pipeline (STEP 1 to STEP 6) for one video.
+    
+    Heavy stages are wrapped in gate slots ('download', 'asr', 'render') so
+    that several videos can be processed at once in batch mode without all
+    of them downloading or transcribing at the same time. Once the video
+    is downloaded, a metrics report is written next to the outputs as
+    metrics_<video>.json, whether or not the run succeeds.
+    
+    Args:
+        engine: Shared AI engine.
+        url: YouTube video URL, or a local media file path (no network).
+        langs: Target language codes.
+        args: Parsed command line arguments.
+        gates: Resource gate shared by every video in the run.
+        metrics: Collector for stage and call timings of this video.
+        
     Returns:
-        Path: Path to the generated silence file.
+        Mapping of language code to dubbed video path (None on failure).
         
     Raises:
-        subprocess.CalledProcessError: If FFmpeg fails to generate silence.
+        DownloadError: If the download fails.
     """
-    path = src.engines.TEMP_DIR / "silence_base.wav"
+    # STEP 1: YouTube Content Download
+    print(f"\n{'='*60}")
+    print(f"STEP 1: DOWNLOADING CONTENT")
+    print(f"{'='*60}")
+    print(f"[*] Target URL: {url}")
+    print(f"[*] Target Language(s): {', '.join(l.upper() for l in langs)}")
+    print(f"[*] Voice Gender: {args.gender.upper()}")
+    
+    metrics.info['url'] = url
+    
+    if src.local_media.is_local_path(url):
+        # Local file: one FFmpeg pass prepares video and audio, no download
+        try:
+            with metrics.stage('prepare'):
+                download = src.local_media.LocalMedia(Path(url), start=args.start, end=args.end)
+            audio_path = download.audio()
+        except Exception as e:
+            print(f"\n[!] COULD NOT READ LOCAL MEDIA: {e}")
+            raise src.core_utils.DownloadError(f"Local media failed: {e}") from e
+        return _run_prepared(engine, download, audio_path, langs, args, gates, metrics)
+    
+    @contextmanager
+    def download_slot() -> Iterator[None]:
+        with gates.slot("download"), metrics.stage('download'):
+            yield
+    
+    def on_download_progress(done: int, total: Optional[int]) -> None:
+        if total:
+            print(f"[-] Downloading: {done / 2**20:.1f}/{total / 2**20:.1f} MB "
+                  f"({done / total * 100:.0f}%)", end='\r')
+    
+    # Video and audio download in the background; transcription starts as
+    # soon as the audio lands, while the video stream may still be fetching
+    started = time.monotonic()
+    download = src.youtube.MediaDownload(
+        url, 
+        browser=args.browser, 
+        cookies_file=args.cookies,
+        on_progress=on_download_progress,
+        hold=download_slot,
+        start=args.start,
+        end=args.end,
+        captions=args.captions and not args.caption_file,
+        format_spec=src.youtube.format_selector(args.max_height, args.max_fps, args.video_codec)
+    )
+    try:
+        audio_path = download.audio()
+        metrics.info['audio_ready_after'] = round(time.monotonic() - started, 2)
+        print(f"\n[+] Audio extracted: {audio_path}")
+    except Exception as e:
+        _print_download_tips(e)
+        raise src.core_utils.DownloadError(f"Download failed: {e}") from e
+    
+    return _run_prepared(engine, download, audio_path, langs, args, gates, metrics)
+
+def _run_prepared(engine: src.engines.Engine,
+                  download: MediaSource,
+                  audio_path: Path,
+                  langs: List[str],
+                  args: argparse.Namespace,
+                  gates: ResourceGate,
+                  metrics: src.metrics.RunMetrics) -> Dict[str, Optional[Path]]:
+    """Dub once the audio exists, then release the media and save the metrics report."""
+    metrics.name = audio_path.stem
+    try:
+        return _dub_video(engine, download, audio_path, langs, args, gates, metrics)
+    finally:
+        download.release()
+        report_path = metrics.save(src.engines.OUTPUT_DIR / f"metrics_{audio_path.stem}.json")
+        metrics.info['report'] = str(report_path)
+        print(f"[*] Metrics report: {report_path}")
+
+def _print_download_tips(error: Exception) -> None:
+    print(f"\n[!] DOWNLOAD FAILED: {error}")
+    print("\n[-] TROUBLESHOOTING TIPS:")
+    print("    1. Close all browser windows if using --browser")
+    print("    2. Export fresh cookies.txt and use --cookies")
+    print("    3. Check if video is private/region-restricted")
+    print("    4. Verify YouTube URL is correct")
+
+def stream_chunks(engine: src.engines.Engine,
+                  audio_path: Path,
+                  asr_key: str,
+                  checkpoints: src.checkpoint.CheckpointStore,
+                  gates: ResourceGate,
+                  metrics: src.metrics.RunMetrics) -> Iterator[Dict]:
+    """STEP 2-3 as a stream: yield each chunk as soon as Whisper has decoded it.
+    
+    Used with --stream for a single language, so translation and TTS
+    start within seconds of transcription instead of after it. The ASR
+    slot is held until the stream is exhausted or closed. The finished
+    transcript and chunks are saved exactly like in the batch path.
     
-    # Skip generation if file already exists to save time
-    if path.exists():
-        return path
+    Raises:
+        RuntimeError: If the audio contains no speech.
+    """
+    asr = engine.asr_options
+    segments: List[Dict] = []
+    chunks: List[Dict] = []
+    
+    def decoded() -> Iterator[Dict]:
+        for segment in engine.transcribe_stream_safe(audio_path, metrics=metrics):
+            segments.append(segment)
+            yield segment
+    
+    with gates.slot("asr", on_wait=lambda: print(f"[*] Waiting for Whisper: {audio_path.stem}")):
+        with metrics.stage('transcribe') as stage:
+            for chunk in src.engines.iter_chunks(decoded()):
+                # Saved before downstream stages add their keys to the chunk
+                chunks.append(dict(chunk))
+                yield chunk
+            stage['items'] = len(segments)
+    
+    print(f"\n[+] Transcription complete: {len(segments)} segments in {len(chunks)} chunks")
+    if not chunks:
+        raise RuntimeError("No speech found to dub")
+    src.transcripts.transcript_cache.put(audio_path, asr, segments)
+    checkpoints.save('transcribe', asr_key, segments)
+    checkpoints.save('chunk', checkpoints.fingerprint(segments), chunks)
+
+def _dub_video(engine: src.engines.Engine,
+               download: MediaSource,
+               audio_path: Path,
+               langs: List[str],
+               args: argparse.Namespace,
+               gates: ResourceGate,
+               metrics: src.metrics.RunMetrics) -> Dict[str, Optional[Path]]:
+    """STEP 2 to STEP 6 once the audio is available (see process_video)."""
+
+    # Per-video work directory holding all stage checkpoints
+    work_dir = src.engines.TEMP_DIR / audio_path.stem
+    if args.resume and work_dir.exists():
+        print(f"[*] Resuming from checkpoints in: {work_dir}")
+    else:
+        src.core_utils.reset_directory(work_dir)
+    checkpoints = src.checkpoint.CheckpointStore(work_dir)
+
+    # The video stream may still be downloading; only rendering waits for it
+    def wait_video() -> Path:
+        try:
+            return download.result()[0]
+        except Exception as e:
+            raise src.core_utils.DownloadError(f"Video download failed: {e}") from e
+
+    # STEP 2: Speech Transcription
+    print(f"\n{'='*60}")
+    print(f"STEP 2: SPEECH TRANSCRIPTION")
+    print(f"{'='*60}")
+    
+    # Existing captions replace Whisper entirely when available
+    raw_segments = None
+    live_chunks = None
+    if args.caption_file or args.captions:
+        with metrics.stage('transcribe') as stage:
+            if args.caption_file:
+                print(f"[*] Using caption file: {args.caption_file}")
+                raw_segments = src.captions.clip_segments(
+                    src.captions.load_caption_file(Path(args.caption_file)), args.start, args.end
+                )
+                metrics.info['transcript_source'] = 'caption_file'
+            else:
+                raw_segments = download.captions()
+                metrics.info['transcript_source'] = 'youtube_captions'
+            stage['items'] = len(raw_segments or [])
+        if raw_segments:
+            print(f"[+] Using {len(raw_segments)} caption segments, skipping Whisper")
+    
+    if not raw_segments:
+        asr = engine.asr_options
+        print(f"[*] Transcribing audio with Whisper ({asr['model']}, {asr['compute_type']}, "
+              f"beam {asr['beam_size']})...")
+        metrics.info['transcript_source'] = 'whisper'
+        metrics.info['asr'] = asr
+        asr_key = checkpoints.fingerprint(
+            src.checkpoint.file_signature(audio_path),
+            {k: asr[k] for k in src.engines.ASR_TRANSCRIPT_KEYS}
+        )
+
+        raw_segments = checkpoints.load('transcribe', asr_key)
+        if raw_segments is not None:
+            print(f"[*] Checkpoint hit: reusing 'transcribe' output")
+        else:
+            # The transcript cache outlives the work directory, so a fresh
+            # re-dub of the same audio skips the model load and the decode
+            raw_segments = src.transcripts.transcript_cache.get(audio_path, asr)
+            metrics.info['transcript_cache'] = 'miss' if raw_segments is None else 'hit'
+            if raw_segments is not None:
+                checkpoints.save('transcribe', asr_key, raw_segments)
+            elif args.stream and len(langs) == 1:
+                # Chunks go to translation and TTS while Whisper is still decoding
+                live_chunks = stream_chunks(engine, audio_path, asr_key, checkpoints, gates, metrics)
+            else:
+                with gates.slot("asr", on_wait=lambda: print(f"[*] Waiting for Whisper: {audio_path.stem}")):
+                    with metrics.stage('transcribe') as stage:
+                        raw_segments = engine.transcribe_safe(audio_path, metrics=metrics)
+                        stage['items'] = len(raw_segments)
+                src.transcripts.transcript_cache.put(audio_path, asr, raw_segments)
+                checkpoints.save('transcribe', asr_key, raw_segments)
+
+    if live_chunks is not None:
+        print(f"[*] Streaming transcription: STEP 3-5 run as segments are decoded")
+        chunks = live_chunks
+    else:
+        print(f"[+] Transcription complete: {len(raw_segments)} segments")
+        
+        # DEBUG: Show first few segments for verification
+        if len(raw_segments) > 0:
+            print(f"[*] Sample segment: '{raw_segments[0]['text'][:50]}...'")
+        
+        # STEP 3: Smart Audio Chunking
+        print(f"\n{'='*60}")
+        print(f"STEP 3: INTELLIGENT CHUNKING")
+        print(f"{'='*60}")
+        
+        # TODO: Make chunking parameters configurable
+        with metrics.stage('chunk', items=len(raw_segments)):
+            chunks = checkpoints.cached(
+                'chunk', checkpoints.fingerprint(raw_segments),
+                lambda: src.engines.smart_chunk(raw_segments)
+            )
+        if not chunks:
+            raise RuntimeError("No speech found to dub")
+        print(f"[+] Optimized {len(raw_segments)} raw segments into {len(chunks)} chunks")
+        print(f"[*] Average chunk duration: {sum(c['end']-c['start'] for c in chunks)/len(chunks):.2f}s")
+
+    # STEP 4-6 run once per target language, concurrently where allowed
+    outputs: Dict[str, Optional[Path]] = {}
+    
+    if len(langs) == 1:
+        lang = langs[0]
+        outputs[lang] = dub_language(engine, chunks, wait_video, lang, args,
+                                     work_dir / lang, gates, metrics.child(lang))
+    else:
+        print(f"\n[*] Dubbing into {len(langs)} languages: {', '.join(l.upper() for l in langs)}")
+        workers = max(1, min(args.parallel_langs, len(langs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dub-lang") as pool:
+            futures = {
+                lang: pool.submit(dub_language, engine, copy.deepcopy(chunks), wait_video,
+                                  lang, args, work_dir / lang, gates, metrics.child(lang))
+                for lang in langs
+            }
+            for lang, future in futures.items():
+                try:
+                    outputs[lang] = future.result()
+                except Exception as e:
+                    print(f"\n[!] {lang.upper()} FAILED: {e}")
+                    outputs[lang] = None
         
-    print(f"[*] Generating base silence file: {path}")
-    
-    cmd = [
-        'ffmpeg', '-y', '-v', 'error',
-        '-f', 'lavfi', '-i', 'anullsrc=r=24000:cl=mono',
-        '-t', '300',  # 5 minutes - should be longer than any video
-        '-c:a', 'pcm_s16le',
-        str(path)
-    ]
-    
-    subprocess.run(cmd, check=True)
-    return path
+        print(f"\n[*] Language summary:")
+        for lang, output in outputs.items():
+            status = f"OK -> {output}" if output else "FAILED"
+            print(f"    {lang.upper()}: {status}")
+    
+    metrics.info['outputs'] = {lang: str(path) if path else None for lang, path in outputs.items()}
+    return outputs
+
+def run_batch(engine: src.engines.Engine,
+              urls: List[str],
+              langs: List[str],
+              args: argparse.Namespace,
+              gates: ResourceGate) -> Path:
+    """Dub several videos with one engine, pipelining them across stages.
+    
+    Up to --batch-workers videos are in flight at once; the resource gate
+    keeps heavy stages serialized, so one video downloads while another
+    transcribes and a third renders. A failed video is recorded and the
+    batch carries on.
+    
+    Args:
+        engine: Shared AI engine (and translator session).
+        urls: Video URLs, already expanded from playlists.
+        langs: Target language codes.
+        args: Parsed command line arguments.
+        gates: Resource gate shared by every video.
+        
+    Returns:
+        Path to the JSON summary report.
+    """
+    def run_one(url: str) -> Dict:
+        metrics = src.metrics.RunMetrics()
+        result = {"url": url, "status": "failed", "outputs": {}, "error": None}
+        try:
+            outputs = process_video(engine, url, langs, args, gates, metrics)
+            result["outputs"] = {lang: str(path) if path else None for lang, path in outputs.items()}
+            done = sum(1 for path in outputs.values() if path)
+            result["status"] = "ok" if done == len(outputs) else ("partial" if done else "failed")
+        except Exception as e:
+            print(f"\n[!] VIDEO FAILED: {url}: {e}")
+            result["error"] = str(e)
+        result["timings"] = dict(metrics.stage_walls(), total=round(metrics.elapsed, 2))
+        result["metrics_report"] = metrics.info.get('report')
+        return result
+    
+    started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    batch_start = time.monotonic()
+    workers = max(1, min(args.batch_workers, len(urls)))
+    print(f"\n[*] Batch: {len(urls)} videos, {workers} in flight")
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dub-video") as pool:
+        results = list(pool.map(run_one, urls))
+    
+    report = {
+        "started_at": started_at,
+        "elapsed": round(time.monotonic() - batch_start, 2),
+        "languages": langs,
+        "gender": args.gender,
+        "counts": {
+            status: sum(1 for r in results if r["status"] == status)
+            for status in ("ok", "partial", "failed")
+        },
+        "videos": results,
+    }
+    report_path = src.engines.OUTPUT_DIR / f"batch_report_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    print(f"\n[*] Batch summary ({report['elapsed']:.0f}s):")
+    for r in results:
+        detail = r["error"] or ", ".join(
+            f"{lang.upper()}={'OK' if path else 'FAILED'}" for lang, path in r["outputs"].items()
+        )
+        print(f"    [{r['status'].upper()}] {r['url']} ({r['timings'].get('total', 0):.0f}s) {detail}")
+    print(f"[+] Report saved: {report_path}")
+    return report_path
 
 def main() -> None:
     """Main entry point for the YouTube Auto Dub pipeline.
@@ -138,6 +665,9 @@ def main() -> None:
     7. Audio duration fitting and synchronization
     8. Final video rendering with dubbed audio
     
+    Several URLs, a playlist or a --url-file switch to batch mode, which
+    runs the same pipeline for every video with one shared engine.
+    
     Raises:
         SystemExit: On critical errors or user interruption.
     """
@@ -150,17 +680,68 @@ Examples:
   python main.py "https://youtube.com/watch?v=VIDEO_ID" --lang es
   python main.py "https://youtube.com/watch?v=VIDEO_ID" --lang fr --gender male --gpu
   python main.py "https://youtube.com/watch?v=VIDEO_ID" --lang ja --browser chrome
+  python main.py "https://youtube.com/playlist?list=PLAYLIST_ID" --lang es --batch-workers 3
+  python main.py --url-file urls.txt --lang es,fr
+  python main.py "https://youtube.com/watch?v=VIDEO_ID" --lang es --start 1:02:00 --end 1:05:00
+  python main.py "https://youtube.com/watch?v=VIDEO_ID" --lang es --max-height 720
+  python main.py /mnt/archive/talk.mp4 --lang es
         """
     )
     
-    # Required arguments
-    parser.add_argument("url", help="YouTube video URL to dub")
+    # Input arguments
+    parser.add_argument("urls", nargs="*", metavar="url",
+                        help="YouTube video or playlist URL(s), or local media file(s), to dub")
+    parser.add_argument(
+        "--url-file",
+        help="Text file with one video or playlist URL per line (# for comments)"
+    )
+    parser.add_argument(
+        "--start",
+        type=time_arg,
+        help="Dub only from this time on (seconds or [HH:]MM:SS). Only this section is downloaded"
+    )
+    parser.add_argument(
+        "--end",
+        type=time_arg,
+        help="Dub only up to this time (seconds or [HH:]MM:SS). Only this section is downloaded"
+    )
+    
+    # Download format options
+    parser.add_argument(
+        "--max-height",
+        type=int,
+        default=src.engines.VIDEO_MAX_HEIGHT,
+        help=f"Tallest video stream to download, e.g. 720; 0 for no cap. Default: {src.engines.VIDEO_MAX_HEIGHT}"
+    )
+    parser.add_argument(
+        "--max-fps",
+        type=int,
+        default=src.engines.VIDEO_MAX_FPS,
+        help=f"Highest frame rate to download; 0 for no cap. Default: {src.engines.VIDEO_MAX_FPS}"
+    )
+    parser.add_argument(
+        "--video-codec",
+        default=src.engines.VIDEO_CODEC,
+        choices=["avc", "vp9", "av1", "any"],
+        help=f"Preferred video codec; all of them are stream-copied into the output. Default: {src.engines.VIDEO_CODEC}"
+    )
+    
+    # Transcript source options
+    parser.add_argument(
+        "--captions",
+        action="store_true",
+        help="Use the video's YouTube captions (manual preferred) instead of Whisper when available"
+    )
+    parser.add_argument(
+        "--caption-file",
+        help="Local .vtt or .srt transcript of the video to use instead of Whisper"
+    )
     
     # Language and voice options
     parser.add_argument(
         "--lang", "-l", 
-        default="es", 
-        help="Target language ISO code (e.g., es, fr, ja, vi). Default: es"
+        action="append",
+        help="Target language ISO code(s), comma separated or repeated (e.g., es,fr or -l es -l fr). Default: es"
     )
     parser.add_argument(
         "--gender", "-g", 
@@ -185,6 +766,110 @@ Examples:
         action="store_true", 
         help="Use GPU acceleration for Whisper (requires CUDA)"
     )
+    parser.add_argument(
+        "--asr-preset",
+        choices=["default", "auto"],
+        help="Whisper settings preset; 'auto' picks model, threads and beam size from the "
+             f"detected cores, RAM and VRAM. Default: {src.engines.ASR_PRESET}"
+    )
+    parser.add_argument(
+        "--asr-model",
+        help=f"Whisper model size or path (tiny, base, small, medium, large-v3). Default: {src.engines.ASR_MODEL}"
+    )
+    parser.add_argument(
+        "--asr-compute-type",
+        choices=sorted(src.engines.ASR_COMPUTE_TYPES),
+        help=f"CTranslate2 compute type; auto = float16 on GPU, int8 on CPU. Default: {src.engines.ASR_COMPUTE_TYPE}"
+    )
+    parser.add_argument(
+        "--asr-threads",
+        type=int,
+        help=f"CPU threads used by Whisper (0 = library default). Default: {src.engines.ASR_CPU_THREADS}"
+    )
+    parser.add_argument(
+        "--asr-workers",
+        type=int,
+        help=f"Concurrent transcriptions one loaded model can serve. Default: {src.engines.ASR_NUM_WORKERS}"
+    )
+    parser.add_argument(
+        "--beam-size",
+        type=int,
+        help=f"Whisper beam size; 1 decodes greedily and is fastest. Default: {src.engines.ASR_BEAM_SIZE}"
+    )
+    parser.add_argument(
+        "--best-of",
+        type=int,
+        help=f"Candidates sampled when Whisper falls back to temperature sampling. Default: {src.engines.ASR_BEST_OF}"
+    )
+    parser.add_argument(
+        "--asr-batch-size",
+        type=int,
+        help="Speech windows Whisper decodes per batch (0 = sequential); needs VAD. "
+             f"Default: {src.engines.ASR_BATCH_SIZE}"
+    )
+    parser.add_argument(
+        "--asr-shards",
+        type=int,
+        help="Split long audio at silence into this many shards transcribed by parallel worker "
+             f"processes (CPU only, 0 = one process). Default: {src.engines.ASR_SHARDS}"
+    )
+    parser.add_argument(
+        "--no-vad",
+        dest="vad_filter",
+        action="store_const",
+        const=False,
+        help="Decode all audio instead of only the speech regions found by voice activity detection"
+    )
+    parser.add_argument(
+        "--vad-threshold",
+        type=float,
+        help=f"Speech probability above which audio counts as speech. Default: {src.engines.ASR_VAD_THRESHOLD}"
+    )
+    parser.add_argument(
+        "--vad-min-silence-ms",
+        type=int,
+        help=f"Shortest pause that splits speech regions. Default: {src.engines.ASR_VAD_MIN_SILENCE_MS}"
+    )
+    parser.add_argument(
+        "--vad-speech-pad-ms",
+        type=int,
+        help=f"Audio kept on each side of a speech region. Default: {src.engines.ASR_VAD_SPEECH_PAD_MS}"
+    )
+    parser.add_argument(
+        "--tts-workers",
+        type=int,
+        default=src.engines.TTS_CONCURRENCY,
+        help=f"Max concurrent Edge TTS requests. Default: {src.engines.TTS_CONCURRENCY}"
+    )
+    
+    parser.add_argument(
+        "--parallel-langs",
+        type=int,
+        default=2,
+        help="Languages dubbed concurrently when several --lang codes are given. Default: 2"
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="Max concurrent FFmpeg renders across languages. Default: 1"
+    )
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=3,
+        help="Videos in flight at once in batch mode. Default: 3"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse checkpoints from a previous run of the same video instead of starting fresh"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Overlap translation, TTS and audio fitting instead of running them one after another"
+    )
     
     # Subtitle options
     parser.add_argument(
@@ -194,6 +879,19 @@ Examples:
     )
     
     args = parser.parse_args()
+    langs = parse_languages(args.lang)
+    
+    urls = list(args.urls)
+    if args.url_file:
+        urls.extend(read_url_file(args.url_file))
+    if not urls:
+        parser.error("at least one URL or --url-file is required")
+    if args.start is not None and args.end is not None and args.end <= args.start:
+        parser.error("--end must be after --start")
+    if args.caption_file and not Path(args.caption_file).exists():
+        parser.error(f"caption file not found: {args.caption_file}")
+    if args.max_height < 0 or args.max_fps < 0:
+        parser.error("--max-height and --max-fps must be 0 or positive")
 
     # STEP 0: Environment Setup & Dependency Check
     print("\n" + "="*60)
@@ -201,192 +899,50 @@ Examples:
     print("="*60)
     
     check_dependencies()
-    cleanup()
     
     # Configure processing device
     device = "cuda" if args.gpu else "cpu"
     print(f"[*] Using device: {device.upper()}")
     
-    # Initialize AI engines
-    engine = src.engines.Engine(device)
-    
-    # STEP 1: YouTube Content Download
-    print(f"\n{'='*60}")
-    print(f"STEP 1: DOWNLOADING CONTENT")
-    print(f"{'='*60}")
-    print(f"[*] Target URL: {args.url}")
-    print(f"[*] Target Language: {args.lang.upper()}")
-    print(f"[*] Voice Gender: {args.gender.upper()}")
+    batch = len(urls) > 1 or any(src.youtube.is_collection_url(u) for u in urls)
+    if batch and args.caption_file:
+        parser.error("--caption-file belongs to one video and cannot be used in batch mode")
+    if batch:
+        urls = src.youtube.expand_urls(urls, browser=args.browser, cookies_file=args.cookies)
+        if not urls:
+            print("[!] No videos found to dub")
+            return
     
+    # Initialize AI engines. In batch mode a registry keeps Whisper loaded
+    # between videos instead of releasing it after every transcription.
+    registry = ModelRegistry(idle_timeout=0) if batch else None
+    asr_options = {
+        "preset": args.asr_preset, "model": args.asr_model, "compute_type": args.asr_compute_type,
+        "cpu_threads": args.asr_threads, "num_workers": args.asr_workers,
+        "beam_size": args.beam_size, "best_of": args.best_of, "batch_size": args.asr_batch_size,
+        "shards": args.asr_shards,
+        "vad_filter": args.vad_filter, "vad_threshold": args.vad_threshold,
+        "vad_min_silence_ms": args.vad_min_silence_ms, "vad_speech_pad_ms": args.vad_speech_pad_ms,
+    }
     try:
-        video_path = src.youtube.download_video(
-            args.url, 
-            browser=args.browser, 
-            cookies_file=args.cookies
-        )
-        audio_path = src.youtube.download_audio(
-            args.url, 
-            browser=args.browser, 
-            cookies_file=args.cookies
-        )
-        print(f"[+] Video downloaded: {video_path}")
-        print(f"[+] Audio extracted: {audio_path}")
-    except Exception as e:
-        print(f"\n[!] DOWNLOAD FAILED: {e}")
-        print("\n[-] TROUBLESHOOTING TIPS:")
-        print("    1. Close all browser windows if using --browser")
-        print("    2. Export fresh cookies.txt and use --cookies")
-        print("    3. Check if video is private/region-restricted")
-        print("    4. Verify YouTube URL is correct")
-        return
-
-    # STEP 2: Speech Transcription
-    print(f"\n{'='*60}")
-    print(f"STEP 2: SPEECH TRANSCRIPTION")
-    print(f"{'='*60}")
-    print(f"[*] Transcribing audio with Whisper ({src.engines.ASR_MODEL})...")
-    
-    raw_segments = engine.transcribe_safe(audio_path)
-    print(f"[+] Transcription complete: {len(raw_segments)} segments")
-    
-    # DEBUG: Show first few segments for verification
-    if len(raw_segments) > 0:
-        print(f"[*] Sample segment: '{raw_segments[0]['text'][:50]}...'")
-    
-    # STEP 3: Smart Audio Chunking
-    print(f"\n{'='*60}")
-    print(f"STEP 3: INTELLIGENT CHUNKING")
-    print(f"{'='*60}")
-    
-    # TODO: Make chunking parameters configurable
-    chunks = src.engines.smart_chunk(raw_segments)
-    print(f"[+] Optimized {len(raw_segments)} raw segments into {len(chunks)} chunks")
-    print(f"[*] Average chunk duration: {sum(c['end']-c['start'] for c in chunks)/len(chunks):.2f}s")
-
-    # STEP 4: Translation Processing
-    print(f"\n{'='*60}")
-    print(f"STEP 4: TRANSLATION ({args.lang.upper()})")
-    print(f"{'='*60}")
-    
-    texts = [c['text'] for c in chunks]
-    print(f"[*] Translating {len(texts)} text segments...")
-    
-    # NOTE: Translation uses Google Translate API via web scraping
-    # Rate limiting is implemented to avoid IP bans
-    translated_texts = engine.translate_safe(texts, args.lang)
-    
-    # Merge translations back into chunks
-    for i, chunk in enumerate(chunks):
-        chunk['trans_text'] = translated_texts[i]
-    
-    print(f"[+] Translation complete")
-    
-    # DEBUG: Show sample translation
-    if len(chunks) > 0:
-        original = chunks[0]['text'][:50]
-        translated = chunks[0]['trans_text'][:50]
-        print(f"[*] Sample: '{original}' -> '{translated}'")
-
-    # STEP 5: Text-to-Speech Synthesis & Audio Fitting
-    print(f"\n{'='*60}")
-    print(f"STEP 5: TTS SYNTHESIS & AUDIO SYNC")
-    print(f"{'='*60}")
-    print(f"[*] Generating {args.gender} voice in {args.lang.upper()}...")
+        engine = src.engines.Engine(device, registry=registry, asr_options=asr_options)
+    except src.core_utils.ValidationError as e:
+        parser.error(str(e))
     
-    # Progress tracking variables
-    failed_tts = 0
-    processed_chunks = 0
-    
-    for i, chunk in enumerate(chunks):
-        filename = f"chunk_{i:04d}.mp3"
-        tts_path = src.engines.TEMP_DIR / filename
-        
-        try:
-            # Generate TTS audio
-            engine.synthesize(
-                text=chunk['trans_text'], 
-                target_lang=args.lang, 
-                gender=args.gender, 
-                out_path=tts_path
-            )
-            
-            # IMPORTANT: Add jitter to prevent API rate limiting
-            # Edge TTS has undocumented rate limits
-            time.sleep(random.uniform(0.5, 1.5))
-            
-            # Fit audio to original timing
-            slot_duration = chunk['end'] - chunk['start']
-            final_audio = src.media.fit_audio(tts_path, slot_duration)
-            chunk['processed_audio'] = final_audio
-            
-            processed_chunks += 1
-            
-        except Exception as e:
-            print(f"\n[!] TTS failed for chunk {i}: {e}")
-            failed_tts += 1
-            # Continue with next chunk instead of failing completely
-            continue
-        
-        # Progress update every 5 chunks
-        if i % 5 == 0:
-            progress = (i + 1) / len(chunks) * 100
-            print(f"[-] Progress: {i+1}/{len(chunks)} ({progress:.1f}%)", end='\r')
-    
-    print(f"\n[+] TTS complete: {processed_chunks}/{len(chunks)} chunks processed")
-    if failed_tts > 0:
-        print(f"[!] WARNING: {failed_tts} chunks failed TTS synthesis")
-
-    # STEP 6: Final Video Rendering
-    print(f"\n{'='*60}")
-    print(f"STEP 6: FINAL VIDEO RENDERING")
-    print(f"{'='*60}")
+    # One download and one transcription at a time; TTS and translation overlap
+    gates = ResourceGate({"download": 1, "asr": 1, "render": args.render_workers})
     
     try:
-        # Create base silence for gap filling
-        silence_path = create_base_silence()
-        concat_list_path = src.engines.TEMP_DIR / "concat_list.txt"
-        
-        print(f"[*] Creating concatenation manifest...")
-        src.media.create_concat_file(chunks, silence_path, concat_list_path)
-        
-        # Handle subtitle generation if requested
-        subtitle_path = None
-        if args.subtitle:
-            subtitle_path = src.engines.TEMP_DIR / "subtitles.srt"
-            src.media.generate_srt(chunks, subtitle_path)
-        
-        # Generate output filename with subtitle suffix
-        video_name = video_path.stem
-        sub_suffix = "_sub" if args.subtitle else ""
-        out_name = f"dubbed_{args.lang}_{args.gender}{sub_suffix}_{video_name}.mp4"
-        final_output = src.engines.OUTPUT_DIR / out_name
-        
-        print(f"[*] Rendering final video...")
-        print(f"    Source: {video_path}")
-        print(f"    Output: {final_output}")
-        if subtitle_path:
-            print(f"    Subtitles: {subtitle_path} (Re-encoding required)")
-        
-        src.media.render_video(video_path, concat_list_path, final_output, subtitle_path=subtitle_path)
-        
-        # Verify output file was created
-        if final_output.exists():
-            file_size = final_output.stat().st_size / (1024 * 1024)  # MB
-            print(f"\n[+] SUCCESS! Video rendered successfully.")
-            print(f"    Output: {final_output}")
-            print(f"    Size: {file_size:.1f} MB")
+        if batch:
+            run_batch(engine, urls, langs, args, gates)
         else:
-            print(f"\n[!] ERROR: Output file not created at {final_output}")
-            
-    except Exception as e:
-        print(f"\n[!] RENDERING FAILED: {e}")
-        print("[-] This may be due to:")
-        print("    1. Corrupted audio chunks")
-        print("    2. FFmpeg compatibility issues")
-        print("    3. Insufficient disk space")
-        return
-        
+            try:
+                process_video(engine, urls[0], langs, args, gates, src.metrics.RunMetrics())
+            except src.core_utils.DownloadError:
+                return
     finally:
+        if registry:
+            registry.clear()
         print(f"\n{'='*60}")
         print("YOUTUBE AUTO DUB - PIPELINE COMPLETE")
         print(f"{'='*60}")
@@ -401,4 +957,4 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\n[!] UNEXPECTED ERROR: {e}")
         print("[-] Please report this issue with the full error message")
-        exit(1)
\ No newline at end of file
+        exit(1)
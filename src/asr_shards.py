@@ -0,0 +1,276 @@
+"""
+Sharded Transcription Module for YouTube Auto Dub.
+
+Transcribes long audio (multi-hour streams) with several Whisper
+processes instead of one:
+- Cut points are placed in the quietest stretch near each even split,
+  so no shard boundary falls inside a word
+- Each shard is decoded by a worker process holding its own model
+  instance; the CPU cores are divided between the workers
+- Shards overlap slightly at their edges; segments are shifted back to
+  the original timeline and each one is kept only by the shard its
+  midpoint falls in, which removes the duplicates of the overlap
+- Per-shard timing is printed and recorded in the run metrics
+
+Sharding works on ASR-profile WAVs (see src.engines.load_asr_audio).
+Workers read their slice of the file directly, so no audio is copied
+between processes.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Local imports
+from src.engines import (
+    BASE_DIR, ASR_SAMPLE_RATE, ASR_SHARD_MIN_SECONDS, ASR_SHARD_OVERLAP,
+    is_asr_audio, total_memory_gb
+)
+from src.metrics import RunMetrics
+from src.model_registry import WHISPER_SIZE_GB
+
+# Energy is measured over frames of this length when looking for silence
+FRAME_SECONDS = 0.1
+# A cut may move this far from its even split to find a quiet spot
+SEARCH_SECONDS = 30.0
+# Resident memory per worker on top of the model weights (decoder state, audio)
+WORKER_OVERHEAD_GB = 0.5
+
+
+# =============================================================================
+# CUT POINTS
+# =============================================================================
+
+def frame_energy(path: Path, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """Mean squared amplitude of consecutive frames of a 16-bit mono WAV.
+
+    The file is read in blocks, so hours of audio never sit in memory.
+    """
+    frame = int(ASR_SAMPLE_RATE * frame_seconds)
+    energies = []
+    with wave.open(str(path), "rb") as wav:
+        block_frames = frame * 600
+        while True:
+            data = wav.readframes(block_frames)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+            usable = len(samples) // frame * frame
+            if usable:
+                energies.append((samples[:usable].reshape(-1, frame) ** 2).mean(axis=1))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def find_cut_points(energy: np.ndarray, shards: int,
+                    frame_seconds: float = FRAME_SECONDS,
+                    search_seconds: float = SEARCH_SECONDS) -> List[float]:
+    """Times (seconds) splitting audio into shards at its quietest moments.
+
+    Each cut starts at an even split and moves to the quietest half second
+    within search_seconds of it.
+
+    Returns:
+        shards - 1 increasing cut times.
+    """
+    if shards < 2 or len(energy) == 0:
+        return []
+    # Half-second moving average, so a single quiet frame inside a word does not win
+    width = max(1, int(0.5 / frame_seconds))
+    smooth = np.convolve(energy, np.ones(width) / width, mode="same")
+    radius = int(search_seconds / frame_seconds)
+    cuts = []
+    for k in range(1, shards):
+        target = len(energy) * k // shards
+        lo, hi = max(0, target - radius), min(len(energy), target + radius)
+        cuts.append((lo + int(np.argmin(smooth[lo:hi]))) * frame_seconds)
+    return cuts
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+
+class _ShardWorker:
+    """A `python -m src.asr_worker` process holding one Whisper model.
+
+    A fresh interpreter runs only the worker module, so the application
+    that started it (its media cache, scheduler, registry) is never
+    re-imported, unlike multiprocessing's spawn start method.
+    """
+
+    def __init__(self, options: Dict[str, Any]):
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "src.asr_worker"], cwd=str(BASE_DIR),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8"
+        )
+        self._send(options)
+
+    def transcribe(self, audio_path: Path, index: int, start: float, end: float) -> Dict[str, Any]:
+        """Decode one shard; segment times are relative to the shard start."""
+        self._send({'path': str(audio_path), 'index': index, 'start': start, 'end': end})
+        line = self._proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Shard worker exited with code {self._proc.wait()}")
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(f"Shard {index + 1} failed: {reply['error']}")
+        return reply
+
+    def close(self) -> None:
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+            self._proc.wait()
+
+    def _send(self, payload: Dict[str, Any]) -> None:
+        try:
+            self._proc.stdin.write(json.dumps(payload) + "\n")
+            self._proc.stdin.flush()
+        except OSError as e:
+            raise RuntimeError(f"Shard worker exited with code {self._proc.poll()}") from e
+
+
+# =============================================================================
+# SHARDED TRANSCRIPTION
+# =============================================================================
+
+def plan_workers(shards: int, model: str) -> int:
+    """Number of worker processes the machine can hold.
+
+    At most one per shard and per core, and no more model instances than
+    fit in 80% of the RAM.
+    """
+    cores = os.cpu_count() or 1
+    workers = min(shards, cores)
+    memory = total_memory_gb()
+    if memory:
+        per_worker = WHISPER_SIZE_GB.get(model, 1.0) + WORKER_OVERHEAD_GB
+        workers = min(workers, max(1, int(memory * 0.8 // per_worker)))
+    return workers
+
+
+def stitch_shards(results: List[Dict[str, Any]], cuts: List[float]) -> List[Dict]:
+    """Merge shard results into one timeline without the overlap duplicates.
+
+    Segment times are shifted by their shard's start. A segment is kept
+    only by the shard whose [cut, next cut) range holds its midpoint, so a
+    sentence decoded twice in the overlap of two shards appears once.
+    """
+    bounds = [0.0] + list(cuts) + [float("inf")]
+    merged = []
+    for result in sorted(results, key=lambda r: r['index']):
+        low, high = bounds[result['index']], bounds[result['index'] + 1]
+        for seg in result['segments']:
+            start, end = seg['start'] + result['start'], seg['end'] + result['start']
+            if low <= (start + end) / 2 < high:
+                merged.append({**seg, 'start': round(start, 3), 'end': round(end, 3)})
+    merged.sort(key=lambda s: s['start'])
+    return merged
+
+
+def transcribe_sharded(audio_path: Path, options: Dict[str, Any],
+                       metrics: Optional[RunMetrics] = None) -> Optional[List[Dict]]:
+    """Transcribe a long WAV with a pool of Whisper worker processes.
+
+    Args:
+        audio_path: ASR-profile WAV.
+        options: Resolved ASR settings (see src.engines.resolve_asr_options);
+            options['shards'] is the number of shards requested.
+        metrics: Optional run metrics; per-shard timings are stored in
+            metrics.info['asr_shards'].
+
+    Returns:
+        Stitched segments, or None when the audio is not worth sharding
+        (shorter than two shards of ASR_SHARD_MIN_SECONDS) or not in the
+        ASR profile; the caller then transcribes in one process.
+    """
+    if not is_asr_audio(audio_path):
+        print(f"[!] WARNING: {audio_path.name} is not 16 kHz mono PCM, transcribing in one process")
+        return None
+    with wave.open(str(audio_path), "rb") as wav:
+        duration = wav.getnframes() / ASR_SAMPLE_RATE
+    shards = min(options['shards'], int(duration // ASR_SHARD_MIN_SECONDS))
+    if shards < 2:
+        return None
+
+    workers = plan_workers(shards, options['model'])
+    if workers < 2:
+        print("[!] WARNING: Not enough cores or memory for sharded transcription, using one process")
+        return None
+    # Each worker gets its share of the cores, so N workers never run N x cores threads
+    worker_options = dict(options)
+    share = max(1, (os.cpu_count() or 1) // workers)
+    if options['cpu_threads'] > share:
+        print(f"[*] Reducing Whisper threads from {options['cpu_threads']} to {share} per shard worker")
+    worker_options['cpu_threads'] = min(options['cpu_threads'] or share, share)
+
+    cuts = find_cut_points(frame_energy(audio_path), shards)
+    edges = [0.0] + cuts + [duration]
+    jobs: List[Tuple[int, float, float]] = [
+        (i, max(0.0, edges[i] - ASR_SHARD_OVERLAP), min(duration, edges[i + 1] + ASR_SHARD_OVERLAP))
+        for i in range(shards)
+    ]
+    print(f"[*] Sharded transcription: {shards} shards of ~{duration / shards / 60:.0f} min, "
+          f"{workers} worker processes x {worker_options['cpu_threads']} threads")
+
+    started = time.monotonic()
+    pending: "queue.Queue[Tuple[int, float, float]]" = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+
+    def run_worker() -> List[Dict[str, Any]]:
+        # Each thread drives one worker process until no shard is left
+        done = []
+        worker = _ShardWorker(worker_options)
+        try:
+            while True:
+                try:
+                    index, start, end = pending.get_nowait()
+                except queue.Empty:
+                    return done
+                result = worker.transcribe(audio_path, index, start, end)
+                done.append(result)
+                length = result['end'] - result['start']
+                print(f"[+] Shard {result['index'] + 1}/{shards} "
+                      f"({result['start'] / 60:.1f}-{result['end'] / 60:.1f} min): "
+                      f"{len(result['segments'])} segments in {result['seconds']:.1f}s "
+                      f"({length / max(result['seconds'], 1e-6):.1f}x realtime)")
+        except Exception:
+            # Stop the other workers early: the transcription has failed
+            while not pending.empty():
+                pending.get_nowait()
+            raise
+        finally:
+            worker.close()
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asr-shard") as pool:
+        futures = [pool.submit(run_worker) for _ in range(workers)]
+        for future in futures:
+            results.extend(future.result())
+
+    segments = stitch_shards(results, cuts)
+    elapsed = time.monotonic() - started
+    print(f"[+] Sharded transcription done: {len(segments)} segments in {elapsed:.1f}s "
+          f"({duration / max(elapsed, 1e-6):.1f}x realtime)")
+    if metrics is not None:
+        metrics.info['asr_shards'] = [
+            {'index': r['index'], 'start': round(r['start'], 2), 'end': round(r['end'], 2),
+             'segments': len(r['segments']), 'seconds': round(r['seconds'], 2)}
+            for r in sorted(results, key=lambda r: r['index'])
+        ]
+    return segments
@@ -0,0 +1,71 @@
+"""
+Shard Transcription Worker for YouTube Auto Dub.
+
+Entry point of the worker processes started by src.asr_shards:
+
+    python -m src.asr_worker
+
+The worker loads one Whisper model and then decodes shards of a WAV on
+request. It is a plain module run by a fresh interpreter, so the parent
+application (main.py, web_app.py) and its media cache, scheduler and
+model registry are never imported in the worker.
+
+Protocol (JSON lines): the first stdin line holds the resolved ASR
+settings; every further line is a shard {'path', 'index', 'start', 'end'}
+answered on stdout with {'index', 'start', 'end', 'segments', 'seconds'}
+or {'index', 'error'}. Everything else the worker prints goes to stderr.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import json
+import os
+import sys
+import time
+import wave
+from typing import Any, Dict
+
+import numpy as np
+
+
+def transcribe_shard(model: Any, job: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode one slice of the WAV; segment times are relative to the slice."""
+    from src.engines import ASR_SAMPLE_RATE, whisper_segments
+
+    started = time.monotonic()
+    with wave.open(job['path'], "rb") as wav:
+        first = int(job['start'] * ASR_SAMPLE_RATE)
+        wav.setpos(first)
+        data = wav.readframes(int(job['end'] * ASR_SAMPLE_RATE) - first)
+    audio = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    segments = list(whisper_segments(model, audio, options))
+    return {'index': job['index'], 'start': job['start'], 'end': job['end'],
+            'segments': segments, 'seconds': time.monotonic() - started}
+
+
+def main() -> int:
+    # Replies keep the original stdout; all other output goes to stderr
+    replies = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    from faster_whisper import WhisperModel
+
+    options = json.loads(sys.stdin.readline())
+    model = WhisperModel(options['model'], device="cpu", compute_type=options['compute_type'],
+                         cpu_threads=options['cpu_threads'], num_workers=1)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        try:
+            reply = transcribe_shard(model, job, options)
+        except Exception as e:
+            reply = {'index': job.get('index'), 'error': f"{type(e).__name__}: {e}"}
+        replies.write(json.dumps(reply, ensure_ascii=False) + "\n")
+        replies.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
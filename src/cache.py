@@ -0,0 +1,397 @@
+"""
+Media Cache Module for YouTube Auto Dub.
+
+This module manages the downloaded media in CACHE_DIR:
+- A manifest recording size, duration, checksum and last access per file
+- A byte cap enforced by evicting least-recently-used files
+- Atomic inserts: files are produced in a temporary directory and renamed
+  into the cache, so readers never see a partial file
+- A per-video lock so only one download of a given video runs at a time;
+  other jobs wait and then reuse the cached result
+- Pins that keep files in use by a running job from being evicted
+
+Locks and pins are per process (web jobs and batch videos are threads of
+one process). Files found in the cache without a manifest entry, e.g.
+from older versions, are adopted on startup.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Local imports
+from src.engines import CACHE_DIR, CACHE_MAX_GB
+from src.core_utils import write_json_atomic, safe_file_delete
+
+# Cached media suffixes adopted when found without a manifest entry
+MEDIA_SUFFIXES = {".mp4", ".wav", ".m4a", ".webm", ".mkv"}
+
+
+def file_checksum(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists; True when it cannot be told."""
+    if pid == os.getpid():
+        return True
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == "nt":
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def clip_key(base: str, start: Optional[float], end: Optional[float]) -> str:
+    """Cache key of a media source, with the time range appended for clips.
+
+    Example: clip_key("abc", 90.5, 180) -> "abc_90p5-180"
+    """
+    if start is None and end is None:
+        return base
+    start_label = f"{start or 0.0:g}".replace(".", "p")
+    end_label = f"{end:g}".replace(".", "p") if end is not None else "end"
+    return f"{base}_{start_label}-{end_label}"
+
+
+class MediaCache:
+    """Size-capped LRU cache of media files.
+
+    Files are grouped by key: the file stem, i.e. the video id or local
+    source key, plus the time range for clips and, for downloads, the
+    format profile hash.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    # Cache hits update last access in memory; the manifest is rewritten at
+    # most this often for them (put and evict always save)
+    ACCESS_SAVE_INTERVAL = 60.0
+    # Scratch directories older than this are removed even if their owner lives
+    STALE_TEMP_SECONDS = 24 * 3600
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: Optional[int] = None):
+        """Initialize the cache, loading the manifest and adopting stray files.
+
+        Args:
+            cache_dir: Directory holding cached media.
+            max_bytes: Byte cap; defaults to CACHE_MAX_GB. Use 0 for no cap.
+        """
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(CACHE_MAX_GB * 1024 ** 3) if max_bytes is None else max_bytes
+        self._manifest_path = self.cache_dir / self.MANIFEST_NAME
+        self._lock = threading.RLock()
+        # key -> [lock, holders and waiters]; dropped when nobody uses it
+        self._key_locks: Dict[str, List[Any]] = {}
+        self._pins: Dict[str, int] = {}
+        self._saved_at = 0.0
+        self._entries: Dict[str, Dict[str, Any]] = self._read_manifest()
+        self._adopt_untracked()
+        self._remove_stale_temp()
+
+    # -------------------------------------------------------------------------
+    # Locking and pinning
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Hold the download lock of a video; other holders wait."""
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        key_lock = slot[0]
+        try:
+            if not key_lock.acquire(blocking=False):
+                print(f"[*] Waiting for another download of {key} to finish...")
+                key_lock.acquire()
+            try:
+                yield
+            finally:
+                key_lock.release()
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    self._key_locks.pop(key, None)
+
+    def pin(self, key: str) -> None:
+        """Protect a video's files from eviction until unpin()."""
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str) -> None:
+        """Release one pin taken with pin()."""
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+
+    @contextmanager
+    def temp_dir(self, key: str) -> Iterator[Path]:
+        """Private scratch directory for producing files before put()."""
+        # The owner pid in the name lets other processes tell stale directories apart
+        path = self.cache_dir / ".tmp" / f"{key}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path.mkdir(parents=True, exist_ok=True)
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    # -------------------------------------------------------------------------
+    # Entries
+    # -------------------------------------------------------------------------
+
+    def get(self, key: str, name: str) -> Optional[Path]:
+        """Return a cached file if it is intact, updating its last access.
+
+        A file whose size or mtime no longer matches the manifest is dropped.
+
+        Args:
+            key: Cache key the file belongs to.
+            name: File name inside the cache directory.
+        """
+        path = self.cache_dir / name
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.get("key") != key:
+                return None
+            try:
+                stat = path.stat()
+            except OSError:
+                stat = None
+            if stat is None or stat.st_size != entry["size"] or int(stat.st_mtime) != entry["mtime"]:
+                print(f"[!] WARNING: Cached file changed or missing, discarding: {name}")
+                self._entries.pop(name)
+                self._save_manifest()
+                safe_file_delete(path)
+                return None
+            entry["last_access"] = time.time()
+            if entry["last_access"] - self._saved_at >= self.ACCESS_SAVE_INTERVAL:
+                self._save_manifest()
+        return path
+
+    def put(self, key: str, name: str, src_path: Path, duration: Optional[float] = None) -> Path:
+        """Move a finished file into the cache atomically and record it.
+
+        Args:
+            key: Cache key the file belongs to.
+            name: File name inside the cache directory.
+            src_path: Finished file, ideally on the same filesystem
+                (see temp_dir()), so the move is a rename.
+            duration: Media duration in seconds, if known.
+
+        Returns:
+            Final path inside the cache.
+        """
+        path = self.cache_dir / name
+        checksum = file_checksum(src_path)
+        os.replace(src_path, path)
+        stat = path.stat()
+        with self._lock:
+            self._entries[name] = {
+                "key": key,
+                "size": stat.st_size,
+                "mtime": int(stat.st_mtime),
+                "duration": duration,
+                "checksum": checksum,
+                "created": time.time(),
+                "last_access": time.time(),
+            }
+            self._save_manifest()
+        self.evict()
+        return path
+
+    def verify(self, name: str) -> bool:
+        """Recompute a file's checksum and compare it with the manifest.
+
+        A file adopted without a checksum gets one recorded instead.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+        if not entry or not (self.cache_dir / name).exists():
+            return False
+        if entry.get("checksum") is None:
+            return self._record_checksum(name) is not None
+        return file_checksum(self.cache_dir / name) == entry["checksum"]
+
+    def checksum(self, path: Path) -> Optional[str]:
+        """Recorded checksum of a cached file, if it is unchanged since it was recorded.
+
+        Files adopted without a checksum are hashed once and the result recorded.
+        """
+        path = Path(path)
+        if path.parent != self.cache_dir:
+            return None
+        with self._lock:
+            entry = self._entries.get(path.name)
+        if not entry or not self._unchanged(path, entry):
+            return None
+        if entry.get("checksum") is None:
+            return self._record_checksum(path.name)
+        return entry["checksum"]
+
+    def _record_checksum(self, name: str) -> Optional[str]:
+        """Hash a tracked file and store the checksum if the file did not change meanwhile."""
+        path = self.cache_dir / name
+        try:
+            checksum = file_checksum(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(name)
+            if not entry or not self._unchanged(path, entry):
+                return None
+            entry["checksum"] = checksum
+            self._save_manifest()
+        return checksum
+
+    @staticmethod
+    def _unchanged(path: Path, entry: Dict[str, Any]) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == entry["size"] and int(stat.st_mtime) == entry["mtime"]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Evict least-recently-used unpinned videos until under the cap.
+
+        All files of a video go together: its WAV is useless without the MP4.
+
+        Returns:
+            Number of bytes freed.
+        """
+        cap = self.max_bytes if max_bytes is None else max_bytes
+        if cap <= 0:
+            return 0
+
+        freed = 0
+        with self._lock:
+            total = sum(e["size"] for e in self._entries.values())
+            last_access: Dict[str, float] = {}
+            for entry in self._entries.values():
+                key = entry["key"]
+                last_access[key] = max(last_access.get(key, 0.0), entry["last_access"])
+            candidates = sorted(
+                (access, key) for key, access in last_access.items()
+                if self._pins.get(key, 0) == 0
+                and key not in self._key_locks
+            )
+            for _, key in candidates:
+                if total <= cap:
+                    break
+                names = [name for name, e in self._entries.items() if e["key"] == key]
+                size = 0
+                for name in names:
+                    size += self._entries.pop(name)["size"]
+                    safe_file_delete(self.cache_dir / name)
+                total -= size
+                freed += size
+                print(f"[*] Cache: evicted {key} ({size / (1024*1024):.1f} MB)")
+            if freed:
+                self._save_manifest()
+            if total > cap:
+                print(f"[!] WARNING: Cache is {total / 1024**3:.1f} GB, above the "
+                      f"{cap / 1024**3:.1f} GB cap; remaining files are in use")
+        return freed
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Total size, cap, file count and pinned videos."""
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "bytes": sum(e["size"] for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "pinned": sorted(self._pins),
+            }
+
+    # -------------------------------------------------------------------------
+    # Manifest
+    # -------------------------------------------------------------------------
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self._manifest_path.exists():
+            return {}
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"[!] WARNING: Corrupted cache manifest, rebuilding: {self._manifest_path}")
+            return {}
+
+    def _save_manifest(self) -> None:
+        write_json_atomic(self._manifest_path, self._entries)
+        self._saved_at = time.time()
+
+    def _remove_stale_temp(self) -> None:
+        """Remove scratch directories left by dead processes or long abandoned.
+
+        Other processes (web app, CLI runs) may be writing into .tmp right
+        now, so directories of live owners are kept.
+        """
+        tmp_root = self.cache_dir / ".tmp"
+        if not tmp_root.is_dir():
+            return
+        for path in tmp_root.iterdir():
+            parts = path.name.rsplit("-", 2)
+            owner = int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else None
+            try:
+                age = time.time() - path.stat().st_mtime
+            except OSError:
+                continue
+            if age > self.STALE_TEMP_SECONDS or (owner is not None and not _pid_alive(owner)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _adopt_untracked(self) -> None:
+        changed = False
+        for name in list(self._entries):
+            if not (self.cache_dir / name).exists():
+                self._entries.pop(name)
+                changed = True
+        for path in self.cache_dir.iterdir():
+            if path.is_file() and path.suffix in MEDIA_SUFFIXES and path.name not in self._entries:
+                stat = path.stat()
+                # The checksum is filled lazily by verify() or checksum()
+                self._entries[path.name] = {
+                    "key": path.stem,
+                    "size": stat.st_size,
+                    "mtime": int(stat.st_mtime),
+                    "duration": None,
+                    "checksum": None,
+                    "created": stat.st_mtime,
+                    "last_access": stat.st_mtime,
+                }
+                changed = True
+        if changed:
+            self._save_manifest()
+
+
+# Process-wide cache used by src.youtube
+media_cache = MediaCache()
@@ -0,0 +1,176 @@
+"""
+Caption Parsing Module for YouTube Auto Dub.
+
+Turns existing captions into the transcript segments produced by
+Engine.transcribe, so Whisper can be skipped when a video already has
+subtitles in its spoken language:
+- Picking the best caption track from yt-dlp metadata (manual first,
+  then auto-generated captions of the original language)
+- Parsing WebVTT and SRT files into {'start', 'end', 'text'} segments
+- Removing the rolling duplicates of YouTube auto-generated captions
+- Clipping segments to a --start/--end range and rebasing them to zero
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import html
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_TIMING = re.compile(
+    r"((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})"
+)
+_TAG = re.compile(r"<[^>]*>")
+# Sound cues like [Music], (applause) or ♪ are not speech to dub
+_SOUND_CUE = re.compile(r"\[[^\]]*\]|\([^)]*\)|♪+")
+
+# Cues shorter than this are YouTube's transition frames between rolling lines
+_MIN_CUE_SECONDS = 0.05
+
+
+def _to_seconds(timestamp: str) -> float:
+    seconds = 0.0
+    for part in timestamp.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _clean(line: str) -> str:
+    text = html.unescape(_TAG.sub("", line))
+    text = _SOUND_CUE.sub("", text)
+    return " ".join(text.split())
+
+
+def _carried_over(previous: List[str], current: List[str]) -> int:
+    """Number of leading lines of a cue rolled over from the end of the previous one.
+
+    Only counted when the cue adds lines after them (rolling captions).
+    """
+    for count in range(min(len(previous), len(current) - 1), 0, -1):
+        if current[:count] == previous[-count:]:
+            return count
+    return 0
+
+
+def parse_captions(content: str) -> List[Dict]:
+    """Parse WebVTT or SRT content into transcript segments.
+
+    YouTube auto-generated captions repeat the previous line at the top of
+    every cue. Leading lines that carry over from the end of the previous
+    cue are dropped when new lines follow them, so each spoken line
+    appears once; a cue that repeats the previous one entirely is a real
+    repeat and is kept.
+
+    Args:
+        content: Caption file content.
+
+    Returns:
+        List of {'start', 'end', 'text'} segments in time order.
+
+    Example:
+        >>> rolling = ("00:00:01.000 --> 00:00:03.000\\nhello there\\n\\n"
+        ...            "00:00:03.000 --> 00:00:05.000\\nhello there\\nhow are you")
+        >>> [s['text'] for s in parse_captions(rolling)]
+        ['hello there', 'how are you']
+        >>> repeated = ("00:00:01.000 --> 00:00:02.000\\nYes.\\n\\n"
+        ...             "00:00:02.500 --> 00:00:03.500\\nYes.")
+        >>> [s['text'] for s in parse_captions(repeated)]
+        ['Yes.', 'Yes.']
+    """
+    segments = []
+    previous_lines: List[str] = []
+    for block in re.split(r"\n\s*\n", content.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = block.strip().split("\n")
+        timing_index = next((i for i, line in enumerate(lines) if _TIMING.search(line)), None)
+        if timing_index is None:
+            continue  # Header, NOTE, STYLE or REGION block
+
+        match = _TIMING.search(lines[timing_index])
+        start, end = _to_seconds(match.group(1)), _to_seconds(match.group(2))
+        if end - start < _MIN_CUE_SECONDS:
+            continue
+
+        cue_lines = [_clean(line) for line in lines[timing_index + 1:]]
+        cue_lines = [line for line in cue_lines if line]
+        new_lines = cue_lines[_carried_over(previous_lines, cue_lines):]
+        previous_lines = cue_lines
+        if new_lines:
+            segments.append({'start': round(start, 3), 'end': round(end, 3),
+                             'text': " ".join(new_lines)})
+
+    segments.sort(key=lambda s: s['start'])
+    return segments
+
+
+def load_caption_file(path: Path) -> List[Dict]:
+    """Parse a local .vtt or .srt caption file into transcript segments.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Caption file not found: {path}")
+    return parse_captions(path.read_text(encoding="utf-8-sig", errors="replace"))
+
+
+def clip_segments(segments: List[Dict],
+                  start: Optional[float] = None,
+                  end: Optional[float] = None) -> List[Dict]:
+    """Keep the segments inside [start, end] and shift them to start at zero.
+
+    Segments overlapping a boundary are cut at it.
+    """
+    if start is None and end is None:
+        return segments
+    start = start or 0.0
+    clipped = []
+    for seg in segments:
+        if seg['end'] <= start or (end is not None and seg['start'] >= end):
+            continue
+        seg_end = min(seg['end'], end) if end is not None else seg['end']
+        clipped.append({**seg,
+                        'start': round(max(seg['start'], start) - start, 3),
+                        'end': round(seg_end - start, 3)})
+    return clipped
+
+
+def pick_track(info: Dict[str, Any]) -> Optional[Tuple[str, bool]]:
+    """Choose the caption track in the video's spoken language.
+
+    Manual subtitles win over auto-generated captions. Auto-generated
+    tracks other than the original language are machine translations and
+    are never used.
+
+    Args:
+        info: yt-dlp info dict of the video.
+
+    Returns:
+        (language_code, is_auto_generated), or None if no suitable track.
+    """
+    language = (info.get('language') or "").lower()
+    manual = [k for k in (info.get('subtitles') or {}) if k != 'live_chat']
+    auto = list(info.get('automatic_captions') or {})
+
+    def find(codes: List[str], lang: str) -> Optional[str]:
+        exact = [c for c in codes if c.lower() == lang]
+        related = [c for c in codes if c.lower().split("-")[0] == lang.split("-")[0]]
+        return (exact or related or [None])[0]
+
+    if language:
+        code = find(manual, language)
+        if code:
+            return code, False
+        code = find(auto, f"{language}-orig") or find(auto, language)
+        if code:
+            return code, True
+        return None
+
+    # Spoken language unknown: a single manual track is most likely the original
+    if len(manual) == 1:
+        return manual[0], False
+    orig = [c for c in auto if c.endswith("-orig")]
+    if orig:
+        return orig[0], True
+    return None
@@ -0,0 +1,169 @@
+"""
+Pipeline Checkpointing Module for YouTube Auto Dub.
+
+This module persists the output of each pipeline stage into a per-video
+work directory so that an interrupted run can be resumed:
+- Stage-level checkpoints (transcript segments, chunks, translations)
+- Per-chunk records (TTS files, fitted audio, streamed translations)
+
+Every checkpoint is stored together with a fingerprint of its inputs. A
+checkpoint is only reused when the fingerprint matches and, for file
+records, when the file still exists and passes validation.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Local imports
+from src.core_utils import validate_audio_file, write_json_atomic
+
+
+def file_signature(path: Path) -> Dict[str, Any]:
+    """Cheap identity of a file for fingerprinting (name, size, mtime).
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        Dictionary describing the file, or just the name if it is missing.
+    """
+    if not path.exists():
+        return {"name": path.name}
+    stat = path.stat()
+    return {"name": path.name, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+class CheckpointStore:
+    """Fingerprinted stage and per-chunk checkpoints inside a work directory.
+
+    Per-chunk records are written to the manifest in batches: put() marks
+    it dirty and rewrites it at most every FLUSH_INTERVAL seconds, and the
+    stage that recorded them calls flush() when it finishes. A crash loses
+    at most the last interval of records, whose chunks are then redone.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    # Seconds between manifest rewrites while records keep arriving
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self, work_dir: Path):
+        """Initialize the store, loading any existing manifest.
+
+        Args:
+            work_dir: Per-video work directory holding checkpoints.
+        """
+        self.work_dir = work_dir
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._manifest_path = self.work_dir / self.MANIFEST_NAME
+        self._records: Dict[str, Dict] = self._read_manifest()
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Stable short hash of JSON-serializable inputs."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    # -------------------------------------------------------------------------
+    # Stage-level checkpoints (one JSON file per stage)
+    # -------------------------------------------------------------------------
+
+    def load(self, stage: str, key: str) -> Optional[Any]:
+        """Return the stage data if it was saved with the same key."""
+        path = self.work_dir / f"{stage}.json"
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if payload.get("key") != key:
+            return None
+        return payload.get("data")
+
+    def save(self, stage: str, key: str, data: Any) -> None:
+        """Persist stage data together with its input key."""
+        write_json_atomic(self.work_dir / f"{stage}.json", {"key": key, "data": data})
+
+    def cached(self, stage: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Load a stage checkpoint, or compute and save it.
+
+        Args:
+            stage: Stage name, used as the checkpoint file name.
+            key: Fingerprint of the stage inputs.
+            compute: Callable producing the stage output on a miss.
+
+        Returns:
+            The checkpointed or freshly computed stage output.
+        """
+        data = self.load(stage, key)
+        if data is not None:
+            print(f"[*] Checkpoint hit: reusing '{stage}' output")
+            return data
+        data = compute()
+        self.save(stage, key, data)
+        return data
+
+    # -------------------------------------------------------------------------
+    # Per-chunk records (kept in the manifest)
+    # -------------------------------------------------------------------------
+
+    def get(self, name: str, key: str) -> Optional[Any]:
+        """Return a recorded value if it was stored with the same key."""
+        with self._lock:
+            record = self._records.get(name)
+        if not record or record.get("key") != key:
+            return None
+        return record.get("value")
+
+    def put(self, name: str, key: str, value: Any) -> None:
+        """Record a JSON-serializable value under a name and input key."""
+        with self._lock:
+            self._records[name] = {"key": key, "value": value}
+            self._dirty = True
+            if time.monotonic() - self._flushed_at >= self.FLUSH_INTERVAL:
+                self._write_manifest()
+
+    def flush(self) -> None:
+        """Write records not yet in the manifest file."""
+        with self._lock:
+            if self._dirty:
+                self._write_manifest()
+
+    def get_path(self, name: str, key: str) -> Optional[Path]:
+        """Return a recorded file if its key matches and the file is valid."""
+        value = self.get(name, key)
+        if not value:
+            return None
+        path = self.work_dir / value
+        return path if validate_audio_file(path) else None
+
+    def put_path(self, name: str, key: str, path: Path) -> None:
+        """Record a file inside the work directory as a checkpoint."""
+        self.put(name, key, path.relative_to(self.work_dir).as_posix())
+
+    def _write_manifest(self) -> None:
+        # Caller holds self._lock
+        write_json_atomic(self._manifest_path, self._records)
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+    def _read_manifest(self) -> Dict[str, Dict]:
+        if not self._manifest_path.exists():
+            return {}
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"[!] WARNING: Corrupted checkpoint manifest, starting fresh: {self._manifest_path}")
+            return {}
@@ -8,11 +8,14 @@ Author: Nguyen Cong Thuan Huy (mangodxd)
 Version: 1.0.0
 """
 
+import json
+import os
+import shutil
 import subprocess
 import time
 import traceback
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 
 # =============================================================================
@@ -74,6 +77,11 @@ class ResourceError(YouTubeAutoDubError):
     pass
 
 
+class DownloadError(YouTubeAutoDubError):
+    """Raised when video or audio download fails."""
+    pass
+
+
 # =============================================================================
 # ERROR HANDLING UTILITIES
 # =============================================================================
@@ -156,6 +164,35 @@ def get_duration(path: Path) -> float:
         return 0.0
 
 
+def parse_timestamp(value: Any) -> float:
+    """Parse a time given as seconds ("90", 90.5) or [HH:]MM:SS[.fff].
+    
+    Args:
+        value: Number of seconds or a colon-separated timestamp.
+        
+    Returns:
+        Time in seconds.
+        
+    Raises:
+        ValidationError: If the value is not a valid non-negative time.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        parts = str(value).strip().split(":")
+        if not 1 <= len(parts) <= 3:
+            raise ValidationError(f"Invalid time: {value!r}")
+        try:
+            seconds = 0.0
+            for part in parts:
+                seconds = seconds * 60 + float(part)
+        except ValueError:
+            raise ValidationError(f"Invalid time: {value!r}") from None
+    if not 0 <= seconds < float("inf"):
+        raise ValidationError(f"Time must be a non-negative number of seconds: {value!r}")
+    return seconds
+
+
 def run_ffmpeg_command(cmd: List[str], timeout: int = 300, description: str = "FFmpeg operation") -> None:
     """Run FFmpeg command with consistent error handling.
     
@@ -209,6 +246,63 @@ def safe_file_delete(file_path: Path) -> None:
         print(f"[!] WARNING: Could not delete file {file_path}: {e}")
 
 
+def write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON via a temporary file and rename, so readers never see a partial file.
+    
+    Args:
+        path: Destination file.
+        data: JSON-serializable data.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def reset_directory(directory: Path, max_retries: int = 5) -> bool:
+    """Delete and recreate a directory, retrying on Windows file locks.
+    
+    Windows can lock files temporarily, especially after FFmpeg operations,
+    so removal is retried with exponential backoff (0.5s, 1s, 2s, ...).
+    
+    Args:
+        directory: Directory to reset.
+        max_retries: Maximum number of removal attempts.
+        
+    Returns:
+        True if the directory was reset, False if files remained locked.
+    """
+    if not remove_directory(directory, max_retries=max_retries):
+        return False
+    directory.mkdir(parents=True, exist_ok=True)
+    return True
+
+
+def remove_directory(directory: Path, max_retries: int = 5) -> bool:
+    """Delete a directory tree, retrying on Windows file locks.
+    
+    Args:
+        directory: Directory to remove. Missing directories are ignored.
+        max_retries: Maximum number of removal attempts.
+        
+    Returns:
+        True if the directory is gone, False if files remained locked.
+    """
+    for attempt in range(max_retries):
+        try:
+            if directory.exists():
+                shutil.rmtree(directory)
+            return True
+        except PermissionError:
+            wait_time = 0.5 * (2 ** attempt)
+            print(f"[-] File locked (attempt {attempt + 1}/{max_retries}). Retrying in {wait_time}s...")
+            time.sleep(wait_time)
+    
+    print(f"[!] WARNING: Could not fully clean directory after {max_retries} attempts.")
+    print(f"    Files may persist in: {directory}")
+    return False
+
+
 # =============================================================================
 # GENERAL UTILITIES
 # =============================================================================
@@ -20,15 +20,21 @@ import random
 import os
 import gc
 import json
+import wave
+import functools
+import numpy as np
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Union, Any, Tuple, Callable, Hashable, Iterable, Iterator
 
 # Local imports
 from src.googlev4 import GoogleTranslator
+from src.model_registry import ModelRegistry, WHISPER_SIZE_GB
+from src.metrics import RunMetrics, track_call
 from src.core_utils import (
     ModelLoadError, TranscriptionError, TranslationError, TTSError, 
-    AudioProcessingError, handle_error, safe_execute, get_duration, 
+    AudioProcessingError, ValidationError, handle_error, safe_execute, get_duration, 
     run_ffmpeg_command, ProgressTracker, validate_audio_file, safe_file_delete
 )
 
@@ -54,9 +60,46 @@ for directory_path in [CACHE_DIR, OUTPUT_DIR, TEMP_DIR]:
 # Audio processing settings
 SAMPLE_RATE = 24000
 AUDIO_CHANNELS = 1
-ASR_MODEL = "base"
+ASR_SAMPLE_RATE = 16000      # Whisper's native rate; ASR audio is stored as 16 kHz mono PCM
 DEFAULT_VOICE = "en-US-AriaNeural"
 
+# Speech recognition settings (see resolve_asr_options)
+ASR_PRESET = os.getenv("DUB_ASR_PRESET", "default")          # "auto" sizes the settings to the machine
+ASR_MODEL = os.getenv("DUB_ASR_MODEL", "base")
+ASR_COMPUTE_TYPE = os.getenv("DUB_ASR_COMPUTE_TYPE", "auto")  # auto = float16 on GPU, int8 on CPU
+ASR_CPU_THREADS = int(os.getenv("DUB_ASR_CPU_THREADS", "0"))  # 0 = faster-whisper default
+ASR_NUM_WORKERS = int(os.getenv("DUB_ASR_NUM_WORKERS", "1"))  # Concurrent transcriptions per loaded model
+ASR_BEAM_SIZE = int(os.getenv("DUB_ASR_BEAM_SIZE", "5"))      # 1 = greedy decoding, fastest
+ASR_BEST_OF = int(os.getenv("DUB_ASR_BEST_OF", "5"))          # Candidates sampled at non-zero temperature
+ASR_BATCH_SIZE = int(os.getenv("DUB_ASR_BATCH_SIZE", "0"))    # Speech windows decoded per batch, 0 = sequential
+ASR_SHARDS = int(os.getenv("DUB_ASR_SHARDS", "0"))            # Worker processes for long CPU audio, 0 = one process
+ASR_SHARD_MIN_SECONDS = 300  # Shortest shard; shorter audio is split into fewer shards
+ASR_SHARD_OVERLAP = 1.0      # Seconds a shard extends past each of its cut points
+ASR_VAD = os.getenv("DUB_ASR_VAD", "1").lower() not in ("0", "false", "no", "off")  # Decode speech regions only
+ASR_VAD_THRESHOLD = float(os.getenv("DUB_ASR_VAD_THRESHOLD", "0.5"))        # Speech probability cut-off
+ASR_VAD_MIN_SILENCE_MS = int(os.getenv("DUB_ASR_VAD_MIN_SILENCE_MS", "2000"))  # Shorter pauses stay in a region
+ASR_VAD_SPEECH_PAD_MS = int(os.getenv("DUB_ASR_VAD_SPEECH_PAD_MS", "400"))  # Padding kept around each region
+
+# TTS concurrency settings
+TTS_CONCURRENCY = 4          # Max in-flight Edge TTS requests
+TTS_MAX_RETRIES = 3          # Attempts per chunk before giving up
+TTS_BACKOFF_BASE = 0.5       # First delay (seconds) after an error
+TTS_BACKOFF_MAX = 30.0       # Upper bound for the shared delay
+
+# Streaming pipeline settings
+STREAM_QUEUE_SIZE = 16       # Max chunks buffered between two stages
+FIT_WORKERS = 2              # Parallel FFmpeg audio-fitting workers
+
+# Media cache settings
+CACHE_MAX_GB = float(os.getenv("DUB_CACHE_MAX_GB", "20"))  # LRU byte cap, 0 = unlimited
+METADATA_TTL_HOURS = float(os.getenv("DUB_METADATA_TTL_HOURS", "24"))  # 0 = always re-fetch
+TRANSCRIPT_CACHE = os.getenv("DUB_TRANSCRIPT_CACHE", "1").lower() not in ("0", "false", "no", "off")  # Reuse Whisper output
+
+# Download format policy (see src.youtube.format_selector)
+VIDEO_MAX_HEIGHT = int(os.getenv("DUB_MAX_HEIGHT", "1080"))  # Tallest video fetched, 0 = no cap
+VIDEO_MAX_FPS = int(os.getenv("DUB_MAX_FPS", "0"))           # Highest frame rate fetched, 0 = no cap
+VIDEO_CODEC = os.getenv("DUB_VIDEO_CODEC", "avc")            # Preferred codec: avc, vp9, av1 or any
+
 # Load language configuration
 try:
     with open(LANG_MAP_FILE, "r", encoding="utf-8") as f:
@@ -143,6 +186,234 @@ class PipelineComponent(ABC):
         directory.mkdir(parents=True, exist_ok=True)
 
 
+class AdaptiveBackoff:
+    """Shared request delay that grows on errors and decays on success.
+    
+    All concurrent requests of a stage wait on the same delay, so a burst of
+    failures (e.g. rate limiting) slows the whole stage down instead of each
+    request retrying on its own schedule.
+    """
+    
+    def __init__(self, base_delay: float = TTS_BACKOFF_BASE, 
+                 max_delay: float = TTS_BACKOFF_MAX, decay: float = 0.5):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.decay = decay
+        self.delay = 0.0
+    
+    def on_success(self) -> None:
+        self.delay *= self.decay
+        if self.delay < 0.05:
+            self.delay = 0.0
+    
+    def on_error(self) -> None:
+        self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+    
+    async def wait(self) -> None:
+        if self.delay > 0:
+            await asyncio.sleep(self.delay)
+
+
+# =============================================================================
+# ASR AUDIO
+# =============================================================================
+
+def is_asr_audio(path: Path) -> bool:
+    """Return True if a file is a WAV in the ASR profile (16-bit PCM, mono, ASR_SAMPLE_RATE)."""
+    try:
+        with wave.open(str(path), "rb") as wav:
+            return (wav.getframerate() == ASR_SAMPLE_RATE and wav.getnchannels() == 1
+                    and wav.getsampwidth() == 2)
+    except (wave.Error, OSError, EOFError):
+        return False
+
+
+def load_asr_audio(path: Path) -> Union[np.ndarray, str]:
+    """Load ASR-profile audio as the float32 array Whisper works on.
+    
+    Whisper consumes 16 kHz mono float samples; for a WAV already in that
+    format the samples are read directly, skipping the decode and resample
+    faster-whisper would otherwise run. Other files are returned as a path
+    string for faster-whisper to decode itself.
+    """
+    if not is_asr_audio(path):
+        return str(path)
+    with wave.open(str(path), "rb") as wav:
+        frames = wav.readframes(wav.getnframes())
+    return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+
+
+# =============================================================================
+# ASR SETTINGS
+# =============================================================================
+
+ASR_OPTION_KEYS = ("model", "compute_type", "cpu_threads", "num_workers", "beam_size", "best_of",
+                   "batch_size", "shards", "vad_filter", "vad_threshold", "vad_min_silence_ms", "vad_speech_pad_ms")
+# Settings that change the transcript (the rest only change speed)
+ASR_TRANSCRIPT_KEYS = ("model", "compute_type", "beam_size", "best_of", "batch_size", "shards",
+                       "vad_filter", "vad_threshold", "vad_min_silence_ms", "vad_speech_pad_ms")
+ASR_COMPUTE_TYPES = {"default", "auto", "int8", "int8_float16", "int8_float32", "int8_bfloat16",
+                     "int16", "float16", "bfloat16", "float32"}
+
+
+def total_memory_gb() -> float:
+    """Physical memory of the machine in GB, or 0.0 if unknown."""
+    try:
+        import psutil
+        return psutil.virtual_memory().total / 1024**3
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+    except (AttributeError, ValueError, OSError):
+        return 0.0
+
+
+def auto_asr_options(device: str) -> Dict[str, Any]:
+    """Whisper settings sized to this machine (the "auto" preset).
+    
+    On GPU the model size follows the VRAM. On CPU it follows cores and
+    RAM, every core goes to the transcription, and machines with few cores
+    decode greedily (beam size 1), which is several times faster than beam
+    search at a small accuracy cost. Machines with the cores or VRAM for it
+    decode speech windows in batches.
+    """
+    if device == "cuda":
+        vram = torch.cuda.get_device_properties(0).total_memory / 1024**3
+        if vram >= 10:
+            model = "large-v3"
+        elif vram >= 5:
+            model = "medium"
+        elif vram >= 2:
+            model = "small"
+        else:
+            model = "base"
+        return {"model": model, "compute_type": "float16" if vram >= 4 else "int8_float16",
+                "cpu_threads": 0, "num_workers": 1, "beam_size": 5, "best_of": 5,
+                "batch_size": 16 if vram >= 8 else 8}
+    
+    cores = os.cpu_count() or 1
+    ram = total_memory_gb()
+    if cores >= 16 and ram >= 16:
+        model = "small"
+    elif cores >= 4 and ram >= 4:
+        model = "base"
+    else:
+        model = "tiny"
+    beam = 5 if cores >= 8 else 1
+    return {"model": model, "compute_type": "int8", "cpu_threads": cores,
+            "num_workers": 1, "beam_size": beam, "best_of": beam,
+            "batch_size": 8 if cores >= 8 else 0}
+
+
+def resolve_asr_options(device: str,
+                        options: Optional[Dict[str, Any]] = None,
+                        base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merge Whisper settings and resolve their "auto" values.
+    
+    Settings are applied in order: base (the ASR_* configuration by
+    default), the "auto" preset if selected, then the explicit options.
+    
+    Args:
+        device: 'cuda' or 'cpu'.
+        options: Overrides keyed by ASR_OPTION_KEYS; None values are
+            ignored. 'preset' may be "default" or "auto" (defaults to
+            ASR_PRESET when no base is given).
+        base: Already resolved settings to start from.
+        
+    Returns:
+        Dict with every key of ASR_OPTION_KEYS.
+        
+    Raises:
+        ValidationError: If an option is unknown or out of range.
+    """
+    options = {k: v for k, v in (options or {}).items() if v is not None}
+    preset = options.pop("preset", ASR_PRESET if base is None else "default")
+    unknown = set(options) - set(ASR_OPTION_KEYS)
+    if unknown:
+        raise ValidationError(f"Unknown ASR option(s): {', '.join(sorted(unknown))}")
+    if preset not in ("default", "auto"):
+        raise ValidationError(f"Unknown ASR preset '{preset}'. Supported: default, auto")
+    
+    settings = dict(base) if base else {
+        "model": ASR_MODEL, "compute_type": ASR_COMPUTE_TYPE, "cpu_threads": ASR_CPU_THREADS,
+        "num_workers": ASR_NUM_WORKERS, "beam_size": ASR_BEAM_SIZE, "best_of": ASR_BEST_OF,
+        "batch_size": ASR_BATCH_SIZE, "shards": ASR_SHARDS, "vad_filter": ASR_VAD, "vad_threshold": ASR_VAD_THRESHOLD,
+        "vad_min_silence_ms": ASR_VAD_MIN_SILENCE_MS, "vad_speech_pad_ms": ASR_VAD_SPEECH_PAD_MS,
+    }
+    if preset == "auto":
+        settings.update(auto_asr_options(device))
+    settings.update(options)
+    
+    if settings["compute_type"] == "auto":
+        settings["compute_type"] = "float16" if device == "cuda" else "int8"
+    if settings["compute_type"] not in ASR_COMPUTE_TYPES:
+        raise ValidationError(f"Unknown compute type '{settings['compute_type']}'. "
+                              f"Supported: {', '.join(sorted(ASR_COMPUTE_TYPES))}")
+    if not settings["model"] or not isinstance(settings["model"], str):
+        raise ValidationError("ASR model must be a model name or path")
+    for key, minimum in (("cpu_threads", 0), ("num_workers", 1), ("beam_size", 1), ("best_of", 1),
+                         ("batch_size", 0), ("shards", 0), ("vad_min_silence_ms", 0), ("vad_speech_pad_ms", 0)):
+        try:
+            settings[key] = int(settings[key])
+        except (TypeError, ValueError):
+            raise ValidationError(f"ASR option {key} must be an integer: {settings[key]!r}") from None
+        if settings[key] < minimum:
+            raise ValidationError(f"ASR option {key} must be at least {minimum}")
+    if not isinstance(settings["vad_filter"], bool):
+        raise ValidationError(f"ASR option vad_filter must be true or false: {settings['vad_filter']!r}")
+    try:
+        settings["vad_threshold"] = float(settings["vad_threshold"])
+    except (TypeError, ValueError):
+        raise ValidationError(f"ASR option vad_threshold must be a number: {settings['vad_threshold']!r}") from None
+    if not 0 < settings["vad_threshold"] < 1:
+        raise ValidationError("ASR option vad_threshold must be between 0 and 1")
+    if settings["batch_size"] and not settings["vad_filter"]:
+        raise ValidationError("Batched transcription splits the audio at speech regions and needs VAD; "
+                              "set batch_size to 0 or enable vad_filter")
+    return settings
+
+
+def whisper_segments(model: Any, audio: Union[np.ndarray, str],
+                     options: Dict[str, Any]) -> Iterator[Dict]:
+    """Run a loaded WhisperModel over audio with resolved ASR settings.
+    
+    Args:
+        model: faster_whisper.WhisperModel.
+        audio: Samples from load_asr_audio() or a path to decode.
+        options: Settings from resolve_asr_options().
+        
+    Returns:
+        Iterator of {'start', 'end', 'text'} segments, produced as
+        faster-whisper decodes them.
+    """
+    vad_parameters = None
+    if options['vad_filter']:
+        vad_parameters = {
+            'threshold': options['vad_threshold'],
+            'min_silence_duration_ms': options['vad_min_silence_ms'],
+            'speech_pad_ms': options['vad_speech_pad_ms'],
+        }
+    decoder, batch_args = model, {}
+    if options['batch_size']:
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            decoder = BatchedInferencePipeline(model=model)
+            batch_args = {'batch_size': options['batch_size']}
+            print(f"[*] Batched decoding: {options['batch_size']} windows per batch")
+        except ImportError:
+            print(f"[!] WARNING: Installed faster-whisper has no batched inference "
+                  f"(needs 1.1+), decoding sequentially")
+    segments, info = decoder.transcribe(audio, word_timestamps=False, language=None,
+                                        beam_size=options['beam_size'], best_of=options['best_of'],
+                                        vad_filter=options['vad_filter'], vad_parameters=vad_parameters,
+                                        **batch_args)
+    if options['vad_filter'] and getattr(info, 'duration', None):
+        print(f"[*] VAD: decoding {info.duration_after_vad:.0f}s of speech "
+              f"out of {info.duration:.0f}s of audio")
+    return ({'start': s.start, 'end': s.end, 'text': s.text.strip()} for s in segments)
+
+
 # =============================================================================
 # MAIN AI/ML ENGINE
 # =============================================================================
@@ -150,14 +421,35 @@ class PipelineComponent(ABC):
 class Engine(PipelineComponent):
     """Central AI/ML engine for YouTube Auto Dub pipeline."""
     
-    def __init__(self, device: Optional[str] = None, hf_token: Optional[str] = None):
+    def __init__(self, 
+                 device: Optional[str] = None, 
+                 hf_token: Optional[str] = None,
+                 registry: Optional[ModelRegistry] = None,
+                 asr_options: Optional[Dict[str, Any]] = None):
+        """Initialize the engine.
+        
+        Args:
+            device: 'cuda' or 'cpu'; auto-detected when None.
+            hf_token: Hugging Face token for Pyannote.
+            registry: Optional process-wide model registry. When given, models
+                are shared and kept warm by the registry instead of being
+                loaded per engine and released after each call.
+            asr_options: Whisper settings overriding the ASR_* configuration
+                (see resolve_asr_options).
+            
+        Raises:
+            ValidationError: If asr_options are invalid.
+        """
         device_manager = DeviceManager(device)
         config_manager = ConfigManager()
         super().__init__(device_manager, config_manager)
         
+        self.asr_options = resolve_asr_options(device_manager.device, asr_options)
         self._asr = None
+        self._asr_key: Optional[Tuple] = None
         self._separator = None
         self._diarizer = None
+        self.registry = registry
         self.hf_token = hf_token or self._get_huggingface_token()
         self.translator = GoogleTranslator()
         
@@ -165,35 +457,100 @@ class Engine(PipelineComponent):
     
     def _get_huggingface_token(self) -> Optional[str]:
         return os.getenv('HF_TOKEN')
+    
+    def _load_asr(self, options: Dict[str, Any]):
+        print(f"[*] Loading Whisper model ({options['model']}, {options['compute_type']}) on {self.device}...")
+        try:
+            from faster_whisper import WhisperModel
+            model = WhisperModel(
+                options['model'], device=self.device, compute_type=options['compute_type'],
+                cpu_threads=options['cpu_threads'], num_workers=options['num_workers']
+            )
+            print(f"[+] Whisper model loaded successfully")
+            return model
+        except Exception as e:
+            raise ModelLoadError(f"Failed to load Whisper model: {e}") from e
+    
+    def _load_separator(self):
+        from src.audio_separation import AudioSeparator
+        return AudioSeparator(device_manager=self.device_manager)
+    
+    def _load_diarizer(self):
+        from src.speaker_diarization import SpeakerDiarizer
+        return SpeakerDiarizer(
+            device_manager=self.device_manager, 
+            hf_token=self.hf_token
+        )
+    
+    def _asr_model_key(self, options: Dict[str, Any]) -> Tuple:
+        """Identity of a loaded Whisper model: the settings WhisperModel() takes."""
+        return ("whisper", options['model'], self.device, options['compute_type'],
+                options['cpu_threads'], options['num_workers'])
+    
+    def _model_spec(self, name: str,
+                    asr_options: Optional[Dict[str, Any]] = None) -> Tuple[Hashable, Callable[[], Any], float]:
+        """Registry key, loader and estimated size (GB) of a component."""
+        if name == 'asr':
+            options = asr_options or self.asr_options
+            return (self._asr_model_key(options), functools.partial(self._load_asr, options),
+                    WHISPER_SIZE_GB.get(options['model'], 1.0))
+        if name == 'separator':
+            return ("demucs", self.device), self._load_separator, 1.0
+        if name == 'diarizer':
+            return ("pyannote", self.device), self._load_diarizer, 0.5
+        raise ValueError(f"Unknown model component: {name}")
+    
+    @contextmanager
+    def _use_model(self, name: str, asr_options: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Yield a component, pinned in the registry while the block runs."""
+        if self.registry:
+            with self.registry.lease(*self._model_spec(name, asr_options)) as model:
+                yield model
+        elif name == 'asr':
+            yield self._get_asr(asr_options or self.asr_options)
+        else:
+            yield getattr(self, {'separator': 'separator', 'diarizer': 'diarizer'}[name])
+    
+    def _get_asr(self, options: Dict[str, Any]):
+        """Whisper model for the given settings, reloaded when they change."""
+        if self.registry:
+            return self.registry.get(*self._model_spec('asr', options))
+        key = self._asr_model_key(options)
+        if self._asr and self._asr_key != key:
+            self.release_memory('asr')
+        if not self._asr:
+            self._asr = self._load_asr(options)
+            self._asr_key = key
+        return self._asr
             
     @property
     def asr_model(self):
-        if not self._asr:
-            print(f"[*] Loading Whisper model ({ASR_MODEL}) on {self.device}...")
-            try:
-                from faster_whisper import WhisperModel
-                compute_type = "float16" if self.device == "cuda" else "int8"
-                self._asr = WhisperModel(ASR_MODEL, device=self.device, compute_type=compute_type)
-                print(f"[+] Whisper model loaded successfully")
-            except Exception as e:
-                raise ModelLoadError(f"Failed to load Whisper model: {e}") from e
-        return self._asr
+        return self._get_asr(self.asr_options)
+    
+    def resolve_asr(self, asr_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """This engine's Whisper settings with per-call overrides applied.
+        
+        Raises:
+            ValidationError: If the overrides are invalid.
+        """
+        if not asr_options:
+            return self.asr_options
+        return resolve_asr_options(self.device, asr_options, base=self.asr_options)
 
     @property
     def separator(self):
+        if self.registry:
+            return self.registry.get(*self._model_spec('separator'))
         if not self._separator:
-            from src.audio_separation import AudioSeparator
-            self._separator = AudioSeparator(device_manager=self.device_manager)
+            self._separator = self._load_separator()
         return self._separator
     
     @property
     def diarizer(self):
+        if self.registry:
+            return self.registry.get(*self._model_spec('diarizer'))
         if not self._diarizer:
-            from src.speaker_diarization import SpeakerDiarizer
-            self._diarizer = SpeakerDiarizer(
-                device_manager=self.device_manager, 
-                hf_token=self.hf_token
-            )
+            self._diarizer = self._load_diarizer()
         return self._diarizer
     
     def _get_lang_config(self, lang: str) -> Dict:
@@ -203,7 +560,11 @@ class Engine(PipelineComponent):
         return self.config_manager.extract_voice(voice_data)
 
     def release_memory(self, component: Optional[str] = None) -> None:
-        """Release VRAM and clean up GPU memory."""
+        """Release VRAM and clean up GPU memory.
+        
+        Models owned by a ModelRegistry are never held here, so this is a
+        no-op for them; the registry evicts them on idle timeout or budget.
+        """
         components = []
         if component in [None, 'asr'] and self._asr:
             components.append(('asr', self._asr))
@@ -225,60 +586,126 @@ class Engine(PipelineComponent):
         if components:
             self.device_manager.clear_cache()
 
-    def transcribe_safe(self, audio_path: Path) -> List[Dict]:
+    def transcribe_safe(self, audio_path: Path,
+                        asr_options: Optional[Dict[str, Any]] = None,
+                        metrics: Optional[RunMetrics] = None) -> List[Dict]:
         """Transcribe audio with automatic memory management."""
         try:
-            res = self.transcribe(audio_path)
+            res = self.transcribe(audio_path, asr_options, metrics)
             self.release_memory('asr')
             return res
         except Exception as e:
             handle_error(e, "transcription")
             raise TranscriptionError(f"Transcription failed: {e}") from e
 
-    def translate_safe(self, texts: List[str], target_lang: str) -> List[str]:
+    def transcribe_stream_safe(self, audio_path: Path,
+                               asr_options: Optional[Dict[str, Any]] = None,
+                               metrics: Optional[RunMetrics] = None) -> Iterator[Dict]:
+        """Stream segments with the memory management of transcribe_safe."""
+        try:
+            yield from self.transcribe_stream(audio_path, asr_options, metrics)
+            self.release_memory('asr')
+        except Exception as e:
+            handle_error(e, "transcription")
+            raise TranscriptionError(f"Transcription failed: {e}") from e
+
+    def translate_safe(self, texts: List[str], target_lang: str,
+                       metrics: Optional[RunMetrics] = None) -> List[str]:
         """Translate texts safely."""
         self.release_memory()
-        return self.translate(texts, target_lang)
+        return self.translate(texts, target_lang, metrics)
 
-    def transcribe(self, audio_path: Path) -> List[Dict]:
-        segments, _ = self.asr_model.transcribe(str(audio_path), word_timestamps=False, language=None)
-        return [{'start': s.start, 'end': s.end, 'text': s.text.strip()} for s in segments]
+    def transcribe(self, audio_path: Path,
+                   asr_options: Optional[Dict[str, Any]] = None,
+                   metrics: Optional[RunMetrics] = None) -> List[Dict]:
+        """Transcribe audio with Whisper.
+        
+        Args:
+            audio_path: WAV file, ideally in the ASR profile (see load_asr_audio).
+            asr_options: Per-call overrides of the engine's Whisper settings
+                (see resolve_asr_options); a different model, compute type
+                or thread setting loads (or leases) a matching model.
+            metrics: Optional run metrics receiving per-shard timings.
+        
+        With vad_filter, a Silero VAD pre-pass finds the speech regions and
+        only those are decoded, so intros, music beds and long pauses cost
+        nothing and cannot produce hallucinated text. Segment timestamps
+        still refer to the original audio.
+        
+        With batch_size, the speech regions are merged into windows of up
+        to 30 seconds that are decoded batch_size at a time by
+        faster-whisper's BatchedInferencePipeline, which keeps many cores
+        (or the GPU) busy instead of decoding one window after another.
+        
+        With shards on CPU, long audio is split at silence and decoded by
+        a pool of worker processes (see src.asr_shards).
+        """
+        return list(self.transcribe_stream(audio_path, asr_options, metrics))
 
-    def translate(self, texts: List[str], target_lang: str) -> List[str]:
+    def transcribe_stream(self, audio_path: Path,
+                          asr_options: Optional[Dict[str, Any]] = None,
+                          metrics: Optional[RunMetrics] = None) -> Iterator[Dict]:
+        """Yield segments as Whisper decodes them (see transcribe).
+        
+        The model stays leased until the iterator is exhausted or closed.
+        Sharded transcription yields its segments only once every shard
+        has finished.
+        """
+        options = self.resolve_asr(asr_options)
+        if options['shards'] > 1:
+            if self.device != "cpu":
+                print(f"[*] Sharded transcription is CPU-only, decoding on {self.device} in one process")
+            else:
+                from src.asr_shards import transcribe_sharded
+                segments = transcribe_sharded(Path(audio_path), options, metrics)
+                if segments is not None:
+                    yield from segments
+                    return
+        with self._use_model('asr', options) as model:
+            yield from whisper_segments(model, load_asr_audio(audio_path), options)
+
+    def translate(self, texts: List[str], target_lang: str,
+                  metrics: Optional[RunMetrics] = None) -> List[str]:
         if not texts: return []
         results = []
         print(f"[*] Translating {len(texts)} segments to '{target_lang}'...")
         
         for i, text in enumerate(texts):
             try:
-                if not text.strip():
-                    results.append("")
-                    continue
-                
-                translated = self.translator.translate(text, target=target_lang)
-                if translated.startswith(("Error:", "Parse Error:")):
-                    results.append(text)
-                else:
-                    results.append(translated)
-                
-                time.sleep(random.uniform(0.1, 0.5))
+                results.append(self.translate_text(text, target_lang, metrics))
+                if text.strip():
+                    time.sleep(random.uniform(0.1, 0.5))
             except Exception as e:
                 handle_error(e, "translation")
                 raise TranslationError(f"Translation failed: {e}") from e
                 
         return results
 
+    def translate_text(self, text: str, target_lang: str,
+                       metrics: Optional[RunMetrics] = None) -> str:
+        """Translate a single text, falling back to the source on soft errors."""
+        if not text.strip():
+            return ""
+        
+        with track_call(metrics, "google_translate") as call:
+            translated = self.translator.translate(text, target=target_lang)
+            if translated.startswith(("Error:", "Parse Error:")):
+                call["ok"] = False
+                return text
+        return translated
+
+    def resolve_voice(self, target_lang: str, gender: str) -> str:
+        """Return the Edge TTS voice name for a language and gender."""
+        voices = self._get_lang_config(target_lang).get('voices', {})
+        return self._extract_voice_string(voices.get(gender))
+
     def synthesize(self, text: str, target_lang: str, gender: str, out_path: Path) -> None:
         """Synthesize speech. Handles both List and String voice configs."""
         if not text.strip(): raise ValueError("Text empty")
         out_path.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            lang_cfg = self._get_lang_config(target_lang)
-            voices = lang_cfg.get('voices', {})
-            
-            raw_voice = voices.get(gender)
-            voice = self._extract_voice_string(raw_voice)
+            voice = self.resolve_voice(target_lang, gender)
             
             asyncio.run(edge_tts.Communicate(text, voice=voice).save(str(out_path)))
             
@@ -290,6 +717,103 @@ class Engine(PipelineComponent):
             handle_error(e, "TTS synthesis")
             raise TTSError(f"TTS failed: {e}") from e
 
+    def synthesize_batch(
+        self,
+        items: List[Tuple[str, Path]],
+        target_lang: str,
+        gender: str,
+        max_concurrency: int = TTS_CONCURRENCY,
+        max_retries: int = TTS_MAX_RETRIES,
+        on_result: Optional[Callable[[int, Optional[Path]], None]] = None,
+        metrics: Optional[RunMetrics] = None
+    ) -> List[Optional[Path]]:
+        """Synthesize many chunks concurrently on a single event loop.
+        
+        Args:
+            items: (text, out_path) pairs, in chunk order.
+            target_lang: Target language code used for voice selection.
+            gender: Preferred voice gender.
+            max_concurrency: Cap on in-flight Edge TTS requests.
+            max_retries: Attempts per chunk before it is marked as failed.
+            on_result: Optional callback invoked as (index, path_or_None)
+                whenever a chunk finishes, in completion order.
+            metrics: Optional collector for per-request Edge TTS timings.
+                
+        Returns:
+            List aligned with `items`: the output path on success, None on failure.
+        """
+        if not items:
+            return []
+        voice = self.resolve_voice(target_lang, gender)
+        print(f"[*] Synthesizing {len(items)} chunks with {voice} "
+              f"({max_concurrency} concurrent requests)...")
+        return asyncio.run(self._synthesize_batch_async(
+            items, voice, max_concurrency, max_retries, on_result, metrics
+        ))
+
+    async def _synthesize_batch_async(
+        self,
+        items: List[Tuple[str, Path]],
+        voice: str,
+        max_concurrency: int,
+        max_retries: int,
+        on_result: Optional[Callable[[int, Optional[Path]], None]],
+        metrics: Optional[RunMetrics] = None
+    ) -> List[Optional[Path]]:
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        backoff = AdaptiveBackoff()
+        results: List[Optional[Path]] = [None] * len(items)
+        
+        async def worker(index: int, text: str, out_path: Path) -> None:
+            async with semaphore:
+                results[index] = await self.synthesize_async(
+                    text, voice, out_path, backoff, max_retries, metrics
+                )
+            if on_result:
+                on_result(index, results[index])
+        
+        await asyncio.gather(*(
+            worker(i, text, out_path) for i, (text, out_path) in enumerate(items)
+        ))
+        return results
+
+    async def synthesize_async(
+        self, 
+        text: str, 
+        voice: str, 
+        out_path: Path, 
+        backoff: AdaptiveBackoff, 
+        max_retries: int = TTS_MAX_RETRIES,
+        metrics: Optional[RunMetrics] = None
+    ) -> Optional[Path]:
+        """Synthesize one chunk, retrying under a shared backoff.
+        
+        Returns:
+            The output path on success, None if the text is empty or all
+            attempts failed.
+        """
+        if not text or not text.strip():
+            return None
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        last_error = None
+        for attempt in range(max_retries):
+            await backoff.wait()
+            try:
+                with track_call(metrics, "edge_tts"):
+                    await edge_tts.Communicate(text, voice=voice).save(str(out_path))
+                    if not validate_audio_file(out_path):
+                        raise AudioProcessingError("TTS file invalid")
+                backoff.on_success()
+                return out_path
+            except Exception as e:
+                last_error = e
+                safe_file_delete(out_path)
+                backoff.on_error()
+        
+        print(f"\n[!] TTS failed for {out_path.name} after {max_retries} attempts: {last_error}")
+        return None
+
     def synthesize_multi_speaker(
         self, 
         text: str, 
@@ -337,14 +861,20 @@ class Engine(PipelineComponent):
     def analyze_speakers(self, audio_path: Path, min_speakers: int = 1, max_speakers: int = 8) -> Dict:
         """Wrapper for diarization."""
         try:
-            return self.diarizer.diarize_audio(audio_path, min_speakers, max_speakers)
+            with self._use_model('diarizer') as diarizer:
+                return diarizer.diarize_audio(audio_path, min_speakers, max_speakers)
         finally:
             self.release_memory('diarizer')
 
-    def separate_audio(self, audio_path: Path, output_dir: Optional[Path] = None) -> Dict:
-        """Wrapper for separation."""
+    def separate_audio(self, audio_path: Path, work_dir: Path) -> Dict:
+        """Wrapper for separation.
+        
+        Stems are written to the caller's work directory rather than next to
+        the (shared, cached) source audio, so concurrent jobs cannot collide.
+        """
         try:
-            return self.separator.separate_audio(audio_path, output_dir)
+            with self._use_model('separator') as separator:
+                return separator.separate_audio(audio_path, work_dir)
         finally:
             self.release_memory('separator')
 
@@ -395,13 +925,17 @@ class TranscriptChunker:
         return chunks
 
 
-def smart_chunk(segments: List[Dict], max_dur: float = 10.0, min_gap: float = 0.5) -> List[Dict]:
-    """Smart chunking logic."""
-    if not segments: return []
-    chunks = []
-    curr = segments[0].copy()
+def iter_chunks(segments: Iterable[Dict], max_dur: float = 10.0, min_gap: float = 0.5) -> Iterator[Dict]:
+    """Incremental smart chunking over a possibly lazy stream of segments.
     
-    for next_seg in segments[1:]:
+    A chunk is yielded as soon as the next segment does not merge into it,
+    so chunks come out while Whisper is still decoding.
+    """
+    curr = None
+    for next_seg in segments:
+        if curr is None:
+            curr = next_seg.copy()
+            continue
         gap = next_seg['start'] - curr['end']
         dur = curr['end'] - curr['start']
         
@@ -409,9 +943,16 @@ def smart_chunk(segments: List[Dict], max_dur: float = 10.0, min_gap: float = 0.
             curr['end'] = next_seg['end']
             curr['text'] += " " + next_seg['text']
         else:
-            chunks.append(curr)
+            yield curr
             curr = next_seg.copy()
     
-    chunks.append(curr)
+    if curr is not None:
+        yield curr
+
+
+def smart_chunk(segments: List[Dict], max_dur: float = 10.0, min_gap: float = 0.5) -> List[Dict]:
+    """Smart chunking logic."""
+    if not segments: return []
+    chunks = list(iter_chunks(segments, max_dur, min_gap))
     print(f"[*] Smart chunking: {len(segments)} -> {len(chunks)}")
     return chunks
\ No newline at end of file
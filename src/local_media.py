@@ -0,0 +1,239 @@
+"""
+Local Media Input Module for YouTube Auto Dub.
+
+Lets the pipeline dub media files that are already on disk (local or
+network storage) without touching YouTube or the network:
+- Probing the file for its video and audio streams with FFprobe
+- Producing the render video and the transcription WAV in one FFmpeg pass
+- Storing both in the media cache, keyed by the file's identity, so a
+  re-run of the same file reuses them
+
+LocalMedia offers the same interface as src.youtube.MediaDownload, so the
+rest of the pipeline does not care where the media came from.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import contextlib
+import hashlib
+import json
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+# Local imports
+from src.engines import ASR_SAMPLE_RATE, is_asr_audio
+from src.cache import media_cache, clip_key
+
+# Video codecs that can be stream-copied into the MP4 used for rendering
+MP4_COPY_CODECS = {"h264", "hevc", "av1", "vp9", "mpeg4"}
+
+
+def is_local_path(value: str) -> bool:
+    """Return True if a CLI/API input names an existing local file rather than a URL."""
+    if re.match(r"^[a-z][a-z0-9+.-]*://", value, re.IGNORECASE):
+        return False
+    return Path(value).expanduser().is_file()
+
+
+def probe_media(path: Path) -> Dict[str, Any]:
+    """Read duration and stream codecs of a media file with FFprobe.
+
+    Returns:
+        Dict with 'duration' (seconds or None), 'video_codec' and
+        'audio_codec' (None when the stream is missing).
+
+    Raises:
+        RuntimeError: If FFprobe cannot read the file.
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'stream=codec_type,codec_name:format=duration',
+        '-of', 'json',
+        str(path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
+        data = json.loads(result.stdout or "{}")
+    except (subprocess.SubprocessError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"Could not probe media file {path}: {e}") from e
+
+    def codec(kind: str) -> Optional[str]:
+        return next((s.get("codec_name") for s in data.get("streams", [])
+                     if s.get("codec_type") == kind), None)
+
+    duration = data.get("format", {}).get("duration")
+    return {
+        "duration": float(duration) if duration else None,
+        "video_codec": codec("video"),
+        "audio_codec": codec("audio"),
+    }
+
+
+def _source_key(path: Path) -> str:
+    """Cache key of a local file: its name plus a hash of path, size and mtime."""
+    stat = path.stat()
+    identity = f"{path}|{stat.st_size}|{int(stat.st_mtime)}"
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:8]
+    name = re.sub(r"[^A-Za-z0-9_-]+", "_", path.stem).strip("_")[:48] or "media"
+    return f"{name}_{digest}"
+
+
+def prepare_local_media(path: Path,
+                        start: Optional[float] = None,
+                        end: Optional[float] = None,
+                        pin: bool = False) -> Tuple[Path, Path]:
+    """Turn a local media file into the pipeline's video and WAV inputs.
+
+    A single FFmpeg pass reads the source once and writes both outputs:
+    the video stream (stream-copied when MP4 can hold it, so the render
+    source is on local disk and in a container the renderer accepts) and
+    the 16 kHz mono PCM WAV for transcription. With start/end only that section is
+    read; the clip is re-encoded so the cuts are frame-accurate, and both
+    outputs start at zero.
+
+    Args:
+        path: Source media file with at least one video and one audio stream.
+        start: Clip start in seconds; None for the beginning.
+        end: Clip end in seconds; None for the end of the file.
+        pin: Protect the returned files from cache eviction until
+            media_cache.unpin(path.stem) is called.
+
+    Returns:
+        (video_path, audio_path) in the media cache.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file lacks a video or audio stream, or the
+            range is outside the file.
+        RuntimeError: If FFprobe or FFmpeg fails.
+    """
+    path = Path(path).expanduser().resolve()
+    if not path.is_file():
+        raise FileNotFoundError(f"Media file not found: {path}")
+
+    info = probe_media(path)
+    if not info["video_codec"]:
+        raise ValueError(f"No video stream in {path.name}; a video is needed to render the dub")
+    if not info["audio_codec"]:
+        raise ValueError(f"No audio stream in {path.name}; nothing to transcribe")
+
+    clip = start is not None or end is not None
+    start = start or 0.0
+    duration = info["duration"]
+    if duration and start >= duration:
+        raise ValueError(f"Clip start ({start}s) is beyond the media length ({duration:.1f}s)")
+    if end is not None and end <= start:
+        raise ValueError(f"Clip end ({end}s) must be after its start ({start}s)")
+    if end is not None and duration and end > duration:
+        end = None
+    clip = clip and (start > 0 or end is not None)
+    if end is not None:
+        length = end - start
+    else:
+        length = duration - start if duration else None
+
+    key = clip_key(_source_key(path), start, end) if clip else _source_key(path)
+    print(f"[*] Local media: {path}")
+    print(f"    Codecs: video={info['video_codec']}, audio={info['audio_codec']}, "
+          f"duration={duration or 0:.1f}s")
+
+    with media_cache.lock(key):
+        video_path = media_cache.get(key, f"{key}.mp4")
+        audio_path = media_cache.get(key, f"{key}.wav")
+        if audio_path is not None and not is_asr_audio(audio_path):
+            audio_path = None  # Prepared by an older version at the TTS sample rate
+        if video_path is None or audio_path is None:
+            with media_cache.temp_dir(key) as tmp_dir:
+                tmp_video, tmp_audio = tmp_dir / "video.mp4", tmp_dir / "audio.wav"
+                copy_video = not clip and info["video_codec"] in MP4_COPY_CODECS
+                _extract_local(path, tmp_video, tmp_audio, start,
+                               length if end is not None else None, copy_video)
+                video_path = media_cache.put(key, f"{key}.mp4", tmp_video, length)
+                audio_path = media_cache.put(key, f"{key}.wav", tmp_audio, length)
+        else:
+            print(f"[*] Local media already prepared: {video_path.name}")
+        if pin:
+            media_cache.pin(key)
+
+    print(f"[+] Video ready: {video_path}")
+    print(f"[+] Audio ready: {audio_path}")
+    return video_path, audio_path
+
+
+def _extract_local(src_path: Path, video_out: Path, audio_out: Path,
+                   start: Optional[float], length: Optional[float], copy_video: bool) -> None:
+    """Write the video-only MP4 and the PCM WAV of a source in one FFmpeg run."""
+    cmd = ['ffmpeg', '-y', '-v', 'error']
+    if start:
+        cmd += ['-ss', f"{start:.3f}"]
+    if length is not None:
+        cmd += ['-t', f"{length:.3f}"]
+    cmd += ['-i', str(src_path)]
+
+    # Output 1: video stream only; the dubbed audio is added at render time
+    cmd += ['-map', '0:v:0', '-an', '-sn', '-dn']
+    if copy_video:
+        cmd += ['-c:v', 'copy']
+    else:
+        cmd += ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20', '-pix_fmt', 'yuv420p']
+    cmd += ['-movflags', '+faststart', str(video_out)]
+
+    # Output 2: transcription audio in the ASR profile (16-bit mono at Whisper's rate)
+    cmd += ['-map', '0:a:0', '-vn', '-c:a', 'pcm_s16le', '-ac', '1', '-ar', str(ASR_SAMPLE_RATE),
+            str(audio_out)]
+
+    mode = "copying video" if copy_video else "re-encoding video"
+    print(f"[*] Extracting video and audio in one FFmpeg pass ({mode})...")
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=3600)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"FFmpeg timeout preparing {src_path}")
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg failed to prepare {src_path.name}: {error_msg}")
+
+
+class LocalMedia:
+    """Local counterpart of src.youtube.MediaDownload.
+
+    Preparation runs in the constructor (one local FFmpeg pass), so audio()
+    and result() return immediately. The files stay pinned in the media
+    cache until release() is called.
+    """
+
+    def __init__(self,
+                 path: Path,
+                 hold: Optional[Callable[[], ContextManager]] = None,
+                 start: Optional[float] = None,
+                 end: Optional[float] = None):
+        """Prepare the media.
+
+        Args:
+            path: Local media file.
+            hold: Optional context manager factory held while preparing,
+                e.g. a metrics stage.
+            start: Clip start in seconds (see prepare_local_media).
+            end: Clip end in seconds (see prepare_local_media).
+        """
+        self._released = False
+        with (hold() if hold else contextlib.nullcontext()):
+            self._result = prepare_local_media(path, start, end, pin=True)
+
+    def audio(self) -> Path:
+        return self._result[1]
+
+    def captions(self) -> Optional[List[Dict]]:
+        """Local files have no online captions; use a caption file instead."""
+        return None
+
+    def result(self) -> Tuple[Path, Path]:
+        return self._result
+
+    def release(self) -> None:
+        """Unpin the prepared files so the cache may evict them again."""
+        if not self._released:
+            self._released = True
+            media_cache.unpin(self._result[0].stem)
@@ -23,7 +23,7 @@ from pathlib import Path
 from typing import List, Dict, Optional, Union
 
 # Import configuration for audio parameters
-from src.engines import SAMPLE_RATE, AUDIO_CHANNELS
+from src.engines import SAMPLE_RATE, AUDIO_CHANNELS, ASR_SAMPLE_RATE
 
 def get_duration(path: Path) -> float:
     """Get the duration of an audio/video file using FFprobe.
@@ -158,6 +158,116 @@ def generate_silence(duration: float, out_path: Path) -> None:
     except Exception as e:
         raise RuntimeError(f"Unexpected error generating silence: {e}")
 
+def create_base_silence(work_dir: Path, duration: float = 300.0) -> Path:
+    """Generate the base silence file used for gap filling in a work directory.
+    
+    The concat manifest references slices of this single file for every gap,
+    so it only needs to be longer than the longest gap (5 minutes by default).
+    Each job passes its own work directory, so concurrent jobs never share it.
+    
+    Args:
+        work_dir: Job or video work directory to place the file in.
+        duration: Length of the silence in seconds.
+        
+    Returns:
+        Path to the silence file (reused if it already exists).
+        
+    Raises:
+        RuntimeError: If FFmpeg fails to generate silence.
+    """
+    path = work_dir / "silence_base.wav"
+    generate_silence(duration, path)
+    return path
+
+def extract_audio(media_path: Path, out_path: Path) -> Path:
+    """Extract the audio track of a media file into the transcription WAV.
+
+    Used to derive the transcription audio from an already downloaded
+    video instead of fetching the audio stream from YouTube a second time.
+    The WAV is written in the ASR profile (16-bit PCM, mono, ASR_SAMPLE_RATE),
+    so Whisper reads it as-is without decoding or resampling.
+    The output is written to a temporary file and renamed on success, so
+    an interrupted extraction never leaves a truncated WAV behind.
+
+    Args:
+        media_path: Source video or audio file.
+        out_path: Destination WAV path.
+
+    Returns:
+        Path to the WAV file.
+
+    Raises:
+        FileNotFoundError: If the source file doesn't exist.
+        RuntimeError: If FFmpeg fails.
+    """
+    if not media_path.exists():
+        raise FileNotFoundError(f"Media file not found: {media_path}")
+
+    tmp_path = out_path.with_name(out_path.stem + ".part.wav")
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-i', str(media_path),
+        '-vn',                      # Drop the video stream
+        '-c:a', 'pcm_s16le',        # 16-bit PCM WAV
+        '-ac', '1',                 # Mono downmix
+        '-ar', str(ASR_SAMPLE_RATE),
+        str(tmp_path)
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=600)
+        tmp_path.replace(out_path)
+        return out_path
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"FFmpeg timeout extracting audio from {media_path}")
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg failed to extract audio: {error_msg}")
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def mux_streams(video_stream: Path, audio_stream: Path, out_path: Path) -> Path:
+    """Combine separately downloaded video and audio streams into one MP4.
+
+    Both streams are copied without re-encoding, which is what yt-dlp's
+    own merger does for MP4/M4A pairs.
+
+    Args:
+        video_stream: Video-only file.
+        audio_stream: Audio-only file.
+        out_path: Destination MP4 path.
+
+    Returns:
+        Path to the muxed file.
+
+    Raises:
+        RuntimeError: If FFmpeg fails.
+    """
+    tmp_path = out_path.with_name(out_path.stem + ".part.mp4")
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-i', str(video_stream),
+        '-i', str(audio_stream),
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c', 'copy',
+        '-movflags', '+faststart',
+        str(tmp_path)
+    ]
+
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, timeout=600)
+        tmp_path.replace(out_path)
+        return out_path
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"FFmpeg timeout muxing {video_stream.name}")
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg failed to mux streams: {error_msg}")
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
 def fit_audio(audio_path: Path, target_dur: float, max_speedup: float = 1.8) -> Path:
     """Fit audio duration to target duration using time-stretching.
     
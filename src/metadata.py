@@ -0,0 +1,130 @@
+"""
+Video Metadata Cache Module for YouTube Auto Dub.
+
+Keeps a persistent summary of the yt-dlp metadata of each video, so
+repeat jobs and pre-flight checks do not hit YouTube again:
+- Entries keyed by the video ID parsed from the URL, so every URL form
+  of a video (watch, youtu.be, shorts, embed) shares one entry
+- id, title, duration, uploader, language, a summary of the available
+  formats and the caption tracks
+- A configurable time-to-live (METADATA_TTL_HOURS) after which an
+  entry is fetched again
+
+Only the summary is stored; format and caption URLs expire within hours,
+so downloads always extract fresh metadata.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Local imports
+from src.engines import CACHE_DIR, METADATA_TTL_HOURS
+from src.core_utils import write_json_atomic
+
+_VIDEO_ID = re.compile(
+    r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/|/v/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])"
+)
+
+
+def video_id_from_url(url: str) -> Optional[str]:
+    """Return the 11-character video ID of a YouTube video URL, if it has one."""
+    match = _VIDEO_ID.search(url or "")
+    return match.group(1) if match else None
+
+
+def summarize_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a yt-dlp info dict to the fields worth caching."""
+    formats: List[Dict[str, Any]] = []
+    for fmt in info.get('formats') or []:
+        formats.append({
+            'format_id': fmt.get('format_id'),
+            'ext': fmt.get('ext'),
+            'height': fmt.get('height'),
+            'fps': fmt.get('fps'),
+            'vcodec': fmt.get('vcodec'),
+            'acodec': fmt.get('acodec'),
+            'tbr': fmt.get('tbr'),
+            'filesize': fmt.get('filesize') or fmt.get('filesize_approx'),
+        })
+    return {
+        'id': info.get('id'),
+        'title': info.get('title'),
+        'duration': info.get('duration'),
+        'uploader': info.get('uploader'),
+        'language': info.get('language'),
+        'formats': formats,
+        'subtitles': sorted(k for k in (info.get('subtitles') or {}) if k != 'live_chat'),
+        'automatic_captions': sorted(info.get('automatic_captions') or {}),
+        'fetched_at': time.time(),
+    }
+
+
+class MetadataCache:
+    """Persistent, TTL-bound store of video metadata summaries."""
+
+    FILE_NAME = "metadata.json"
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, ttl_hours: float = METADATA_TTL_HOURS):
+        """Initialize the cache, loading entries that have not expired.
+
+        Args:
+            cache_dir: Directory holding the metadata file.
+            ttl_hours: Entry lifetime in hours; 0 disables the cache.
+        """
+        self.ttl = ttl_hours * 3600
+        self._path = cache_dir / self.FILE_NAME
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def get(self, video_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached summary of a video, or None if missing or expired."""
+        if not video_id or self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None or self._expired(entry):
+                return None
+            return dict(entry)
+
+    def put(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Store the summary of a freshly extracted yt-dlp info dict.
+
+        Returns:
+            The stored summary.
+        """
+        summary = summarize_info(info)
+        if not summary['id'] or self.ttl <= 0:
+            return summary
+        with self._lock:
+            self._entries[summary['id']] = summary
+            self._entries = {k: e for k, e in self._entries.items() if not self._expired(e)}
+            try:
+                write_json_atomic(self._path, self._entries)
+            except OSError as e:
+                print(f"[!] WARNING: Could not save metadata cache: {e}")
+        return summary
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get('fetched_at', 0) > self.ttl
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self._path.exists():
+            return {}
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"[!] WARNING: Corrupted metadata cache, starting empty: {self._path}")
+            return {}
+        return {k: e for k, e in entries.items() if not self._expired(e)}
+
+
+# Process-wide cache used by src.youtube
+metadata_cache = MetadataCache()
@@ -0,0 +1,216 @@
+"""
+Run Metrics Module for YouTube Auto Dub.
+
+This module records where a dubbing run spends its time and memory:
+- Per-stage wall time, CPU time (own process and FFmpeg children),
+  peak RSS and item counts (download, transcribe, chunk, translate, ...)
+- Aggregated sub-timings for every external call (each Google Translate
+  request, each Edge TTS request, each FFmpeg fit) with count, total,
+  min/max and error count
+- Nested per-language metrics for multi-language runs
+
+CPU time and peak RSS are process-wide figures, so stages that run
+concurrently (several languages or batch videos) see each other's load.
+The report is plain JSON meant for comparing runs, not for profiling a
+single function.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _child_cpu_time() -> float:
+    """CPU seconds used by finished child processes (FFmpeg), if known."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+class RunMetrics:
+    """Thread-safe collector of stage timings and external call statistics."""
+
+    def __init__(self, name: str = ""):
+        """Initialize an empty collector.
+
+        Args:
+            name: Label for the run (e.g. video id or language code).
+        """
+        self.name = name
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self._children: Dict[str, "RunMetrics"] = {}
+        self.info: Dict[str, Any] = {}
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the collector was created."""
+        return time.monotonic() - self._start
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Measure a pipeline stage.
+
+        The yielded dict may be updated inside the block, e.g.
+        ``record['items'] = len(chunks)``. A stage entered more than once
+        accumulates its figures.
+
+        Args:
+            name: Stage name (download, transcribe, chunk, translate, ...).
+            items: Number of items processed, if known up front.
+        """
+        record: Dict[str, Any] = {"items": items}
+        wall_start = time.monotonic()
+        cpu_start = time.process_time()
+        child_start = _child_cpu_time()
+        status = "ok"
+        try:
+            yield record
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self._add_stage(name, {
+                "wall": time.monotonic() - wall_start,
+                "cpu": time.process_time() - cpu_start,
+                "child_cpu": _child_cpu_time() - child_start,
+                "items": record.get("items"),
+                "status": status,
+            })
+
+    @contextmanager
+    def call(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Time one external call; set ``record['ok'] = False`` on soft failures."""
+        record: Dict[str, Any] = {"ok": True}
+        start = time.monotonic()
+        try:
+            yield record
+        except BaseException:
+            record["ok"] = False
+            raise
+        finally:
+            self.record_call(name, time.monotonic() - start, record["ok"])
+
+    def record_call(self, name: str, seconds: float, ok: bool = True) -> None:
+        """Add one external call duration to the aggregate for its name."""
+        with self._lock:
+            stats = self._calls.setdefault(name, {
+                "count": 0, "errors": 0, "total": 0.0, "min": None, "max": 0.0
+            })
+            stats["count"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["total"] += seconds
+            stats["min"] = seconds if stats["min"] is None else min(stats["min"], seconds)
+            stats["max"] = max(stats["max"], seconds)
+
+    def child(self, name: str) -> "RunMetrics":
+        """Return (creating if needed) nested metrics, e.g. per language."""
+        with self._lock:
+            if name not in self._children:
+                self._children[name] = RunMetrics(name)
+            return self._children[name]
+
+    def stage_walls(self) -> Dict[str, float]:
+        """Wall seconds per top-level stage, rounded for display."""
+        with self._lock:
+            return {name: round(stage["wall"], 2) for name, stage in self._stages.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of all metrics as JSON-serializable data."""
+        with self._lock:
+            stages = {
+                name: {
+                    **{k: round(v, 3) if isinstance(v, float) else v for k, v in stage.items()},
+                    "items_per_sec": (round(stage["items"] / stage["wall"], 2)
+                                      if stage["items"] and stage["wall"] > 0 else None),
+                }
+                for name, stage in self._stages.items()
+            }
+            calls = {
+                name: {
+                    "count": c["count"],
+                    "errors": c["errors"],
+                    "total": round(c["total"], 3),
+                    "mean": round(c["total"] / c["count"], 3),
+                    "min": round(c["min"], 3),
+                    "max": round(c["max"], 3),
+                }
+                for name, c in self._calls.items()
+            }
+            children = dict(self._children)
+
+        report: Dict[str, Any] = {
+            "name": self.name,
+            "started_at": self.started_at,
+            "elapsed": round(self.elapsed, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "info": self.info,
+            "stages": stages,
+            "calls": calls,
+        }
+        if children:
+            report["children"] = {name: child.to_dict() for name, child in children.items()}
+        return report
+
+    def save(self, path: Path) -> Path:
+        """Write the report as JSON and return its path."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+    def _add_stage(self, name: str, sample: Dict[str, Any]) -> None:
+        sample["peak_rss_mb"] = peak_rss_mb()
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                self._stages[name] = dict(sample, runs=1)
+                return
+            stage["runs"] += 1
+            for key in ("wall", "cpu", "child_cpu"):
+                stage[key] += sample[key]
+            if sample["items"] is not None:
+                stage["items"] = (stage["items"] or 0) + sample["items"]
+            stage["peak_rss_mb"] = sample["peak_rss_mb"]
+            if sample["status"] == "error":
+                stage["status"] = "error"
+
+
+@contextmanager
+def track_call(metrics: Optional[RunMetrics], name: str) -> Iterator[Dict[str, Any]]:
+    """RunMetrics.call that is a no-op when no collector is given."""
+    if metrics is None:
+        yield {"ok": True}
+        return
+    with metrics.call(name) as record:
+        yield record
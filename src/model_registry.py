@@ -0,0 +1,202 @@
+"""
+Model Registry Module for YouTube Auto Dub.
+
+This module keeps heavy AI models (Whisper, Demucs, Pyannote) resident in a
+long-running process so back-to-back jobs do not pay the load cost again:
+- Models are loaded once per key and shared between Engine instances
+- In-use models are pinned by a lease and never evicted
+- Idle models are evicted after a configurable timeout
+- A memory budget evicts least-recently-used idle models when exceeded
+
+The web app keeps one registry for its lifetime. The CLI builds one with
+idle_timeout=0 (no reaper thread) in batch mode, for several URLs or a
+playlist, so Whisper stays loaded from one video to the next. A
+single-video run passes no registry and Engine falls back to its own
+per-instance load/release.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator
+
+# Approximate resident size (GB) of faster-whisper models, used for budgeting
+WHISPER_SIZE_GB = {
+    "tiny": 0.15, "base": 0.3, "small": 0.9,
+    "medium": 2.5, "large-v2": 4.5, "large-v3": 4.5, "large": 4.5,
+}
+
+
+class _Entry:
+    """A loaded model and its bookkeeping."""
+
+    def __init__(self, model: Any, size_gb: float):
+        self.model = model
+        self.size_gb = size_gb
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models with idle and budget eviction."""
+
+    def __init__(self, budget_gb: float = 6.0, idle_timeout: float = 600.0):
+        """Initialize the registry and start its idle reaper.
+
+        Args:
+            budget_gb: Soft cap on the summed estimated size of loaded models.
+            idle_timeout: Seconds a model may stay unused before eviction.
+                Use 0 to disable idle eviction.
+        """
+        self.budget_gb = budget_gb
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+        if idle_timeout > 0:
+            threading.Thread(target=self._reaper, name="model-reaper", daemon=True).start()
+
+    def get(self, key: Hashable, loader: Callable[[], Any], size_gb: float = 1.0) -> Any:
+        """Return the model for a key, loading it on first use.
+
+        The model is not pinned; prefer lease() around actual inference.
+
+        Args:
+            key: Hashable identity (e.g. ("whisper", "base", "cpu", "int8")).
+            loader: Callable that loads the model on a miss.
+            size_gb: Estimated resident size, used for budget eviction.
+        """
+        entry = self._acquire(key, loader, size_gb, pin=False)
+        return entry.model
+
+    @contextmanager
+    def lease(self, key: Hashable, loader: Callable[[], Any], size_gb: float = 1.0) -> Iterator[Any]:
+        """Pin a model for the duration of the block, loading it if needed."""
+        entry = self._acquire(key, loader, size_gb, pin=True)
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def evict(self, key: Hashable) -> bool:
+        """Evict a model if it is loaded and not in use."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.in_use > 0:
+                return False
+            del self._entries[key]
+        self._unload(key, entry)
+        return True
+
+    def clear(self) -> None:
+        """Evict every model that is not currently in use."""
+        for key in list(self._entries.keys()):
+            self.evict(key)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Loaded models with size, pin count and idle seconds."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "budget_gb": self.budget_gb,
+                "loaded_gb": round(sum(e.size_gb for e in self._entries.values()), 2),
+                "models": {
+                    str(key): {
+                        "size_gb": entry.size_gb,
+                        "in_use": entry.in_use,
+                        "idle_seconds": round(now - entry.last_used, 1),
+                    }
+                    for key, entry in self._entries.items()
+                },
+            }
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _acquire(self, key: Hashable, loader: Callable[[], Any], size_gb: float, pin: bool) -> _Entry:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.last_used = time.monotonic()
+                    if pin:
+                        entry.in_use += 1
+                    return entry
+
+                loading = self._loading.get(key)
+                if loading is None:
+                    # This thread loads the model; others wait on the event
+                    loading = threading.Event()
+                    self._loading[key] = loading
+                    break
+            loading.wait()
+
+        try:
+            self._make_room(size_gb)
+            print(f"[*] Model registry: loading {key}")
+            model = loader()
+            entry = _Entry(model, size_gb)
+            with self._lock:
+                self._entries[key] = entry
+                if pin:
+                    entry.in_use += 1
+            return entry
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.set()
+
+    def _make_room(self, size_gb: float) -> None:
+        """Evict least-recently-used idle models until size_gb fits the budget."""
+        while True:
+            with self._lock:
+                loaded = sum(e.size_gb for e in self._entries.values())
+                if loaded + size_gb <= self.budget_gb:
+                    return
+                idle = [(e.last_used, k) for k, e in self._entries.items() if e.in_use == 0]
+                if not idle:
+                    print(f"[!] WARNING: Model budget {self.budget_gb:.1f} GB exceeded; "
+                          f"all loaded models are in use")
+                    return
+                _, victim = min(idle)
+                entry = self._entries.pop(victim)
+            print(f"[*] Model registry: evicting {victim} to stay within budget")
+            self._unload(victim, entry)
+
+    def _unload(self, key: Hashable, entry: _Entry) -> None:
+        if hasattr(entry.model, 'release_memory'):
+            try:
+                entry.model.release_memory()
+            except Exception as e:
+                print(f"[!] WARNING: Failed to release {key}: {e}")
+        entry.model = None
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def _reaper(self) -> None:
+        interval = max(1.0, min(30.0, self.idle_timeout / 2))
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            with self._lock:
+                expired = [
+                    k for k, e in self._entries.items()
+                    if e.in_use == 0 and now - e.last_used > self.idle_timeout
+                ]
+            for key in expired:
+                if self.evict(key):
+                    print(f"[*] Model registry: evicted idle model {key}")
@@ -0,0 +1,409 @@
+"""
+Streaming Pipeline Module for YouTube Auto Dub.
+
+This module holds the per-chunk stages of the dubbing pipeline shared by the
+CLI and the web app:
+- Sequential helpers for TTS synthesis and audio fitting
+- A streaming mode that overlaps translation (one worker thread), TTS
+  (one asyncio event loop with bounded requests) and audio fitting
+  (a small pool of FFmpeg worker threads)
+
+In streaming mode stages are connected by bounded queues, so a chunk moves on
+to synthesis as soon as its translation returns and on to fitting as soon as
+its TTS file exists. Total wall time approaches that of the slowest stage.
+The chunks may themselves arrive lazily from a transcription in progress,
+so translation and TTS also overlap speech recognition.
+
+All helpers accept an optional CheckpointStore and skip chunks whose TTS or
+fitted audio is already checkpointed with matching inputs, and an optional
+RunMetrics collector that receives per-call timings.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import asyncio
+import itertools
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Local imports
+import src.media
+from src.engines import (
+    Engine, AdaptiveBackoff, TTS_CONCURRENCY, TTS_MAX_RETRIES,
+    STREAM_QUEUE_SIZE, FIT_WORKERS
+)
+from src.core_utils import handle_error, TranslationError, TTSError
+from src.checkpoint import CheckpointStore, file_signature
+from src.metrics import RunMetrics, track_call
+
+# Marks the end of a stage's output stream
+_DONE = object()
+
+
+# =============================================================================
+# CHECKPOINT KEYS
+# =============================================================================
+
+def _tts_key(chunk: Dict, voice: str) -> str:
+    return CheckpointStore.fingerprint(chunk['trans_text'], voice)
+
+
+def _fit_key(chunk: Dict, tts_path: Path) -> str:
+    return CheckpointStore.fingerprint(file_signature(tts_path), chunk['end'] - chunk['start'])
+
+
+def _fit_chunk(index: int, chunk: Dict, tts_path: Path,
+               checkpoints: Optional[CheckpointStore],
+               metrics: Optional[RunMetrics] = None) -> None:
+    """Fit one chunk's TTS audio to its slot, reusing a checkpoint if present."""
+    if checkpoints:
+        cached = checkpoints.get_path(f"fit/{index:04d}", _fit_key(chunk, tts_path))
+        if cached:
+            chunk['processed_audio'] = cached
+            return
+
+    slot_duration = chunk['end'] - chunk['start']
+    with track_call(metrics, "ffmpeg_fit"):
+        chunk['processed_audio'] = src.media.fit_audio(tts_path, slot_duration)
+    if checkpoints:
+        checkpoints.put_path(f"fit/{index:04d}", _fit_key(chunk, tts_path), chunk['processed_audio'])
+
+
+# =============================================================================
+# SEQUENTIAL STAGES
+# =============================================================================
+
+def synthesize_chunks(engine: Engine,
+                      chunks: List[Dict],
+                      target_lang: str,
+                      gender: str,
+                      work_dir: Path,
+                      tts_concurrency: int = TTS_CONCURRENCY,
+                      checkpoints: Optional[CheckpointStore] = None,
+                      on_result: Optional[Callable[[int, Optional[Path]], None]] = None,
+                      metrics: Optional[RunMetrics] = None
+                      ) -> List[Optional[Path]]:
+    """Synthesize TTS audio for all translated chunks.
+
+    Args:
+        engine: Engine used for TTS.
+        chunks: Chunks with a 'trans_text' key.
+        target_lang: Target language code.
+        gender: Preferred voice gender.
+        work_dir: Directory for chunk_XXXX.mp3 files.
+        tts_concurrency: Cap on in-flight Edge TTS requests.
+        checkpoints: Optional store; checkpointed chunks are not re-synthesized.
+        on_result: Optional callback invoked as (index, path_or_None).
+        metrics: Optional collector for per-request TTS timings.
+
+    Returns:
+        List aligned with `chunks`: TTS path on success, None on failure.
+    """
+    voice = engine.resolve_voice(target_lang, gender)
+    tts_paths: List[Optional[Path]] = [None] * len(chunks)
+    pending = []
+
+    for i, chunk in enumerate(chunks):
+        cached = checkpoints.get_path(f"tts/{i:04d}", _tts_key(chunk, voice)) if checkpoints else None
+        if cached:
+            tts_paths[i] = cached
+            if on_result:
+                on_result(i, cached)
+        else:
+            pending.append(i)
+
+    if checkpoints and len(pending) < len(chunks):
+        print(f"[*] Checkpoint hit: {len(chunks) - len(pending)}/{len(chunks)} TTS chunks reused")
+
+    def on_batch_result(batch_index: int, path: Optional[Path]) -> None:
+        index = pending[batch_index]
+        if path and checkpoints:
+            checkpoints.put_path(f"tts/{index:04d}", _tts_key(chunks[index], voice), path)
+        if on_result:
+            on_result(index, path)
+
+    try:
+        results = engine.synthesize_batch(
+            [(chunks[i]['trans_text'], work_dir / f"chunk_{i:04d}.mp3") for i in pending],
+            target_lang=target_lang,
+            gender=gender,
+            max_concurrency=tts_concurrency,
+            on_result=on_batch_result,
+            metrics=metrics
+        )
+    finally:
+        if checkpoints:
+            checkpoints.flush()
+    for index, path in zip(pending, results):
+        tts_paths[index] = path
+    return tts_paths
+
+
+def fit_chunks(chunks: List[Dict],
+               tts_paths: List[Optional[Path]],
+               checkpoints: Optional[CheckpointStore] = None,
+               on_result: Optional[Callable[[int, bool], None]] = None,
+               metrics: Optional[RunMetrics] = None) -> int:
+    """Fit each chunk's TTS audio to its original slot duration.
+
+    Sets 'processed_audio' on every chunk that succeeds.
+
+    Returns:
+        Number of chunks without usable audio (failed TTS or fitting).
+    """
+    failed = 0
+
+    try:
+        for i, (chunk, tts_path) in enumerate(zip(chunks, tts_paths)):
+            ok = False
+            if tts_path is not None:
+                try:
+                    _fit_chunk(i, chunk, tts_path, checkpoints, metrics)
+                    ok = True
+                except Exception as e:
+                    print(f"\n[!] Audio fitting failed for chunk {i}: {e}")
+            if not ok:
+                failed += 1
+            if on_result:
+                on_result(i, ok)
+    finally:
+        if checkpoints:
+            checkpoints.flush()
+
+    return failed
+
+
+# =============================================================================
+# STREAMING STAGES
+# =============================================================================
+
+
+class StreamingPipeline:
+    """Overlapping translate -> synthesize -> fit pipeline over chunks."""
+
+    def __init__(self,
+                 engine: Engine,
+                 target_lang: str,
+                 gender: str,
+                 work_dir: Path,
+                 tts_concurrency: int = TTS_CONCURRENCY,
+                 fit_workers: int = FIT_WORKERS,
+                 queue_size: int = STREAM_QUEUE_SIZE,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 on_progress: Optional[Callable[[str, int], None]] = None,
+                 metrics: Optional[RunMetrics] = None):
+        """Initialize the streaming pipeline.
+
+        Args:
+            engine: Engine used for translation and TTS.
+            target_lang: Target language code.
+            gender: Preferred voice gender.
+            work_dir: Directory for per-chunk TTS and fitted audio files.
+            tts_concurrency: Cap on in-flight Edge TTS requests.
+            fit_workers: Number of parallel audio-fitting threads.
+            queue_size: Max chunks buffered between two stages.
+            checkpoints: Optional store used to skip already finished work.
+            on_progress: Optional callback invoked as (stage, completed_count)
+                with stage one of 'translate', 'tts', 'fit'.
+            metrics: Optional collector for per-call translate, TTS and
+                fit timings.
+        """
+        self.engine = engine
+        self.target_lang = target_lang
+        self.gender = gender
+        self.work_dir = work_dir
+        self.tts_concurrency = max(1, tts_concurrency)
+        self.fit_workers = max(1, fit_workers)
+        self.queue_size = max(1, queue_size)
+        self.checkpoints = checkpoints
+        self.on_progress = on_progress
+        self.metrics = metrics
+        self.voice = engine.resolve_voice(target_lang, gender)
+
+        self._lock = threading.Lock()
+        self._counts = {'translate': 0, 'tts': 0, 'fit': 0, 'failed': 0}
+        self._source_error: Optional[Exception] = None
+        self._translate_error: Optional[Exception] = None
+        self._tts_error: Optional[Exception] = None
+        self._chunks: List[Dict] = []
+        self._tts_input_done = False
+
+    def run(self, chunks: Iterable[Dict]) -> List[Dict]:
+        """Run all stages over the chunks and block until they finish.
+
+        Each chunk gets 'trans_text' and, when TTS and fitting succeed,
+        'processed_audio'. Failed chunks are left without audio, matching the
+        sequential pipeline.
+
+        Args:
+            chunks: Chunks with 'start', 'end' and 'text' keys, in timeline
+                order. May be a lazy iterable, e.g. chunks of a transcription
+                still in progress; translation starts with the first chunk.
+
+        Returns:
+            The processed chunks in their original order.
+
+        Raises:
+            Exception: Whatever a lazy chunks iterable raised, unchanged,
+                once the chunks received before it are processed.
+            TranslationError: If translation fails; remaining work is drained.
+            TTSError: If the TTS stage itself fails (not a single chunk).
+        """
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        tts_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        fit_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._translate_stage, args=(chunks, tts_queue),
+                             name="stream-translate", daemon=True),
+            threading.Thread(target=self._tts_stage, args=(tts_queue, fit_queue),
+                             name="stream-tts", daemon=True),
+        ]
+        threads += [
+            threading.Thread(target=self._fit_stage, args=(fit_queue,),
+                             name=f"stream-fit-{i}", daemon=True)
+            for i in range(self.fit_workers)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.checkpoints:
+            self.checkpoints.flush()
+
+        if self._source_error:
+            raise self._source_error
+        if self._translate_error:
+            raise TranslationError(f"Translation failed: {self._translate_error}") from self._translate_error
+        if self._tts_error:
+            raise TTSError(f"TTS stage failed: {self._tts_error}") from self._tts_error
+        return self._chunks
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Completed item counts per stage plus failed chunk count."""
+        with self._lock:
+            return dict(self._counts)
+
+    def _bump(self, stage: str) -> None:
+        with self._lock:
+            self._counts[stage] += 1
+            count = self._counts[stage]
+        if self.on_progress and stage != 'failed':
+            self.on_progress(stage, count)
+
+    # -------------------------------------------------------------------------
+    # Stages
+    # -------------------------------------------------------------------------
+
+    def _translate_stage(self, chunks: Iterable[Dict], out_queue: queue.Queue) -> None:
+        source = iter(chunks)
+        try:
+            for index in itertools.count():
+                try:
+                    chunk = next(source)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    # Upstream failure (e.g. transcription), not a translation error
+                    self._source_error = e
+                    break
+                chunk['trans_text'] = self._translate(index, chunk)
+                self._chunks.append(chunk)
+                self._bump('translate')
+                out_queue.put((index, chunk))
+        except Exception as e:
+            handle_error(e, "streaming translation")
+            self._translate_error = e
+        finally:
+            # Stop a lazy source early (e.g. release the ASR model) on failure
+            close = getattr(source, 'close', None)
+            if close:
+                close()
+            out_queue.put(_DONE)
+
+    def _translate(self, index: int, chunk: Dict) -> str:
+        if not self.checkpoints:
+            return self.engine.translate_text(chunk['text'], self.target_lang, self.metrics)
+
+        name = f"translate_{self.target_lang}/{index:04d}"
+        key = CheckpointStore.fingerprint(chunk['text'], self.target_lang)
+        translated = self.checkpoints.get(name, key)
+        if translated is None:
+            translated = self.engine.translate_text(chunk['text'], self.target_lang, self.metrics)
+            self.checkpoints.put(name, key, translated)
+        return translated
+
+    def _tts_stage(self, in_queue: queue.Queue, out_queue: queue.Queue) -> None:
+        try:
+            asyncio.run(self._tts_stage_async(in_queue, out_queue))
+        except Exception as e:
+            handle_error(e, "streaming TTS")
+            self._tts_error = e
+            # Unblock the translation stage so it can run to completion
+            while not self._tts_input_done and in_queue.get() is not _DONE:
+                pass
+        finally:
+            out_queue.put(_DONE)
+
+    async def _tts_stage_async(self, in_queue: queue.Queue, out_queue: queue.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.tts_concurrency)
+        backoff = AdaptiveBackoff()
+        pending = set()
+
+        async def synthesize(index: int, chunk: Dict) -> None:
+            try:
+                tts_path = None
+                if self.checkpoints:
+                    tts_path = self.checkpoints.get_path(f"tts/{index:04d}", _tts_key(chunk, self.voice))
+                if tts_path is None:
+                    out_path = self.work_dir / f"chunk_{index:04d}.mp3"
+                    tts_path = await self.engine.synthesize_async(
+                        chunk['trans_text'], self.voice, out_path, backoff, TTS_MAX_RETRIES,
+                        self.metrics
+                    )
+                    if tts_path and self.checkpoints:
+                        self.checkpoints.put_path(f"tts/{index:04d}", _tts_key(chunk, self.voice), tts_path)
+                self._bump('tts')
+                await loop.run_in_executor(None, out_queue.put, (index, chunk, tts_path))
+            finally:
+                semaphore.release()
+
+        while True:
+            item = await loop.run_in_executor(None, in_queue.get)
+            if item is _DONE:
+                self._tts_input_done = True
+                break
+            # Acquire before spawning so at most N requests (and tasks) are live
+            await semaphore.acquire()
+            task = asyncio.ensure_future(synthesize(*item))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+
+    def _fit_stage(self, in_queue: queue.Queue) -> None:
+        while True:
+            item = in_queue.get()
+            if item is _DONE:
+                # Let sibling fit workers see the end of stream too
+                in_queue.put(_DONE)
+                return
+
+            index, chunk, tts_path = item
+            if tts_path is None:
+                self._bump('failed')
+                continue
+
+            try:
+                _fit_chunk(index, chunk, tts_path, self.checkpoints, self.metrics)
+                self._bump('fit')
+            except Exception as e:
+                print(f"\n[!] Audio fitting failed for chunk {index}: {e}")
+                self._bump('failed')
@@ -0,0 +1,156 @@
+"""
+Job Scheduling Module for YouTube Auto Dub.
+
+This module provides bounded, resource-aware execution of dubbing jobs:
+- A fixed pool of worker threads fed from a FIFO queue
+- Admission control (a maximum queue length) with queue positions
+- Named resource gates that cap how many jobs may run a given stage at once
+  (e.g. one Whisper transcription, K FFmpeg renders), while network-bound
+  stages such as translation and TTS overlap freely
+
+Under load, jobs wait in the queue or at a gate instead of all loading
+models and rendering at the same time, so throughput levels off rather than
+collapsing into memory pressure.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Local imports
+from src.core_utils import ResourceError
+
+
+class ResourceGate:
+    """Named counting semaphores limiting concurrent use of heavy stages."""
+
+    def __init__(self, limits: Dict[str, int]):
+        """Initialize the gate.
+
+        Args:
+            limits: Maximum concurrent holders per resource name. Resources
+                not listed here are unlimited.
+        """
+        self.limits = dict(limits)
+        self._semaphores = {
+            name: threading.BoundedSemaphore(max(1, limit))
+            for name, limit in limits.items()
+        }
+
+    @contextmanager
+    def slot(self, name: str, on_wait: Optional[Callable[[], None]] = None) -> Iterator[None]:
+        """Hold one slot of a resource for the duration of the block.
+
+        Args:
+            name: Resource name (e.g. 'asr', 'render').
+            on_wait: Optional callback invoked once if the slot is not
+                immediately available, before blocking.
+        """
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            yield
+            return
+
+        if not semaphore.acquire(blocking=False):
+            if on_wait:
+                on_wait()
+            semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class JobScheduler:
+    """Fixed worker pool consuming a bounded FIFO queue of jobs."""
+
+    def __init__(self,
+                 runner: Callable[..., Any],
+                 workers: int = 2,
+                 max_queue: int = 50,
+                 on_queue_change: Optional[Callable[[Dict[str, int]], None]] = None):
+        """Initialize the scheduler and start its worker threads.
+
+        Args:
+            runner: Callable invoked as runner(job_id, *args) for each job.
+            workers: Number of jobs that may run at once.
+            max_queue: Maximum number of waiting jobs before submissions
+                are rejected.
+            on_queue_change: Optional callback receiving {job_id: position}
+                (1-based) for all waiting jobs whenever the queue changes.
+        """
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.on_queue_change = on_queue_change
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._running = 0
+
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"dub-worker-{i}", daemon=True).start()
+
+    def submit(self, job_id: str, *args: Any) -> int:
+        """Queue a job for execution.
+
+        Args:
+            job_id: Unique job identifier.
+            *args: Extra arguments passed to the runner.
+
+        Returns:
+            1-based queue position of the job.
+
+        Raises:
+            ResourceError: If the queue is full.
+        """
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                raise ResourceError(f"Job queue is full ({self.max_queue} waiting)")
+            self._queue.append((job_id, args))
+            position = len(self._queue)
+            self._cond.notify()
+        self._notify_positions()
+        return position
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Return the 1-based queue position of a waiting job, or None."""
+        with self._cond:
+            for i, (queued_id, _) in enumerate(self._queue):
+                if queued_id == job_id:
+                    return i + 1
+        return None
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Current number of waiting and running jobs."""
+        with self._cond:
+            return {"queued": len(self._queue), "running": self._running, "workers": self.workers}
+
+    def _notify_positions(self) -> None:
+        if not self.on_queue_change:
+            return
+        with self._cond:
+            positions = {job_id: i + 1 for i, (job_id, _) in enumerate(self._queue)}
+        self.on_queue_change(positions)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job_id, args = self._queue.popleft()
+                self._running += 1
+            self._notify_positions()
+
+            try:
+                self.runner(job_id, *args)
+            except Exception as e:
+                print(f"[!] ERROR: Job {job_id} crashed in scheduler: {e}")
+            finally:
+                with self._cond:
+                    self._running -= 1
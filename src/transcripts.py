@@ -0,0 +1,118 @@
+"""
+Transcript Cache Module for YouTube Auto Dub.
+
+Keeps the raw Whisper segments of every transcribed audio file, so
+re-dubbing a video (another language, another voice, a retried render)
+skips both the model load and the decode:
+- Entries keyed by the SHA-256 of the audio content plus the settings
+  that change the transcript (model, compute type, beam, VAD, batching,
+  sharding) and the spoken language
+- One gzip-compressed file per entry holding [start, end, text] rows
+- Independent of the per-video work directories, so entries survive
+  fresh (non --resume) runs
+
+Audio checksums come from the media cache manifest when the file is a
+cached download; other files are hashed once per process.
+
+Author: Nguyen Cong Thuan Huy (mangodxd)
+Version: 1.0.0
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Local imports
+from src.engines import CACHE_DIR, TRANSCRIPT_CACHE, ASR_TRANSCRIPT_KEYS
+from src.cache import file_checksum, media_cache
+
+
+def transcript_key(checksum: str, options: Dict[str, Any], language: Optional[str] = None) -> str:
+    """Cache key of a transcript.
+
+    Args:
+        checksum: SHA-256 of the audio file.
+        options: Resolved ASR settings (see src.engines.resolve_asr_options).
+        language: Spoken language passed to Whisper; None when auto-detected.
+    """
+    params = {k: options[k] for k in ASR_TRANSCRIPT_KEYS}
+    payload = json.dumps([checksum, params, language], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class TranscriptCache:
+    """Persistent store of Whisper segments keyed by audio content and settings."""
+
+    DIR_NAME = "transcripts"
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, enabled: bool = TRANSCRIPT_CACHE):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory whose transcripts/ sub-directory holds entries.
+            enabled: When False, get() always misses and put() stores nothing.
+        """
+        self.enabled = enabled
+        self.directory = cache_dir / self.DIR_NAME
+        self._lock = threading.Lock()
+        self._checksums: Dict[Tuple[str, int, int], str] = {}
+
+    def get(self, audio_path: Path, options: Dict[str, Any],
+            language: Optional[str] = None) -> Optional[List[Dict]]:
+        """Return the cached segments of an audio file, or None on a miss."""
+        if not self.enabled or not audio_path.exists():
+            return None
+        path = self._entry_path(audio_path, options, language)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                rows = json.load(f)["segments"]
+        except (OSError, EOFError, ValueError, KeyError):
+            print(f"[!] WARNING: Corrupted transcript cache entry, ignoring: {path.name}")
+            return None
+        print(f"[+] Transcript cache hit: {len(rows)} segments, skipping Whisper")
+        return [{'start': start, 'end': end, 'text': text} for start, end, text in rows]
+
+    def put(self, audio_path: Path, options: Dict[str, Any], segments: List[Dict],
+            language: Optional[str] = None) -> None:
+        """Store the segments Whisper produced for an audio file."""
+        if not self.enabled or not audio_path.exists():
+            return
+        path = self._entry_path(audio_path, options, language)
+        rows = [[round(s['start'], 3), round(s['end'], 3), s['text']] for s in segments]
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump({"segments": rows}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[!] WARNING: Could not save transcript cache entry: {e}")
+
+    def _entry_path(self, audio_path: Path, options: Dict[str, Any],
+                    language: Optional[str]) -> Path:
+        key = transcript_key(self._checksum(audio_path), options, language)
+        return self.directory / f"{key}.json.gz"
+
+    def _checksum(self, audio_path: Path) -> str:
+        checksum = media_cache.checksum(audio_path)
+        if checksum:
+            return checksum
+        stat = audio_path.stat()
+        memo_key = (str(audio_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            checksum = self._checksums.get(memo_key)
+        if checksum is None:
+            checksum = file_checksum(audio_path)
+            with self._lock:
+                self._checksums[memo_key] = checksum
+        return checksum
+
+
+# Process-wide cache used by main.py and web_app.py
+transcript_cache = TranscriptCache()
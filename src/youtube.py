@@ -16,10 +16,73 @@ Author: Nguyen Cong Thuan Huy (mangodxd)
 Version: 1.0.0
 """
 
+import contextlib
+import copy
+import hashlib
+import threading
+import time
 import yt_dlp
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
-from src.engines import CACHE_DIR
+from typing import Optional, Dict, Any, List, Tuple, Callable, ContextManager
+from src.cache import media_cache, clip_key
+from src.engines import is_asr_audio, VIDEO_MAX_HEIGHT, VIDEO_MAX_FPS, VIDEO_CODEC
+from src.metadata import metadata_cache, video_id_from_url
+
+
+# yt-dlp vcodec filters of the codecs MP4 can hold, so the render can stream-copy them
+VIDEO_CODEC_FILTERS = {
+    "avc": "[vcodec^=avc]",
+    "vp9": "[vcodec~='^vp0?9']",
+    "av1": "[vcodec^=av01]",
+}
+
+
+def format_selector(max_height: int = VIDEO_MAX_HEIGHT,
+                    max_fps: int = VIDEO_MAX_FPS,
+                    codec: str = VIDEO_CODEC) -> str:
+    """Build the yt-dlp format string of a download profile.
+    
+    Picks the best separate video stream within the height and frame rate
+    caps, in the preferred codec if available and otherwise in any codec
+    an MP4 can hold, plus the best M4A audio. Capping the height is what
+    keeps a 4K source from downloading gigabytes that would only be
+    stream-copied into a smaller-than-source publish anyway. Sources
+    without separate streams fall back to a combined MP4.
+    
+    Args:
+        max_height: Tallest video stream to fetch; 0 for no cap.
+        max_fps: Highest frame rate to fetch; 0 for no cap.
+        codec: Preferred video codec: avc, vp9, av1, or any.
+        
+    Returns:
+        yt-dlp format string.
+        
+    Raises:
+        ValueError: If the codec is unknown.
+    """
+    if codec != "any" and codec not in VIDEO_CODEC_FILTERS:
+        raise ValueError(f"Unknown video codec '{codec}'. Supported: "
+                         f"{', '.join(VIDEO_CODEC_FILTERS)}, any")
+    
+    # '<=?' keeps formats that do not report the field
+    caps = ""
+    if max_height:
+        caps += f"[height<=?{max_height}]"
+    if max_fps:
+        caps += f"[fps<=?{max_fps}]"
+    copyable = "[vcodec~='^(avc|vp0?9|av01)']"
+    
+    selectors = []
+    if codec != "any":
+        selectors.append(f"bestvideo{caps}{VIDEO_CODEC_FILTERS[codec]}+bestaudio[ext=m4a]")  # Preferred
+    selectors += [
+        f"bestvideo{caps}{copyable}+bestaudio[ext=m4a]",  # Any MP4-copyable codec
+        f"best[ext=mp4]{caps}",                           # Combined MP4 within the caps
+        "best[ext=mp4]",                                  # Fallback MP4
+        "best",                                           # Final fallback
+    ]
+    return "/".join(dict.fromkeys(selectors))
 
 
 def _get_opts(browser: Optional[str] = None, 
@@ -87,13 +150,60 @@ def _get_opts(browser: Optional[str] = None,
     return opts
 
 
+def probe(url: str,
+          browser: Optional[str] = None,
+          cookies_file: Optional[str] = None,
+          refresh: bool = False) -> Dict[str, Any]:
+    """Return a video's metadata summary, from the metadata cache when fresh.
+    
+    Args:
+        url: YouTube video URL.
+        browser: Browser name for cookie extraction.
+        cookies_file: Path to cookies.txt file.
+        refresh: Ignore the cached entry and query YouTube.
+        
+    Returns:
+        Summary dict (see src.metadata.summarize_info): id, title,
+        duration, uploader, language, formats and caption tracks.
+        
+    Raises:
+        ValueError: If URL is invalid or authentication is required.
+        RuntimeError: If yt-dlp fails to extract information.
+    """
+    if not url or not isinstance(url, str):
+        raise ValueError("URL must be a non-empty string")
+    if not any(domain in url.lower() for domain in ['youtube.com', 'youtu.be']):
+        raise ValueError(f"Invalid YouTube URL: {url}")
+    
+    if not refresh:
+        cached = metadata_cache.get(video_id_from_url(url))
+        if cached:
+            return cached
+    
+    try:
+        opts = _get_opts(browser=browser, cookies_file=cookies_file)
+        opts['noplaylist'] = True
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+    except yt_dlp.DownloadError as e:
+        _raise_download_error(e, "yt-dlp extraction")
+    except (ValueError, RuntimeError):
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Failed to extract video info: {e}") from e
+    
+    if not info.get('id'):
+        raise RuntimeError("No video ID found in extracted information")
+    return metadata_cache.put(info)
+
+
 def get_id(url: str, 
           browser: Optional[str] = None, 
           cookies_file: Optional[str] = None) -> str:
     """Extract YouTube video ID from URL with authentication support.
     
-    This function extracts the video ID from a YouTube URL using yt-dlp.
-    It supports authentication and handles various YouTube URL formats.
+    The metadata comes from probe(), so a video seen within
+    METADATA_TTL_HOURS is resolved without a network request.
     
     Args:
         url: YouTube video URL to extract ID from.
@@ -110,281 +220,619 @@ def get_id(url: str,
     Example:
         >>> video_id = get_id("https://youtube.com/watch?v=VIDEO_ID")
         >>> print(f"Video ID: {video_id}")
+    """
+    print(f"[*] Extracting video ID from: {str(url)[:50]}...")
+    meta = probe(url, browser=browser, cookies_file=cookies_file)
+    
+    title = meta.get('title') or 'Unknown'
+    duration = int(meta.get('duration') or 0)
+    print(f"[+] Video ID extracted: {meta['id']}")
+    print(f"    Title: {title[:50]}{'...' if len(title) > 50 else ''}")
+    print(f"    Duration: {duration}s ({duration//60}:{duration%60:02d})")
+    print(f"    Uploader: {meta.get('uploader') or 'Unknown'}")
+    return meta['id']
+
+
+def _raise_download_error(e: Exception, what: str) -> None:
+    """Translate a yt-dlp DownloadError into the module's error types."""
+    error_msg = str(e).lower()
+    if "sign in to confirm" in error_msg or "private video" in error_msg:
+        raise ValueError(
+            f"Authentication required for this video. Please try:\n"
+            f"1. Close all browser windows and use --browser\n"
+            f"2. Export fresh cookies.txt and use --cookies\n"
+            f"3. Check if video is public/accessible\n"
+            f"Original error: {e}"
+        ) from e
+    raise RuntimeError(f"{what} failed: {e}") from e
+
+
+class _ByteProgress:
+    """Aggregates yt-dlp progress_hooks of one or more concurrent streams."""
+    
+    def __init__(self, callback: Optional[Callable[[int, Optional[int]], None]],
+                 interval: float = 0.5):
+        self.callback = callback
+        self.interval = interval
+        self._streams: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._lock = threading.Lock()
+        self._last = 0.0
+    
+    def hook(self, status: Dict[str, Any]) -> None:
+        if not self.callback or status.get('status') not in ('downloading', 'finished'):
+            return
+        key = status.get('filename') or status.get('tmpfilename') or ''
+        done = status.get('downloaded_bytes') or 0
+        total = status.get('total_bytes') or status.get('total_bytes_estimate')
+        if status['status'] == 'finished':
+            total = total or done
+            done = total
+        
+        now = time.monotonic()
+        with self._lock:
+            self._streams[key] = (done, total)
+            if status['status'] == 'downloading' and now - self._last < self.interval:
+                return
+            self._last = now
+            downloaded = sum(d for d, _ in self._streams.values())
+            totals = [t for _, t in self._streams.values()]
+            total_bytes = sum(totals) if all(totals) else None
+        self.callback(downloaded, total_bytes)
+
+
+def _split_formats(info: Dict[str, Any]) -> Optional[Tuple[Dict, Dict]]:
+    """Return (video_format, audio_format) when the selection is two streams."""
+    requested = info.get('requested_formats') or []
+    if len(requested) != 2:
+        return None
+    video = next((f for f in requested if f.get('vcodec') not in (None, 'none')), None)
+    audio = next((f for f in requested if f.get('acodec') not in (None, 'none') and f is not video), None)
+    if not video or not audio:
+        return None
+    return video, audio
+
+
+def _download_format(info: Dict[str, Any], fmt: Dict[str, Any], out_path: Path,
+                     opts: Dict[str, Any]) -> Path:
+    """Download one format of already extracted info to a fixed path."""
+    stream_opts = dict(opts)
+    stream_opts.update({
+        'format': fmt['format_id'],
+        'outtmpl': str(out_path),
+        'merge_output_format': None,
+    })
+    with yt_dlp.YoutubeDL(stream_opts) as ydl:
+        ydl.process_ie_result(copy.deepcopy(info), download=True)
+    if not out_path.exists():
+        raise RuntimeError(f"Stream file not created: {out_path.name}")
+    return out_path
+
+
+def download_media(url: str, 
+                   browser: Optional[str] = None, 
+                   cookies_file: Optional[str] = None,
+                   on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                   on_audio_ready: Optional[Callable[[Path], None]] = None,
+                   pin: bool = False,
+                   start: Optional[float] = None,
+                   end: Optional[float] = None,
+                   on_captions: Optional[Callable[[Optional[List[Dict]]], None]] = None,
+                   format_spec: Optional[str] = None) -> Tuple[Path, Path]:
+    """Download a video once and derive its transcription audio locally.
+    
+    A single yt-dlp session extracts the metadata, so the video page is
+    fetched once and browser cookies are decrypted once. When the selected
+    format is a separate video and audio stream, both streams download
+    concurrently: the transcription WAV is extracted from the audio stream
+    as soon as it lands (see on_audio_ready) while the larger video stream
+    keeps downloading, and the two are muxed locally afterwards. A single
+    combined file is downloaded as-is and the WAV extracted from it.
+    
+    Files are produced in a private temporary directory and moved into the
+    media cache atomically. Only one download of a given video runs at a
+    time; concurrent callers wait for it and then reuse the cached files.
+    
+    With start and/or end, only that section is fetched (yt-dlp download
+    ranges), cut at exact frames and rebased to zero, so the returned video
+    and WAV are the clip alone and everything downstream scales with the
+    clip length. Clips are cached separately from the full video.
+    
+    Args:
+        url: YouTube video URL to download.
+        browser: Browser name for cookie extraction.
+        cookies_file: Path to cookies.txt file.
+        on_progress: Optional callback (downloaded_bytes, total_bytes_or_None)
+            aggregated over all streams, throttled to about twice a second.
+        on_audio_ready: Optional callback receiving the WAV path as soon as
+            it exists, possibly before the video has finished.
+        pin: Protect the returned files from cache eviction until
+            media_cache.unpin(path.stem) is called.
+        start: Clip start in seconds; None for the beginning.
+        end: Clip end in seconds; None for the end of the video.
+        on_captions: Optional callback receiving the video's existing
+            captions as transcript segments (clipped to start/end), or None
+            when it has no caption track in its spoken language. Called
+            before the media download starts.
+        format_spec: yt-dlp format string; defaults to format_selector()
+            with the configured VIDEO_MAX_HEIGHT, VIDEO_MAX_FPS and
+            VIDEO_CODEC.
+        
+    Returns:
+        (video_path, audio_path): MP4 video and WAV audio in the cache.
         
-    NOTE: This function validates the URL and extracts metadata
-    without downloading the actual content.
+    Raises:
+        ValueError: If URL is invalid or authentication is required.
+        RuntimeError: If download or audio extraction fails.
+        
+    NOTE: Cached files are reused only for the same format profile; a
+    different height, frame rate or codec cap downloads again. A cached
+    video with a missing WAV only re-runs the local audio extraction.
+    When the video's metadata is in the metadata cache too (and no
+    captions are requested), a repeat job makes no network request.
     """
+    from src.media import extract_audio, mux_streams
+    
     if not url or not isinstance(url, str):
         raise ValueError("URL must be a non-empty string")
-    
-    # Basic URL validation
     if not any(domain in url.lower() for domain in ['youtube.com', 'youtu.be']):
         raise ValueError(f"Invalid YouTube URL: {url}")
+    clip = start is not None or end is not None
+    start = start or 0.0
+    if end is not None and end <= start:
+        raise ValueError(f"Clip end ({end}s) must be after its start ({start}s)")
     
+    def audio_ready(path: Path) -> Path:
+        if on_audio_ready:
+            on_audio_ready(path)
+        return path
+    
+    format_spec = format_spec or format_selector()
+    progress = _ByteProgress(on_progress)
     try:
-        print(f"[*] Extracting video ID from: {url[:50]}...")
-        
-        # Configure yt-dlp options
-        opts = _get_opts(browser=browser, cookies_file=cookies_file)
-        
-        # Extract video information without downloading
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            try:
+        # Repeat job: known video with media in the cache needs no network at
+        # all. Captions still need a fresh extraction (their URLs expire).
+        meta = None if on_captions else metadata_cache.get(video_id_from_url(url))
+        if meta:
+            key, length, _ = _media_key(meta['id'], meta.get('duration'), clip, start, end, format_spec)
+            with media_cache.lock(key):
+                paths = _cached_media(key)
+                if paths:
+                    print(f"[*] Video and audio already cached: {key} (metadata cached, no network)")
+                    if pin:
+                        media_cache.pin(key)
+                    audio_ready(paths[1])
+                    return paths
+        
+        with media_cache.temp_dir("download") as tmp_dir:
+            opts = _get_opts(browser=browser, cookies_file=cookies_file)
+            opts.update({
+                # Smallest stream meeting the profile that the render can stream-copy
+                'format': format_spec,
+                'outtmpl': str(tmp_dir / "video.mp4"),
+                'merge_output_format': 'mp4',
+                'noplaylist': True,
+                'postprocessors': [],  # Audio is extracted locally afterwards
+                'progress_hooks': [progress.hook],
+            })
+            if clip:
+                opts.update({
+                    'download_ranges': yt_dlp.utils.download_range_func(
+                        None, [(start, end if end is not None else float('inf'))]),
+                    # Re-encodes only the clip, so cuts land on exact frames
+                    'force_keyframes_at_cuts': True,
+                })
+            
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                print(f"[*] Extracting video info: {url[:50]}...")
                 info = ydl.extract_info(url, download=False)
                 video_id = info.get('id')
-                
                 if not video_id:
                     raise RuntimeError("No video ID found in extracted information")
+                metadata_cache.put(info)
                 
-                # Extract additional useful info for logging
                 title = info.get('title', 'Unknown')
-                duration = info.get('duration', 0)
-                uploader = info.get('uploader', 'Unknown')
-                
+                duration = info.get('duration') or 0
                 print(f"[+] Video ID extracted: {video_id}")
                 print(f"    Title: {title[:50]}{'...' if len(title) > 50 else ''}")
                 print(f"    Duration: {duration}s ({duration//60}:{duration%60:02d})")
-                print(f"    Uploader: {uploader}")
+                print(f"    Uploader: {info.get('uploader', 'Unknown')}")
+                print(f"    Format: {info.get('format', 'Unknown')}")
                 
-                return video_id
+                key, length, end = _media_key(video_id, duration, clip, start, end, format_spec)
+                if clip:
+                    print(f"    Section: {start:g}s - {f'{end:g}s' if end is not None else 'end'}")
                 
-            except yt_dlp.DownloadError as e:
-                if "Sign in to confirm" in str(e) or "private video" in str(e).lower():
-                    raise ValueError(f"Authentication required for this video. Please use --browser or --cookies. Original error: {e}")
-                else:
-                    raise RuntimeError(f"yt-dlp extraction failed: {e}")
-                    
+                if on_captions:
+                    on_captions(_fetch_captions(info, opts, tmp_dir, start, end))
+                
+                with media_cache.lock(key):
+                    paths = _fetch_into_cache(ydl, info, key, length, clip, opts, tmp_dir,
+                                              audio_ready, extract_audio, mux_streams)
+                    if pin:
+                        media_cache.pin(key)
+                    return paths
+            
+    except yt_dlp.DownloadError as e:
+        _raise_download_error(e, "Video download")
+    except (ValueError, RuntimeError):
+        raise
     except Exception as e:
-        if isinstance(e, (ValueError, RuntimeError)):
-            raise
-        raise RuntimeError(f"Failed to extract video ID: {e}") from e
+        raise RuntimeError(f"Video download failed: {e}") from e
 
 
-def download_video(url: str, 
-                  browser: Optional[str] = None, 
-                  cookies_file: Optional[str] = None) -> Path:
-    """Download the best quality video with audio from YouTube.
+def _media_key(video_id: str, duration: Optional[float], clip: bool,
+               start: float, end: Optional[float],
+               format_spec: str) -> Tuple[str, Optional[float], Optional[float]]:
+    """Cache key, length and end (clamped to the duration) of a video or clip.
     
-    This function downloads the highest quality video file that includes
-    audio. It prioritizes MP4 format with AVC video codec for maximum
-    compatibility with the processing pipeline.
+    The key ends with a short hash of the format profile, so a video
+    cached at one height, frame rate or codec is not reused for another.
+    
+    Example: _media_key("abc", 600, True, 90.5, 180, spec)[0] -> "abc_90p5-180_f1a2b3c4"
     
-    Args:
-        url: YouTube video URL to download.
-        browser: Browser name for cookie extraction.
-        cookies_file: Path to cookies.txt file.
-        
-    Returns:
-        Path to the downloaded video file.
-        
     Raises:
-        ValueError: If URL is invalid or authentication is required.
-        RuntimeError: If download fails or file is corrupted.
-        
-    Example:
-        >>> video_path = download_video("https://youtube.com/watch?v=VIDEO_ID")
-        >>> print(f"Video downloaded: {video_path}")
-        
-    NOTE: This function downloads both video and audio in a single file.
-    If the video already exists in cache, it returns the existing file
-    to avoid unnecessary downloads.
+        ValueError: If the clip starts beyond the end of the video.
+    """
+    profile = "f" + hashlib.sha256(format_spec.encode("utf-8")).hexdigest()[:8]
+    if not clip:
+        return f"{video_id}_{profile}", duration or None, end
+    if duration and start >= duration:
+        raise ValueError(f"Clip start ({start}s) is beyond the video length ({duration}s)")
+    if end is None or (duration and end > duration):
+        end = duration or None
+    length = (end - start) if end is not None else None
+    return f"{clip_key(video_id, start, end)}_{profile}", length, end
+
+
+def _cached_media(key: str) -> Optional[Tuple[Path, Path]]:
+    """Return the cached (video, audio) of a key if both are present and usable."""
+    video_path = media_cache.get(key, f"{key}.mp4")
+    audio_path = media_cache.get(key, f"{key}.wav")
+    if video_path is None or audio_path is None or not is_asr_audio(audio_path):
+        return None
+    return video_path, audio_path
+
+
+def _fetch_captions(info: Dict[str, Any], opts: Dict[str, Any], tmp_dir: Path,
+                    start: float, end: Optional[float]) -> Optional[List[Dict]]:
+    """Download the best caption track of extracted info and parse it.
     
-    TODO: Add quality options and format selection parameters.
+    Returns:
+        Transcript segments, or None if there is no usable track. Failures
+        are reported and return None, so the caller falls back to Whisper.
     """
+    from src.captions import pick_track, load_caption_file, clip_segments
+    
+    track = pick_track(info)
+    if track is None:
+        print(f"[*] No captions in the spoken language, Whisper will transcribe")
+        return None
+    lang, auto = track
+    print(f"[*] Fetching {'auto-generated' if auto else 'manual'} captions ({lang})...")
+    
+    sub_opts = {k: v for k, v in opts.items()
+                if k not in ('download_ranges', 'force_keyframes_at_cuts', 'progress_hooks')}
+    sub_opts.update({
+        'skip_download': True,
+        'writesubtitles': not auto,
+        'writeautomaticsub': auto,
+        'subtitleslangs': [lang],
+        'subtitlesformat': 'vtt/srt/best',
+        'outtmpl': str(tmp_dir / "captions.%(ext)s"),
+    })
     try:
-        # Extract video ID first for validation and caching
-        video_id = get_id(url, browser=browser, cookies_file=cookies_file)
+        with yt_dlp.YoutubeDL(sub_opts) as ydl:
+            ydl.process_ie_result(copy.deepcopy(info), download=True)
+        files = [f for f in tmp_dir.glob("captions.*") if f.suffix in ('.vtt', '.srt')]
+        if not files:
+            raise RuntimeError("caption file not written")
+        segments = clip_segments(load_caption_file(files[0]), start or None, end)
     except Exception as e:
-        raise ValueError(f"Failed to validate video URL: {e}") from e
+        print(f"[!] WARNING: Could not use captions, Whisper will transcribe: {e}")
+        return None
     
-    # Determine output path
-    out_path = CACHE_DIR / f"{video_id}.mp4"
+    if not segments:
+        print(f"[*] Captions contain no speech in range, Whisper will transcribe")
+        return None
+    print(f"[+] Captions ready: {len(segments)} segments")
+    return segments
+
+
+def _fetch_into_cache(ydl: "yt_dlp.YoutubeDL",
+                      info: Dict[str, Any],
+                      key: str,
+                      duration: Optional[float],
+                      clip: bool,
+                      opts: Dict[str, Any],
+                      tmp_dir: Path,
+                      audio_ready: Callable[[Path], Path],
+                      extract_audio: Callable[[Path, Path], Path],
+                      mux_streams: Callable[[Path, Path, Path], Path]) -> Tuple[Path, Path]:
+    """Serve a video (or clip) from the cache or download it; caller holds the key's lock."""
+    video_id = info['id']
+    video_name, audio_name = f"{key}.mp4", f"{key}.wav"
     
-    # Check if file already exists and is valid
-    if out_path.exists():
-        file_size = out_path.stat().st_size
-        if file_size > 1024 * 1024:  # At least 1MB
-            print(f"[*] Video already cached: {out_path}")
-            return out_path
+    video_path = media_cache.get(key, video_name)
+    if video_path is not None:
+        print(f"[*] Video already cached: {video_path}")
+        audio_path = media_cache.get(key, audio_name)
+        if audio_path is not None and not is_asr_audio(audio_path):
+            print(f"[*] Cached audio is not in the transcription format, re-extracting...")
+            audio_path = None
+        if audio_path is not None:
+            print(f"[*] Audio already cached: {audio_path}")
         else:
-            print(f"[!] WARNING: Cached video seems too small ({file_size} bytes), re-downloading")
-            out_path.unlink()  # Remove corrupted file
+            audio_path = media_cache.put(key, audio_name,
+                                         extract_audio(video_path, tmp_dir / "audio.wav"), duration)
+        return video_path, audio_ready(audio_path)
     
-    try:
+    tmp_video = tmp_dir / "video.mp4"
+    tmp_audio = tmp_dir / "audio.wav"
+    streams = _split_formats(info)
+    if streams is None:
         print(f"[*] Downloading video: {video_id}")
-        
-        # Configure yt-dlp options for video download
-        opts = _get_opts(browser=browser, cookies_file=cookies_file)
-        opts.update({
-            # Format selection: Best MP4 with AVC video and AAC audio
-            'format': (
-                'bestvideo[ext=mp4][vcodec^=avc]+bestaudio[ext=m4a]/'  # Preferred
-                'best[ext=mp4]/'                                      # Fallback MP4
-                'best'                                               # Final fallback
-            ),
-            'outtmpl': str(out_path),
-            'merge_output_format': 'mp4',
-            'postprocessors': [],  # No post-processing for raw video
-        })
-        
-        # Download video
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            ydl.download([url])
-        
-        # Verify download was successful
-        if not out_path.exists():
-            raise RuntimeError(f"Video file not created after download: {out_path}")
-        
-        file_size = out_path.stat().st_size
-        if file_size < 1024 * 1024:  # Less than 1MB seems suspicious
-            raise RuntimeError(f"Downloaded video file is too small: {file_size} bytes")
-        
-        print(f"[+] Video downloaded successfully:")
-        print(f"    File: {out_path}")
-        print(f"    Size: {file_size / (1024*1024):.1f} MB")
-        
-        return out_path
-        
-    except yt_dlp.DownloadError as e:
-        error_msg = str(e).lower()
-        if "sign in to confirm" in error_msg or "private video" in error_msg:
-            raise ValueError(
-                f"Authentication required for this video. Please try:\n"
-                f"1. Close all browser windows and use --browser\n"
-                f"2. Export fresh cookies.txt and use --cookies\n"
-                f"3. Check if video is public/accessible\n"
-                f"Original error: {e}"
-            )
-        else:
-            raise RuntimeError(f"Video download failed: {e}")
-            
-    except Exception as e:
-        # Clean up partial download on failure
-        if out_path.exists():
-            out_path.unlink()
-        raise RuntimeError(f"Video download failed: {e}") from e
+        # Reuse the extracted info: no second metadata round-trip
+        ydl.process_ie_result(info, download=True)
+        audio_path = None
+    else:
+        if 'cookiesfrombrowser' in opts or 'cookiefile' in opts:
+            # Hand the loaded cookies to the stream downloaders as a private
+            # file: browser cookies are not decrypted again and the user's
+            # cookies.txt is never written by two downloaders at once
+            cookie_copy = tmp_dir / "cookies.txt"
+            try:
+                ydl.cookiejar.save(str(cookie_copy), ignore_discard=True, ignore_expires=True)
+                opts = dict(opts, cookiefile=str(cookie_copy))
+                opts.pop('cookiesfrombrowser', None)
+            except Exception as e:
+                print(f"[!] WARNING: Could not share cookies, re-reading them per stream: {e}")
+        
+        video_fmt, audio_fmt = streams
+        video_stream = tmp_dir / f"stream.video.{video_fmt.get('ext', 'mp4')}"
+        audio_stream = tmp_dir / f"stream.audio.{audio_fmt.get('ext', 'm4a')}"
+        print(f"[*] Downloading video ({video_fmt['format_id']}) and audio "
+              f"({audio_fmt['format_id']}) streams in parallel: {video_id}")
+        
+        def fetch_audio() -> Path:
+            _download_format(info, audio_fmt, audio_stream, opts)
+            print(f"[+] Audio stream ready, extracting WAV...")
+            extract_audio(audio_stream, tmp_audio)
+            return audio_ready(media_cache.put(key, audio_name, tmp_audio, duration))
+        
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="yt-stream") as pool:
+            audio_future = pool.submit(fetch_audio)
+            video_future = pool.submit(_download_format, info, video_fmt, video_stream, opts)
+            audio_path = audio_future.result()
+            video_future.result()
+        
+        mux_streams(video_stream, audio_stream, tmp_video)
+    
+    if not tmp_video.exists():
+        raise RuntimeError(f"Video file not created after download: {tmp_video}")
+    file_size = tmp_video.stat().st_size
+    # Less than 1MB seems suspicious for a full video; a short clip may be smaller
+    min_size = 10 * 1024 if clip else 1024 * 1024
+    if file_size < min_size:
+        raise RuntimeError(f"Downloaded video file is too small: {file_size} bytes")
+    video_path = media_cache.put(key, video_name, tmp_video, duration)
+    print(f"[+] Video ready: {video_path} ({file_size / (1024*1024):.1f} MB)")
+    
+    if audio_path is None:
+        print(f"[*] Extracting audio track locally...")
+        extract_audio(video_path, tmp_audio)
+        audio_path = audio_ready(media_cache.put(key, audio_name, tmp_audio, duration))
+    print(f"[+] Audio ready: {audio_path} ({audio_path.stat().st_size / (1024*1024):.1f} MB)")
+    return video_path, audio_path
+
+
+class MediaDownload:
+    """download_media() running in the background.
+    
+    The audio can be picked up with audio() as soon as it is ready, so
+    transcription may start while the video stream is still downloading;
+    result() waits for both. The files stay pinned in the media cache
+    until release() is called.
+    """
+    
+    def __init__(self,
+                 url: str,
+                 browser: Optional[str] = None,
+                 cookies_file: Optional[str] = None,
+                 on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                 hold: Optional[Callable[[], ContextManager]] = None,
+                 start: Optional[float] = None,
+                 end: Optional[float] = None,
+                 captions: bool = False,
+                 format_spec: Optional[str] = None):
+        """Start the download thread.
+        
+        Args:
+            url: YouTube video URL.
+            browser: Browser name for cookie extraction.
+            cookies_file: Path to cookies.txt file.
+            on_progress: Byte progress callback (see download_media).
+            hold: Optional context manager factory held for the duration of
+                the download, e.g. a resource gate slot.
+            start: Clip start in seconds (see download_media).
+            end: Clip end in seconds (see download_media).
+            captions: Also fetch the video's existing captions; see captions().
+            format_spec: yt-dlp format string (see download_media).
+        """
+        self._audio_path: Optional[Path] = None
+        self._audio_event = threading.Event()
+        self._done = threading.Event()
+        self._result: Optional[Tuple[Path, Path]] = None
+        self._error: Optional[BaseException] = None
+        self._released = False
+        self._want_captions = captions
+        self._captions: Optional[List[Dict]] = None
+        self._captions_event = threading.Event()
+        
+        def on_captions(segments: Optional[List[Dict]]) -> None:
+            self._captions = segments
+            self._captions_event.set()
+        
+        def on_audio_ready(path: Path) -> None:
+            self._audio_path = path
+            self._audio_event.set()
+        
+        def run() -> None:
+            try:
+                with (hold() if hold else contextlib.nullcontext()):
+                    self._result = download_media(url, browser, cookies_file,
+                                                  on_progress, on_audio_ready, pin=True,
+                                                  start=start, end=end,
+                                                  on_captions=on_captions if captions else None,
+                                                  format_spec=format_spec)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._done.set()
+                self._captions_event.set()
+                self._audio_event.set()
+        
+        threading.Thread(target=run, name="yt-download", daemon=True).start()
+    
+    def audio(self) -> Path:
+        """Block until the WAV exists and return it.
+        
+        Raises:
+            The download error if the download failed before the audio landed.
+        """
+        self._audio_event.wait()
+        if self._audio_path is None:
+            self._raise()
+        return self._audio_path
+    
+    def captions(self) -> Optional[List[Dict]]:
+        """Block until captions were fetched and return them as segments.
+        
+        Returns:
+            Transcript segments, or None if captions were not requested or
+            the video has no usable track.
+        """
+        if not self._want_captions:
+            return None
+        self._captions_event.wait()
+        return self._captions
+    
+    def result(self) -> Tuple[Path, Path]:
+        """Block until the download finishes and return (video, audio)."""
+        self._done.wait()
+        if self._error is not None:
+            self._raise()
+        return self._result
+    
+    def release(self) -> None:
+        """Unpin the downloaded files so the cache may evict them again."""
+        self._done.wait()
+        if self._result is not None and not self._released:
+            self._released = True
+            media_cache.unpin(self._result[0].stem)
+    
+    def _raise(self) -> None:
+        self._done.wait()
+        if self._error is None:
+            raise RuntimeError("Download finished without producing audio")
+        raise self._error
+
+
+def download_video(url: str, 
+                  browser: Optional[str] = None, 
+                  cookies_file: Optional[str] = None) -> Path:
+    """Download the best quality video with audio from YouTube.
+    
+    Thin wrapper around download_media(); prefer that when the audio is
+    needed too.
+    
+    Returns:
+        Path to the downloaded video file.
+    """
+    return download_media(url, browser=browser, cookies_file=cookies_file)[0]
 
 
 def download_audio(url: str, 
                   browser: Optional[str] = None, 
                   cookies_file: Optional[str] = None) -> Path:
-    """Download audio-only from YouTube for transcription processing.
+    """Download a video and return its WAV audio for transcription.
+    
+    Thin wrapper around download_media(); prefer that when the video is
+    needed too.
+    
+    Returns:
+        Path to the WAV audio file.
+    """
+    return download_media(url, browser=browser, cookies_file=cookies_file)[1]
+
+
+def is_collection_url(url: str) -> bool:
+    """Return True if a URL points at a playlist or channel rather than one video.
+    
+    A video link opened from a playlist (watch?v=ID&list=...) is one video;
+    only /playlist pages and channels are collections.
+    
+    Example:
+        >>> is_collection_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&index=2")
+        False
+        >>> is_collection_url("https://youtu.be/dQw4w9WgXcQ?list=PL123")
+        False
+        >>> is_collection_url("https://www.youtube.com/playlist?list=PL123")
+        True
+    """
+    lowered = url.lower()
+    if 'youtube.com' not in lowered and 'youtu.be' not in lowered:
+        return False
+    if '/playlist' in lowered:
+        return True
+    if video_id_from_url(url):
+        return False
+    return any(marker in lowered for marker in ['list=', '/channel/', '/c/', '/user/', '/@'])
+
+
+def expand_urls(urls: List[str],
+                browser: Optional[str] = None,
+                cookies_file: Optional[str] = None) -> List[str]:
+    """Expand playlist and channel URLs into individual video URLs.
     
-    This function downloads the best quality audio from a YouTube video
-    and converts it to WAV format for optimal compatibility with the
-    Whisper transcription model. The audio is extracted at the project's
-    configured sample rate for consistency.
+    Single-video URLs are passed through untouched. Collections are listed
+    with a flat extraction, so no per-video metadata is fetched here.
+    Duplicates are dropped while preserving order.
     
     Args:
-        url: YouTube video URL to extract audio from.
+        urls: Video, playlist or channel URLs.
         browser: Browser name for cookie extraction.
         cookies_file: Path to cookies.txt file.
         
     Returns:
-        Path to the downloaded WAV audio file.
+        List of video URLs in the order given.
         
     Raises:
-        ValueError: If URL is invalid or authentication is required.
-        RuntimeError: If audio download or conversion fails.
-        
-    Example:
-        >>> audio_path = download_audio("https://youtube.com/watch?v=VIDEO_ID")
-        >>> print(f"Audio downloaded: {audio_path}")
-        
-    NOTE: The output is always in WAV format at the project's sample rate
-    for consistency with the transcription pipeline. If the file already
-    exists, it returns the existing file to avoid re-downloading.
-    
-    TODO: Add audio quality options and format selection.
+        RuntimeError: If a playlist cannot be listed.
     """
-    try:
-        # Extract video ID first for validation and caching
-        video_id = get_id(url, browser=browser, cookies_file=cookies_file)
-    except Exception as e:
-        raise ValueError(f"Failed to validate video URL: {e}") from e
-    
-    # Determine output paths
-    temp_path = CACHE_DIR / f"{video_id}"  # yt-dlp will add extension
-    final_path = CACHE_DIR / f"{video_id}.wav"  # Our target format
-    
-    # Check if final WAV file already exists and is valid
-    if final_path.exists():
-        file_size = final_path.stat().st_size
-        if file_size > 1024 * 100:  # At least 100KB for audio
-            print(f"[*] Audio already cached: {final_path}")
-            return final_path
-        else:
-            print(f"[!] WARNING: Cached audio seems too small ({file_size} bytes), re-downloading")
-            final_path.unlink()  # Remove corrupted file
-    
-    try:
-        print(f"[*] Downloading audio: {video_id}")
+    expanded: List[str] = []
+    for url in urls:
+        if not is_collection_url(url):
+            expanded.append(url)
+            continue
         
-        # Configure yt-dlp options for audio download
+        print(f"[*] Expanding playlist: {url[:60]}...")
         opts = _get_opts(browser=browser, cookies_file=cookies_file)
-        opts.update({
-            # Best audio format
-            'format': 'bestaudio/best',
-            'outtmpl': str(temp_path),
-            # Convert to WAV for transcription compatibility
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'wav',
-                'preferredquality': '192',  # 192kbps
-            }],
-        })
-        
-        # Download audio
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            ydl.download([url])
-        
-        # Verify the final WAV file was created
-        if not final_path.exists():
-            # Check if temp file exists (yt-dlp may have used different naming)
-            temp_files = list(CACHE_DIR.glob(f"{video_id}.*"))
-            if temp_files:
-                print(f"[!] WARNING: Expected {final_path} but found {temp_files[0]}")
-                final_path = temp_files[0]  # Use whatever was created
-            else:
-                raise RuntimeError(f"Audio file not created after download: {final_path}")
-        
-        file_size = final_path.stat().st_size
-        if file_size < 1024 * 100:  # Less than 100KB seems suspicious for audio
-            raise RuntimeError(f"Downloaded audio file is too small: {file_size} bytes")
-        
-        print(f"[+] Audio downloaded successfully:")
-        print(f"    File: {final_path}")
-        print(f"    Size: {file_size / (1024*1024):.1f} MB")
-        
-        # Additional validation: try to get duration
+        opts['extract_flat'] = 'in_playlist'
+        # A video URL carrying a list= parameter stays one video
+        opts['noplaylist'] = True
         try:
-            from src.media import get_duration
-            duration = get_duration(final_path)
-            if duration > 0:
-                print(f"    Duration: {duration:.1f}s ({duration//60}:{duration%60:02d})")
-            else:
-                print(f"[!] WARNING: Could not determine audio duration")
-        except Exception as e:
-            print(f"[!] WARNING: Audio validation failed: {e}")
-        
-        return final_path
-        
-    except yt_dlp.DownloadError as e:
-        error_msg = str(e).lower()
-        if "sign in to confirm" in error_msg or "private video" in error_msg:
-            raise ValueError(
-                f"Authentication required for this video. Please try:\n"
-                f"1. Close all browser windows and use --browser\n"
-                f"2. Export fresh cookies.txt and use --cookies\n"
-                f"3. Check if video is public/accessible\n"
-                f"Original error: {e}"
-            )
-        else:
-            raise RuntimeError(f"Audio download failed: {e}")
-            
-    except Exception as e:
-        # Clean up partial downloads on failure
-        for path in [temp_path, final_path]:
-            if path.exists():
-                path.unlink()
-        raise RuntimeError(f"Audio download failed: {e}") from e
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+        except yt_dlp.DownloadError as e:
+            raise RuntimeError(f"Failed to list playlist {url}: {e}") from e
+        
+        entries = [e for e in (info.get('entries') or []) if e]
+        for entry in entries:
+            video_id = entry.get('id')
+            if video_id:
+                expanded.append(f"https://www.youtube.com/watch?v={video_id}")
+            elif entry.get('url'):
+                expanded.append(entry['url'])
+        print(f"[+] Playlist '{info.get('title', 'Unknown')}': {len(entries)} videos")
+    
+    return list(dict.fromkeys(expanded))
@@ -8,13 +8,14 @@ Uses Server-Sent Events (SSE) for real-time progress updates.
 Author: Auto-generated web interface
 """
 
+import os
+import copy
 import json
 import uuid
 import time
-import random
-import shutil
-import subprocess
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from flask import Flask, render_template, request, jsonify, Response, send_file
 
@@ -22,6 +23,15 @@ from flask import Flask, render_template, request, jsonify, Response, send_file
 import src.engines
 import src.youtube
 import src.media
+import src.pipeline
+import src.core_utils
+import src.metrics
+import src.local_media
+import src.captions
+import src.transcripts
+from src.scheduler import JobScheduler, ResourceGate
+from src.model_registry import ModelRegistry
+from src.cache import media_cache
 
 app = Flask(__name__)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # No caching for static files
@@ -39,6 +49,40 @@ def add_no_cache_headers(response):
 jobs = {}  # {job_id: {status, progress, stage, message, output_file, error}}
 jobs_lock = threading.Lock()
 
+# Each job owns TEMP_DIR/jobs/<job_id>, removed when the job ends
+JOBS_DIR = src.engines.TEMP_DIR / "jobs"
+
+# Media uploaded through /api/upload, removed when the job using it ends,
+# or after UPLOAD_TTL_SECONDS if no job ever uses it
+UPLOAD_DIR = src.engines.TEMP_DIR / "uploads"
+MAX_UPLOAD_BYTES = int(float(os.getenv("DUB_MAX_UPLOAD_GB", "10")) * 1024 ** 3)
+UPLOAD_TTL_SECONDS = float(os.getenv("DUB_UPLOAD_TTL_HOURS", "6")) * 3600
+uploads = {}  # {upload_id: Path}
+uploads_lock = threading.Lock()
+
+# ─── Scheduling ─────────────────────────────────────────────────────────────
+# Worker pool size and queue length, plus per-stage concurrency caps.
+# Translation and TTS are network-bound and are not gated.
+SCHEDULER_WORKERS = int(os.getenv("DUB_WORKERS", "3"))
+MAX_QUEUED_JOBS = int(os.getenv("DUB_MAX_QUEUE", "50"))
+RESOURCES = ResourceGate({
+    "download": int(os.getenv("DUB_DOWNLOAD_SLOTS", "2")),
+    "asr": int(os.getenv("DUB_ASR_SLOTS", "1")),
+    "render": int(os.getenv("DUB_RENDER_SLOTS", "2")),
+})
+# Languages of one multi-language job processed concurrently
+LANG_WORKERS = int(os.getenv("DUB_LANG_WORKERS", "2"))
+
+# ─── Warm Models ────────────────────────────────────────────────────────────
+# Whisper/Demucs/Pyannote stay loaded between jobs until idle or over budget,
+# and one Engine per device is reused so translator setup happens once.
+MODEL_REGISTRY = ModelRegistry(
+    budget_gb=float(os.getenv("DUB_MODEL_BUDGET_GB", "6")),
+    idle_timeout=float(os.getenv("DUB_MODEL_IDLE_SECONDS", "600")),
+)
+engines = {}  # {device: Engine}
+engines_lock = threading.Lock()
+
 PIPELINE_STAGES = [
     {"id": "download",    "label": "📥 Downloading",      "label_ar": "📥 تحميل الفيديو"},
     {"id": "transcribe",  "label": "🎤 Transcribing",     "label_ar": "🎤 تحويل الكلام لنص"},
@@ -56,6 +100,55 @@ def update_job(job_id, **kwargs):
             jobs[job_id].update(kwargs)
 
 
+def prune_uploads():
+    """Delete uploads no job has claimed within UPLOAD_TTL_SECONDS.
+    
+    Covers unclaimed entries of the uploads dict and files left in
+    UPLOAD_DIR by an earlier server process or an aborted transfer. Files
+    of queued or running jobs are kept; their jobs delete them.
+    """
+    if not UPLOAD_DIR.exists():
+        return
+    cutoff = time.time() - UPLOAD_TTL_SECONDS
+    with jobs_lock:
+        in_use = {job["url"] for job in jobs.values() if job["status"] in ("queued", "running")}
+    with uploads_lock:
+        registered = set(uploads.values())
+        for path in UPLOAD_DIR.iterdir():
+            if path.name in in_use:
+                continue
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            if path in registered:
+                for upload_id in [k for k, v in uploads.items() if v == path]:
+                    del uploads[upload_id]
+            src.core_utils.safe_file_delete(path)
+            print(f"[-] Removed unused upload: {path.name}")
+
+
+def parse_languages(value):
+    """Normalize a language field (string, comma list or JSON list) to codes."""
+    values = value if isinstance(value, list) else [value]
+    langs = []
+    for item in values:
+        for code in str(item).split(","):
+            code = code.strip()
+            if code and code not in langs:
+                langs.append(code)
+    return langs or ["es"]
+
+
+def get_engine(device):
+    """Return the process-wide Engine for a device, creating it once."""
+    with engines_lock:
+        if device not in engines:
+            engines[device] = src.engines.Engine(device, registry=MODEL_REGISTRY)
+        return engines[device]
+
+
 def check_dependencies():
     """Verify critical dependencies."""
     from shutil import which
@@ -73,49 +166,181 @@ def check_dependencies():
         return False, "PyTorch not installed"
 
 
-def cleanup_temp():
-    """Clean up temp directory with retry for Windows file locks."""
-    max_retries = 5
-    for attempt in range(max_retries):
+def dub_language(job_id, engine, chunks, wait_video, lang, gender, subtitle,
+                 work_dir, report, metrics):
+    """Translate, synthesize, fit and render one language of a job.
+    
+    Args:
+        wait_video: Callable returning the source video, blocking until its
+            download has finished.
+        report: Callable (stage, fraction, message) for progress updates,
+            with fraction in [0, 1] for this language.
+        metrics: Per-language RunMetrics collector.
+    
+    Returns:
+        Path to the rendered video.
+    
+    Raises:
+        RuntimeError: If rendering fails or produces no file.
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    
+    # ── Stage 4: Translate ─────────────────────────────────────────
+    report("translate", 0.0, f"Translating to {lang.upper()}...")
+    
+    texts = [c['text'] for c in chunks]
+    with metrics.stage("translate", items=len(texts)):
+        translated_texts = engine.translate_safe(texts, lang, metrics)
+    
+    for i, chunk in enumerate(chunks):
+        chunk['trans_text'] = translated_texts[i]
+    
+    report("translate", 0.2, "Translation complete!")
+
+    # ── Stage 5: TTS ───────────────────────────────────────────────
+    report("tts", 0.3, f"Generating {gender} voice...")
+    
+    synthesized = 0
+    
+    def on_tts_result(index, path):
+        nonlocal synthesized
+        synthesized += 1
+        # TTS covers 30-60% of this language
+        report("tts", 0.3 + synthesized / len(chunks) * 0.3,
+               f"Voice synthesis: {synthesized}/{len(chunks)} chunks")
+    
+    def on_fit_result(index, ok):
+        # Fitting covers 60-70% of this language
+        report("tts", 0.6 + (index + 1) / len(chunks) * 0.1,
+               f"Audio sync: {index+1}/{len(chunks)} chunks")
+    
+    with metrics.stage("tts", items=len(chunks)):
+        tts_paths = src.pipeline.synthesize_chunks(engine, chunks, lang, gender, work_dir,
+                                                   on_result=on_tts_result, metrics=metrics)
+    with metrics.stage("fit", items=len(chunks)):
+        failed_tts = src.pipeline.fit_chunks(chunks, tts_paths, on_result=on_fit_result,
+                                             metrics=metrics)
+    metrics.info["failed_chunks"] = failed_tts
+    
+    report("tts", 0.7, f"TTS complete ({len(chunks) - failed_tts}/{len(chunks)} successful)")
+
+    # ── Stage 6: Render ────────────────────────────────────────────
+    report("render", 0.75, "Waiting for video download...")
+    video_path = wait_video()
+    report("render", 0.75, "Rendering final video...")
+    
+    try:
+        with metrics.stage("concat", items=len(chunks)):
+            silence_path = src.media.create_base_silence(work_dir)
+            concat_list_path = work_dir / "concat_list.txt"
+            src.media.create_concat_file(chunks, silence_path, concat_list_path)
+            
+            subtitle_path = None
+            if subtitle:
+                subtitle_path = work_dir / "subtitles.srt"
+                src.media.generate_srt(chunks, subtitle_path)
+        
+        video_name = video_path.stem
+        sub_suffix = "_sub" if subtitle else ""
+        out_name = f"dubbed_{lang}_{gender}{sub_suffix}_{video_name}_{job_id}.mp4"
+        final_output = src.engines.OUTPUT_DIR / out_name
+        
+        with RESOURCES.slot("render", on_wait=lambda: report(
+                "render", 0.75, "Waiting for a free render slot...")), metrics.stage("render"):
+            src.media.render_video(video_path, concat_list_path, final_output,
+                                   subtitle_path=subtitle_path)
+    except Exception as e:
+        raise RuntimeError(f"Rendering failed: {e}") from e
+    
+    if not final_output.exists():
+        raise RuntimeError("Output file was not created")
+    
+    report("render", 1.0, f"{lang.upper()} rendered")
+    return final_output
+
+
+def start_download(job_id, url, start, end, captions, metrics, format_spec=None):
+    """Start the YouTube download of a job and wait for its audio.
+    
+    format_spec is the job's yt-dlp format string; None uses the server's
+    DUB_MAX_HEIGHT / DUB_MAX_FPS / DUB_VIDEO_CODEC profile.
+    
+    Returns:
+        (download, audio_path), or (None, None) after marking the job
+        failed.
+    """
+    # Video and audio streams download in the background. Transcription
+    # starts once the audio lands; byte progress drives the download
+    # stage's 5-15% and keeps updating download_progress afterwards.
+    download_stage = {"active": True}
+    
+    @contextmanager
+    def download_slot():
+        with RESOURCES.slot("download", on_wait=lambda: update_job(
+                job_id, message="Waiting for a free download slot...")), metrics.stage("download"):
+            yield
+    
+    def on_download_progress(done, total):
+        percent = round(done / total * 100, 1) if total else None
+        update_job(job_id, download_progress=percent)
+        if download_stage["active"] and percent is not None:
+            update_job(job_id, progress=5 + int(percent / 10),
+                       message=f"Downloading: {done / 2**20:.1f}/{total / 2**20:.1f} MB ({percent:.0f}%)")
+    
+    download = src.youtube.MediaDownload(url, on_progress=on_download_progress,
+                                         hold=download_slot, start=start, end=end,
+                                         captions=captions, format_spec=format_spec)
+    try:
+        audio_path = download.audio()
+    except Exception as e:
+        update_job(job_id, status="error", 
+                   error=f"Download failed: {str(e)}. Check if URL is valid.")
+        return None, None
+    
+    download_stage["active"] = False
+    return download, audio_path
+
+
+def run_pipeline(job_id, url, langs, gender, gpu, subtitle, start=None, end=None, captions=False,
+                 upload=None, asr=None, format_spec=None):
+    """Run the full dubbing pipeline in a background thread.
+    
+    All intermediate files go to a work directory owned by this job, so
+    concurrent jobs never touch each other's chunks, manifests or subtitles.
+    Download, transcription and chunking run once; the remaining stages run
+    per language in `langs`. Stage metrics are attached to the job record
+    and saved next to the outputs as metrics_<job_id>.json. With start/end
+    only that section of the video is downloaded, transcribed and rendered.
+    With captions, the video's existing captions replace Whisper when the
+    video has a track in its spoken language. With upload (a local file
+    from /api/upload) the media is prepared locally instead of downloaded,
+    and the upload is deleted when the job ends. asr overrides the server's
+    Whisper settings for this job (see src.engines.resolve_asr_options),
+    and format_spec the download profile (see src.youtube.format_selector).
+    """
+    work_dir = JOBS_DIR / job_id
+    src.core_utils.reset_directory(work_dir)
+    metrics = src.metrics.RunMetrics(job_id)
+    metrics.info.update(url=url, langs=langs, gender=gender, start=start, end=end)
+    download = None
+    
+    def attach_metrics():
         try:
-            if src.engines.TEMP_DIR.exists():
-                shutil.rmtree(src.engines.TEMP_DIR)
-            src.engines.TEMP_DIR.mkdir(parents=True, exist_ok=True)
-            return
-        except PermissionError:
-            wait_time = 0.5 * (2 ** attempt)
-            time.sleep(wait_time)
-
-
-def create_base_silence():
-    """Generate a base silence audio file for gap filling."""
-    path = src.engines.TEMP_DIR / "silence_base.wav"
-    if path.exists():
-        return path
-    cmd = [
-        'ffmpeg', '-y', '-v', 'error',
-        '-f', 'lavfi', '-i', 'anullsrc=r=24000:cl=mono',
-        '-t', '300',
-        '-c:a', 'pcm_s16le',
-        str(path)
-    ]
-    subprocess.run(cmd, check=True)
-    return path
-
-
-def run_pipeline(job_id, url, lang, gender, gpu, subtitle):
-    """Run the full dubbing pipeline in a background thread."""
+            path = metrics.save(src.engines.OUTPUT_DIR / f"metrics_{job_id}.json")
+            update_job(job_id, metrics=metrics.to_dict(), metrics_file=str(path))
+        except OSError as e:
+            print(f"[!] WARNING: Could not save metrics for job {job_id}: {e}")
+    
     try:
         # ── Stage 0: Init ──────────────────────────────────────────────
         update_job(job_id, status="running", stage="init", progress=0,
-                   message="Initializing pipeline...")
+                   queue_position=None, message="Initializing pipeline...")
         
         ok, dep_msg = check_dependencies()
         if not ok:
             update_job(job_id, status="error", error=f"Dependency check failed: {dep_msg}")
             return
         
-        cleanup_temp()
         device = "cpu"
         if gpu:
             try:
@@ -126,7 +351,7 @@ def run_pipeline(job_id, url, lang, gender, gpu, subtitle):
                     update_job(job_id, message="CUDA not available, using CPU instead...")
             except ImportError:
                 update_job(job_id, message="PyTorch CUDA not found, using CPU...")
-        engine = src.engines.Engine(device)
+        engine = get_engine(device)
 
         # Report the actual device being used
         device_label = device.upper()
@@ -136,24 +361,58 @@ def run_pipeline(job_id, url, lang, gender, gpu, subtitle):
         update_job(job_id, device=device_label)
 
         # ── Stage 1: Download ──────────────────────────────────────────
-        update_job(job_id, stage="download", progress=5,
-                   message=f"Downloading video and audio from YouTube... [{device_label}]")
-        
-        try:
-            video_path = src.youtube.download_video(url)
-            audio_path = src.youtube.download_audio(url)
-        except Exception as e:
-            update_job(job_id, status="error", 
-                       error=f"Download failed: {str(e)}. Check if URL is valid.")
-            return
+        if upload is not None:
+            update_job(job_id, stage="download", progress=5,
+                       message=f"Preparing uploaded media... [{device_label}]")
+            try:
+                with metrics.stage("prepare"):
+                    download = src.local_media.LocalMedia(upload, start=start, end=end)
+                audio_path = download.audio()
+            except Exception as e:
+                update_job(job_id, status="error", error=f"Could not read uploaded media: {e}")
+                return
+        else:
+            update_job(job_id, stage="download", progress=5,
+                       message=f"Downloading video and audio from YouTube... [{device_label}]")
+            download, audio_path = start_download(job_id, url, start, end, captions, metrics,
+                                                  format_spec)
+            if download is None:
+                return
+        update_job(job_id, progress=15, message="Audio ready!")
         
-        update_job(job_id, progress=15, message="Download complete!")
+        def wait_video():
+            try:
+                return download.result()[0]
+            except Exception as e:
+                raise RuntimeError(f"Video download failed: {e}") from e
 
         # ── Stage 2: Transcribe ────────────────────────────────────────
-        update_job(job_id, stage="transcribe", progress=20,
-                   message="Transcribing speech with Whisper AI...")
-        
-        raw_segments = engine.transcribe_safe(audio_path)
+        raw_segments = None
+        if captions:
+            update_job(job_id, stage="transcribe", progress=20, message="Fetching captions...")
+            with metrics.stage("transcribe") as stage:
+                raw_segments = download.captions()
+                stage["items"] = len(raw_segments or [])
+        if raw_segments:
+            update_job(job_id, stage="transcribe", progress=30,
+                       message="Using existing captions, skipping Whisper...")
+            metrics.info["transcript_source"] = "youtube_captions"
+        else:
+            update_job(job_id, stage="transcribe", progress=20,
+                       message="Transcribing speech with Whisper AI...")
+            metrics.info["transcript_source"] = "whisper"
+            asr_options = engine.resolve_asr(asr)
+            metrics.info["asr"] = asr_options
+            # Checked before taking a transcription slot: a hit loads no model
+            raw_segments = src.transcripts.transcript_cache.get(audio_path, asr_options)
+            metrics.info["transcript_cache"] = "miss" if raw_segments is None else "hit"
+            if raw_segments is None:
+                with RESOURCES.slot("asr", on_wait=lambda: update_job(
+                        job_id, message="Waiting for a free transcription slot...")):
+                    with metrics.stage("transcribe") as stage:
+                        raw_segments = engine.transcribe_safe(audio_path, asr, metrics)
+                        stage["items"] = len(raw_segments)
+                src.transcripts.transcript_cache.put(audio_path, asr_options, raw_segments)
         update_job(job_id, progress=35,
                    message=f"Transcription complete: {len(raw_segments)} segments")
 
@@ -161,93 +420,87 @@ def run_pipeline(job_id, url, lang, gender, gpu, subtitle):
         update_job(job_id, stage="chunk", progress=40,
                    message="Optimizing audio chunks...")
         
-        chunks = src.engines.smart_chunk(raw_segments)
+        with metrics.stage("chunk", items=len(raw_segments)):
+            chunks = src.engines.smart_chunk(raw_segments)
         update_job(job_id, progress=45,
                    message=f"Optimized into {len(chunks)} chunks")
 
-        # ── Stage 4: Translate ─────────────────────────────────────────
-        update_job(job_id, stage="translate", progress=50,
-                   message=f"Translating to {lang.upper()}...")
-        
-        texts = [c['text'] for c in chunks]
-        translated_texts = engine.translate_safe(texts, lang)
-        
-        for i, chunk in enumerate(chunks):
-            chunk['trans_text'] = translated_texts[i]
+        # ── Stages 4-6: Translate, TTS, Render (per language) ──────────
+        # Languages fan out over the shared chunks; each gets its own
+        # sub-directory and output file, and renders still go through the
+        # render gate.
+        lang_progress = {lang: 0.0 for lang in langs}
+        progress_lock = threading.Lock()
         
-        update_job(job_id, progress=60,
-                   message="Translation complete!")
-
-        # ── Stage 5: TTS ───────────────────────────────────────────────
-        update_job(job_id, stage="tts", progress=65,
-                   message=f"Generating {gender} voice...")
-        
-        failed_tts = 0
-        for i, chunk in enumerate(chunks):
-            filename = f"chunk_{i:04d}.mp3"
-            tts_path = src.engines.TEMP_DIR / filename
-            
-            try:
-                engine.synthesize(
-                    text=chunk['trans_text'],
-                    target_lang=lang,
-                    gender=gender,
-                    out_path=tts_path
-                )
-                time.sleep(random.uniform(0.5, 1.5))
-                
-                slot_duration = chunk['end'] - chunk['start']
-                final_audio = src.media.fit_audio(tts_path, slot_duration)
-                chunk['processed_audio'] = final_audio
-            except Exception as e:
-                failed_tts += 1
-                continue
+        def make_reporter(lang):
+            prefix = f"[{lang.upper()}] " if len(langs) > 1 else ""
             
-            # Update progress within TTS stage (65-85%)
-            tts_progress = 65 + int((i + 1) / len(chunks) * 20)
-            update_job(job_id, progress=tts_progress,
-                       message=f"Voice synthesis: {i+1}/{len(chunks)} chunks")
+            def report(stage, fraction, message):
+                with progress_lock:
+                    lang_progress[lang] = fraction
+                    overall = sum(lang_progress.values()) / len(langs)
+                update_job(job_id, stage=stage, progress=50 + int(overall * 48),
+                           message=prefix + message)
+            return report
         
-        update_job(job_id, progress=85,
-                   message=f"TTS complete ({len(chunks) - failed_tts}/{len(chunks)} successful)")
-
-        # ── Stage 6: Render ────────────────────────────────────────────
-        update_job(job_id, stage="render", progress=88,
-                   message="Rendering final video...")
+        outputs = {}
+        lang_errors = {}
+        workers = max(1, min(LANG_WORKERS, len(langs)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                lang: pool.submit(dub_language, job_id, engine, copy.deepcopy(chunks),
+                                  wait_video, lang, gender, subtitle,
+                                  work_dir / lang, make_reporter(lang), metrics.child(lang))
+                for lang in langs
+            }
+            for lang, future in futures.items():
+                try:
+                    outputs[lang] = str(future.result())
+                except Exception as e:
+                    lang_errors[lang] = str(e)
         
-        try:
-            silence_path = create_base_silence()
-            concat_list_path = src.engines.TEMP_DIR / "concat_list.txt"
-            src.media.create_concat_file(chunks, silence_path, concat_list_path)
-            
-            subtitle_path = None
-            if subtitle:
-                subtitle_path = src.engines.TEMP_DIR / "subtitles.srt"
-                src.media.generate_srt(chunks, subtitle_path)
-            
-            video_name = video_path.stem
-            sub_suffix = "_sub" if subtitle else ""
-            out_name = f"dubbed_{lang}_{gender}{sub_suffix}_{video_name}.mp4"
-            final_output = src.engines.OUTPUT_DIR / out_name
-            
-            src.media.render_video(video_path, concat_list_path, final_output,
-                                   subtitle_path=subtitle_path)
-            
-            if final_output.exists():
-                file_size = final_output.stat().st_size / (1024 * 1024)
-                update_job(job_id, status="complete", progress=100,
-                           stage="done",
-                           message=f"Done! File size: {file_size:.1f} MB",
-                           output_file=str(final_output))
-            else:
-                update_job(job_id, status="error",
-                           error="Output file was not created")
-        except Exception as e:
-            update_job(job_id, status="error",
-                       error=f"Rendering failed: {str(e)}")
+        attach_metrics()
+        if outputs:
+            first_output = Path(next(iter(outputs.values())))
+            file_size = first_output.stat().st_size / (1024 * 1024)
+            done_msg = (f"Done! File size: {file_size:.1f} MB" if len(langs) == 1
+                        else f"Done! {len(outputs)}/{len(langs)} languages rendered")
+            update_job(job_id, status="complete", progress=100, stage="done",
+                       message=done_msg,
+                       output_file=str(first_output),
+                       output_files=outputs,
+                       lang_errors=lang_errors)
+        else:
+            errors = "; ".join(f"{l}: {e}" for l, e in lang_errors.items())
+            update_job(job_id, status="error", error=f"Rendering failed: {errors}",
+                       lang_errors=lang_errors)
             
     except Exception as e:
         update_job(job_id, status="error", error=f"Pipeline error: {str(e)}")
+    finally:
+        attach_metrics()
+        src.core_utils.remove_directory(work_dir)
+        if download is not None:
+            download.release()
+        if upload is not None:
+            src.core_utils.safe_file_delete(upload)
+
+
+def update_queue_positions(positions):
+    """Publish queue positions of waiting jobs to their status records."""
+    with jobs_lock:
+        for job_id, position in positions.items():
+            if job_id in jobs and jobs[job_id]["status"] == "queued":
+                jobs[job_id]["queue_position"] = position
+                jobs[job_id]["message"] = f"Job queued (position {position})..."
+
+
+scheduler = JobScheduler(
+    run_pipeline,
+    workers=SCHEDULER_WORKERS,
+    max_queue=MAX_QUEUED_JOBS,
+    on_queue_change=update_queue_positions,
+)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -282,18 +535,58 @@ def start_dub():
     """Start a dubbing job."""
     data = request.get_json()
     
-    if not data or "url" not in data:
-        return jsonify({"error": "Missing YouTube URL"}), 400
+    if not data or ("url" not in data and "upload_id" not in data):
+        return jsonify({"error": "Missing YouTube URL or upload_id"}), 400
     
-    url = data["url"].strip()
-    lang = data.get("lang", "es")
+    langs = parse_languages(data.get("langs") or data.get("lang") or "es")
     gender = data.get("gender", "female")
     gpu = data.get("gpu", False)
     subtitle = data.get("subtitle", False)
     
-    # Basic URL validation
-    if "youtube.com" not in url and "youtu.be" not in url:
-        return jsonify({"error": "Invalid YouTube URL"}), 400
+    upload = None
+    if data.get("upload_id"):
+        # Media sent earlier through /api/upload; each upload feeds one job
+        with uploads_lock:
+            upload = uploads.pop(str(data["upload_id"]), None)
+        if upload is None or not upload.exists():
+            return jsonify({"error": "Unknown or already used upload_id"}), 400
+        url = upload.name
+    else:
+        url = data["url"].strip()
+        # Basic URL validation
+        if "youtube.com" not in url and "youtu.be" not in url:
+            return jsonify({"error": "Invalid YouTube URL"}), 400
+    
+    # Optional clip range: seconds or [HH:]MM:SS
+    try:
+        start = src.core_utils.parse_timestamp(data["start"]) if data.get("start") not in (None, "") else None
+        end = src.core_utils.parse_timestamp(data["end"]) if data.get("end") not in (None, "") else None
+    except src.core_utils.ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    if start is not None and end is not None and end <= start:
+        return jsonify({"error": "end must be after start"}), 400
+    captions = bool(data.get("captions", False))
+    
+    # Optional Whisper settings: preset, model, compute_type, cpu_threads, ...
+    asr = data.get("asr") or None
+    if asr is not None:
+        if not isinstance(asr, dict):
+            return jsonify({"error": "asr must be an object of Whisper settings"}), 400
+        try:
+            src.engines.resolve_asr_options("cpu", asr)
+        except src.core_utils.ValidationError as e:
+            return jsonify({"error": str(e)}), 400
+    
+    # Optional download profile; unset fields keep the server defaults
+    try:
+        max_height = int(data.get("max_height", src.engines.VIDEO_MAX_HEIGHT))
+        max_fps = int(data.get("max_fps", src.engines.VIDEO_MAX_FPS))
+        video_codec = str(data.get("video_codec", src.engines.VIDEO_CODEC))
+        if max_height < 0 or max_fps < 0:
+            raise ValueError("max_height and max_fps must be 0 or positive")
+        format_spec = src.youtube.format_selector(max_height, max_fps, video_codec)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid download profile: {e}"}), 400
     
     # Create job
     job_id = str(uuid.uuid4())[:8]
@@ -305,20 +598,101 @@ def start_dub():
             "message": "Job queued...",
             "output_file": None,
             "error": None,
+            "queue_position": None,
             "url": url,
-            "lang": lang,
+            "lang": langs[0],
+            "langs": langs,
             "gender": gender,
+            "start": start,
+            "end": end,
+            "captions": captions,
+            "asr": asr,
+            "max_height": max_height,
+            "max_fps": max_fps,
+            "video_codec": video_codec,
+            "output_files": {},
         }
     
-    # Start pipeline in background thread
-    thread = threading.Thread(
-        target=run_pipeline,
-        args=(job_id, url, lang, gender, gpu, subtitle),
-        daemon=True
-    )
-    thread.start()
+    # Hand the job to the bounded scheduler (FIFO, fixed worker pool)
+    try:
+        position = scheduler.submit(job_id, url, langs, gender, gpu, subtitle, start, end, captions,
+                                    upload, asr, format_spec)
+    except src.core_utils.ResourceError as e:
+        with jobs_lock:
+            jobs.pop(job_id, None)
+        if upload is not None:
+            with uploads_lock:
+                uploads[str(data["upload_id"])] = upload
+        return jsonify({"error": f"Server busy: {e}. Try again later."}), 503
+    
+    return jsonify({"job_id": job_id, "queue_position": position,
+                    "message": "Dubbing job queued!"})
+
+
+@app.route("/api/upload", methods=["POST"])
+def upload_media():
+    """Stream a local media file to disk for a later /api/dub with its upload_id.
+    
+    The request body is the raw file (not multipart) and is written to disk
+    in chunks as it arrives, so large files never sit in memory. The file
+    name goes in the `filename` query parameter.
+    """
+    filename = Path(request.args.get("filename", "upload.mp4")).name
+    suffix = Path(filename).suffix.lower() or ".mp4"
+    if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+        return jsonify({"error": f"File too large (max {MAX_UPLOAD_BYTES / 1024**3:.0f} GB)"}), 413
+    
+    prune_uploads()
+    upload_id = uuid.uuid4().hex[:12]
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = UPLOAD_DIR / f"{upload_id}{suffix}"
+    part_path = path.with_name(path.name + ".part")
+    size = 0
+    try:
+        with open(part_path, "wb") as f:
+            while True:
+                block = request.stream.read(1024 * 1024)
+                if not block:
+                    break
+                size += len(block)
+                if size > MAX_UPLOAD_BYTES:
+                    raise src.core_utils.ValidationError("upload exceeds size limit")
+                f.write(block)
+        if size == 0:
+            raise src.core_utils.ValidationError("empty upload")
+        part_path.replace(path)
+    except src.core_utils.ValidationError as e:
+        src.core_utils.safe_file_delete(part_path)
+        return jsonify({"error": f"Upload rejected: {e}"}), 413 if size else 400
+    except OSError as e:
+        src.core_utils.safe_file_delete(part_path)
+        return jsonify({"error": f"Upload failed: {e}"}), 500
     
-    return jsonify({"job_id": job_id, "message": "Dubbing job started!"})
+    with uploads_lock:
+        uploads[upload_id] = path
+    return jsonify({"upload_id": upload_id, "filename": filename, "size": size})
+
+
+@app.route("/api/probe")
+def probe_video():
+    """Return title, duration, formats and caption tracks of a video.
+    
+    Served from the metadata cache when the video was seen recently, so
+    the UI can show what a job will process before starting it.
+    """
+    url = (request.args.get("url") or "").strip()
+    if not url:
+        return jsonify({"error": "Missing YouTube URL"}), 400
+    refresh = request.args.get("refresh", "").lower() in ("1", "true", "yes")
+    try:
+        meta = src.youtube.probe(url, refresh=refresh)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 502
+    track = src.captions.pick_track(meta)
+    return jsonify({**meta, "caption_track": track[0] if track else None,
+                    "caption_auto_generated": track[1] if track else None})
 
 
 @app.route("/api/status/<job_id>")
@@ -369,7 +743,7 @@ def job_status_poll(job_id):
 
 @app.route("/api/download/<job_id>")
 def download_file(job_id):
-    """Download the final dubbed video."""
+    """Download the final dubbed video (?lang=xx picks one of several)."""
     with jobs_lock:
         job = jobs.get(job_id)
     
@@ -379,7 +753,13 @@ def download_file(job_id):
     if job["status"] != "complete" or not job.get("output_file"):
         return jsonify({"error": "File not ready"}), 400
     
-    output_path = Path(job["output_file"])
+    lang = request.args.get("lang")
+    if lang:
+        if lang not in job.get("output_files", {}):
+            return jsonify({"error": f"No output for language '{lang}'"}), 404
+        output_path = Path(job["output_files"][lang])
+    else:
+        output_path = Path(job["output_file"])
     if not output_path.exists():
         return jsonify({"error": "Output file missing"}), 404
     
@@ -391,6 +771,13 @@ def download_file(job_id):
     )
 
 
+@app.route("/api/queue")
+def queue_status():
+    """Return scheduler load and stage limits."""
+    return jsonify({**scheduler.stats, "limits": RESOURCES.limits,
+                    "models": MODEL_REGISTRY.stats, "cache": media_cache.stats})
+
+
 @app.route("/api/check")
 def health_check():
     """Check system health and dependencies."""